@@ -0,0 +1,165 @@
+import threading
+from VEBTree import VEBTree
+class _ReadSide(object):
+	"""Context manager which takes ReadWriteLock for reading"""
+	__slots__ = ("_lock",)
+	def __init__(self, lock: 'ReadWriteLock'):
+		self._lock = lock
+	def __enter__(self) -> None:
+		self._lock.acquireRead()
+	def __exit__(self, *exception) -> None:
+		self._lock.releaseRead()
+class _WriteSide(object):
+	"""Context manager which takes ReadWriteLock for writing"""
+	__slots__ = ("_lock",)
+	def __init__(self, lock: 'ReadWriteLock'):
+		self._lock = lock
+	def __enter__(self) -> None:
+		self._lock.acquireWrite()
+	def __exit__(self, *exception) -> None:
+		self._lock.releaseWrite()
+class ReadWriteLock(object):
+	"""Lock which is held by many readers or by one writer
+	   Waiting writer stops new readers, so writers are not starved by the stream of readers
+	   Readers take only the inner mutex while there is no writer, the condition is used only for waiting
+	Attributes:
+		reading - context manager of the read side: 'with lock.reading:'
+		writing - context manager of the write side: 'with lock.writing:'
+	"""
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._condition = threading.Condition(self._lock)
+		self._readers = 0
+		self._writer = False
+		self._waitingWriters = 0
+		self.reading = _ReadSide(self)
+		self.writing = _WriteSide(self)
+	def acquireRead(self) -> None:
+		with self._lock:
+			while self._writer or self._waitingWriters:
+				self._condition.wait()
+			self._readers += 1
+	def releaseRead(self) -> None:
+		with self._lock:
+			self._readers -= 1
+			if self._readers == 0 and self._waitingWriters:
+				self._condition.notify_all()
+	def acquireWrite(self) -> None:
+		with self._lock:
+			self._waitingWriters += 1
+			while self._writer or self._readers:
+				self._condition.wait()
+			self._waitingWriters -= 1
+			self._writer = True
+	def releaseWrite(self) -> None:
+		with self._lock:
+			self._writer = False
+			self._condition.notify_all()
+class ConcurrentVEBTree(object):
+	"""Thread-safe wrapper of VEBTree (or FlatVEBTree) object
+	   Queries run under the read lock and may go in parallel, changes run under the write lock alone
+	   Iteration and range return lists which are collected under the read lock
+	   Several calls which should see the same state go to the wrapped tree inside 'with wrapper.reading:'
+	   or 'with wrapper.writing:'; methods of the wrapper itself should not be called there,
+	   the lock is not reentrant and waiting writer would block them forever
+	Attributes:
+		tree - wrapped tree; it should not be used without the lock while other threads use the wrapper
+		lock - ReadWriteLock object
+	"""
+	def __init__(self, universum: int = 2, fill: bool = False, leafSize: int = None, sparse: bool = False, tree = None, split = None, autoGrow: bool = False) -> None:
+		"""Initializing function of the ConcurrentVEBTree class
+		Arguments:
+					universum, fill, leafSize, sparse, split, autoGrow - arguments of the new VEBTree object
+					tree - existing tree which is wrapped instead of the new one
+		"""
+		if tree == None:
+			tree = VEBTree(universum, fill, leafSize, sparse, split, autoGrow)
+		self.tree = tree
+		self.lock = ReadWriteLock()
+		self.reading = self._reading = self.lock.reading
+		self.writing = self._writing = self.lock.writing
+	@property
+	def universum(self) -> int:
+		return self.tree.universum
+	def getMin(self):
+		with self._reading:
+			return self.tree.getMin()
+	def getMax(self):
+		with self._reading:
+			return self.tree.getMax()
+	def containsValue(self, value: int) -> bool:
+		with self._reading:
+			return self.tree.containsValue(value)
+	def getSuccessor(self, value: int) -> int:
+		with self._reading:
+			return self.tree.getSuccessor(value)
+	def getPredecessor(self, value: int) -> int:
+		with self._reading:
+			return self.tree.getPredecessor(value)
+	def __len__(self) -> int:
+		with self._reading:
+			return len(self.tree)
+	def rank(self, value: int) -> int:
+		# rank and select build the cache of prefix sums under the read lock; readers may build it twice,
+		# but the cache is assigned at once when it is complete, so they never see a part of it
+		with self._reading:
+			return self.tree.rank(value)
+	def select(self, index: int) -> int:
+		with self._reading:
+			return self.tree.select(index)
+	def containsMany(self, values) -> list:
+		with self._reading:
+			return self.tree.containsMany(values)
+	def containsArray(self, queries):
+		with self._reading:
+			return self.tree.containsArray(queries)
+	def successorArray(self, queries):
+		with self._reading:
+			return self.tree.successorArray(queries)
+	def predecessorArray(self, queries):
+		with self._reading:
+			return self.tree.predecessorArray(queries)
+	def __iter__(self):
+		with self._reading:
+			return iter(list(self.tree))
+	def __reversed__(self):
+		with self._reading:
+			return iter(list(reversed(self.tree)))
+	def range(self, low: int = 0, high: int = None) -> list:
+		with self._reading:
+			return list(self.tree.range(low, high))
+	def memoryUsage(self) -> dict:
+		with self._reading:
+			return self.tree.memoryUsage()
+	def dump(self, path: str, encoding: str = None) -> None:
+		with self._reading:
+			self.tree.dump(path, encoding)
+	def snapshot(self):
+		# The snapshot moves the tree to the next generation, so it is taken under the write lock;
+		# the returned view is not changed by anybody and is read without the lock
+		with self._writing:
+			return self.tree.snapshot()
+	def insertValue(self, value: int) -> bool:
+		with self._writing:
+			return self.tree.insertValue(value)
+	def removeValue(self, value: int) -> bool:
+		with self._writing:
+			return self.tree.removeValue(value)
+	def insertMany(self, values) -> int:
+		with self._writing:
+			return self.tree.insertMany(values)
+	def removeMany(self, values) -> int:
+		with self._writing:
+			return self.tree.removeMany(values)
+	def resetTree(self, universum: int = None, fill: bool = False, sparse: bool = None) -> None:
+		with self._writing:
+			self.tree.resetTree(universum, fill, sparse)
+	def clear(self) -> None:
+		with self._writing:
+			self.tree.clear()
+	def growUniversum(self, universum: int) -> int:
+		with self._writing:
+			return self.tree.growUniversum(universum)
+	def shrinkUniversum(self, universum: int = None) -> int:
+		with self._writing:
+			return self.tree.shrinkUniversum(universum)
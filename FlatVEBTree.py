@@ -0,0 +1,514 @@
+import bisect
+import itertools
+import operator
+import sys
+from array import array
+class FlatVEBTree(object):
+	"""Class describes vEB tree with flat layout for dense universums (up to about 2^26)
+	   Instead of cluster objects the tree keeps levels of 64-bit words in array('Q'):
+	   the first level has bit number i set if value i is in the tree, every next level has bit number i set
+	   if word number i of the previous level is not zero, the last level is one word
+	   Word of the value on every level is found with shifts, so operations do not follow references
+	   Public methods are the same as in VEBTree
+	Attributes:
+		universum - maximum value which can be stored in the tree; universum should be the result of raising 2 to a power
+		_levels	  - array('Q') for every level, the first one holds the values
+		_counts	  - array for every level with quantity of values under every word of the level; built by rank and select,
+					dropped whenever the tree is changed
+		_minElement - stores the least element in the tree
+		_maxElement - stores the biggest element in the tree
+		_count	  - quantity of values stored in the tree
+	"""
+	def displayContent(self, clusterNum: int = -1) -> None:
+		"""Prints information about FlatVEBTree object
+		Prints max and min elements, the size of the universum and quantity of values on every level
+		Arguments:
+					clusterNum - index of the word of the first level which is printed as bitmap
+		"""
+		if clusterNum == -1:
+			print("u: {}".format(self.universum))
+			print("min: {}\tmax: {}".format(self.getMin(), self.getMax()))
+			line = ""
+			for level, bits in enumerate(self._levels):
+				line += "Level no.{}| words = {}| non empty words: {}\n".format(level, len(bits), sum(map(bool, bits)))
+			print(line)
+		else:
+			print("bitmap: {:b}".format(self._levels[0][clusterNum]))
+	def _isValueValid(self, value: int) -> bool:
+		"""Checks whether value is valid or not (greater or equals zero and less than universum)
+		Arguments:
+					value - int value
+		Return:
+					True	- if value is valid
+					False 	- if value is not valid
+		"""
+		if value == None or type(value) != int or value >= self.universum or value < 0 :
+			return False
+		return True
+	def sqrtUniversum(self, roundingUp: bool = False) -> int:
+		"""Calculates so-called "square of the universum"
+		"square of the universum" is a codename for the formula 2^(lg2(u)/2)
+		Arguments:
+					roundingUp - flag indicates whether rounding should be up or down
+		Return:
+					int - square of the universum
+		"""
+		power = self.universum.bit_length() - 1
+		if roundingUp == True:
+			return 1 << (power - (power >> 1))
+		return 1 << (power >> 1)
+	def __init__(self, universum: int = 2, fill: bool = False, leafSize: int = None, sparse: bool = False) -> None:
+		"""Initializing function of the FlatVEBTree class
+		   Every level is allocated at once; 'fill', 'leafSize' and 'sparse' are accepted for compatibility with VEBTree
+		Arguments:
+					universum - the size of the universum for vEB tree
+		"""
+		if universum < 2:
+			universum = 2
+		self.universum = 1 << (universum - 1).bit_length()
+		self._levels = []
+		bits = self.universum
+		while True:
+			words = max(1, (bits + 63) >> 6)
+			self._levels.append(array("Q", [0]) * words)
+			if words == 1:
+				break
+			bits = words
+		self._counts = None
+		self._minElement = None
+		self._maxElement = None
+		self._count = 0
+	@staticmethod
+	def _countType(maxCount: int) -> str:
+		"""Returns the smallest typecode of array which keeps numbers up to 'maxCount'"""
+		for typecode in ("B", "H", "L"):
+			if maxCount < 1 << (8 * array(typecode).itemsize):
+				return typecode
+		return "Q"
+	def resetTree(self, universum: int = None, fill: bool = False, sparse: bool = None):
+		"""Function resets existing tree with size of the universum from 'universum'
+		   If universum is None - function just resets the tree with same value of the universum
+		Arguments:
+					universum - the size of the universum of the tree
+		"""
+		if universum == None:
+			universum = self.universum
+		self.__init__(universum)
+	def clear(self) -> None:
+		"""Removes all values but keeps the allocated levels
+		   Levels are walked from the top one, set bits of the word point to the non zero words of the level below,
+		   so only non zero words are visited and set to zero
+		"""
+		words = [0]
+		for bits in reversed(self._levels):
+			nextWords = []
+			for word in words:
+				value = bits[word]
+				bits[word] = 0
+				base = word << 6
+				while value:
+					lowest = value & -value
+					nextWords.append(base + lowest.bit_length() - 1)
+					value ^= lowest
+			words = nextWords
+		self._counts = None
+		self._minElement = None
+		self._maxElement = None
+		self._count = 0
+	def isSparse(self) -> bool:
+		"""FlatVEBTree object always allocates all levels"""
+		return False
+	@classmethod
+	def fromSorted(cls, values, universum: int, leafSize: int = None, sparse: bool = False) -> 'FlatVEBTree':
+		"""Builds FlatVEBTree object from the values in one pass
+		   Words of the first level are built at once from the sorted values, then every next level is built from the previous one
+		   Values do not have to be sorted for the flat layout, but sorted values are loaded faster; repeated and invalid values are skipped
+		Arguments:
+					values	  - iterable with int values
+					universum - the size of the universum for vEB tree
+		Return:
+					FlatVEBTree - new tree which contains given values
+		"""
+		tree = cls(universum)
+		values = list(values)
+		if values and not (set(map(type, values)) == {int} and min(values) >= 0 and max(values) < tree.universum):
+			values = [value for value in values if tree._isValueValid(value)]
+		words = tree._levels[0]
+		if all(map(operator.lt, values, itertools.islice(values, 1, None))):
+			# Values of every word are found with bisect and turned into the bitmap at once
+			start = 0
+			while start < len(values):
+				index = values[start] >> 6
+				stop = bisect.bisect_left(values, (index + 1) << 6, start)
+				words[index] = sum(map((1).__lshift__, map((index << 6).__rsub__, values[start:stop])))
+				start = stop
+		else:
+			for value in values:
+				words[value >> 6] |= 1 << (value & 63)
+		for level in range(1, len(tree._levels)):
+			bits = tree._levels[level]
+			for index, word in enumerate(words):
+				if word:
+					bits[index >> 6] |= 1 << (index & 63)
+			words = bits
+		tree._count = sum(map(int.bit_count, tree._levels[0]))
+		tree._minElement = tree._findNext(0, 0)
+		tree._maxElement = tree._findPrevious(0, tree.universum - 1)
+		return tree
+	def memoryUsage(self) -> dict:
+		"""Calculates memory footprint of the FlatVEBTree object
+		   Every level is counted as one node; the last level (one word) goes first like the root of VEBTree
+		Return:
+					dict - "nodes" and "bytes" for the whole tree and "levels" with list of such dicts for every level
+		"""
+		levels = []
+		for level in range(len(self._levels) - 1, -1, -1):
+			size = sys.getsizeof(self._levels[level])
+			if self._counts != None:
+				size += sys.getsizeof(self._counts[level])
+			levels.append({"nodes": 1, "bytes": size})
+		levels[0]["bytes"] += sys.getsizeof(self)
+		return {
+			"nodes": len(levels),
+			"bytes": sum(level["bytes"] for level in levels),
+			"levels": levels
+		}
+	def dump(self, path: str, encoding: str = None) -> None:
+		"""Writes values of the FlatVEBTree object into the binary file (format is described in VEBStorage)
+		Arguments:
+					path	 - path of the file
+					encoding - "bitmap", "keys" or None to choose the smaller one
+		"""
+		from VEBStorage import dumpTree
+		dumpTree(self, path, encoding)
+	@classmethod
+	def load(cls, path: str, leafSize: int = None, sparse: bool = False, readOnly: bool = False):
+		"""Reads the file written by dump
+		Arguments:
+					path	 - path of the file
+					readOnly - if True the file is memory-mapped and queries are answered from the file without building the tree
+		Return:
+					FlatVEBTree	  - new tree which contains values from the file
+					MappedVEBTree - read-only view of the file if 'readOnly' is True
+		"""
+		from VEBStorage import loadTree, MappedVEBTree
+		if readOnly:
+			return MappedVEBTree(path)
+		return loadTree(path, cls, leafSize, sparse)
+	def _iterBitmaps(self, base: int):
+		"""Yields non empty words of the first level as (base, bits) like VEBTree._iterBitmaps"""
+		words = self._levels[0]
+		index = self._findNext(1, 0) if len(self._levels) > 1 else 0
+		while index != None:
+			if words[index]:
+				yield base + (index << 6), words[index]
+			index = self._findNext(1, index + 1) if len(self._levels) > 1 else None
+	def getMin(self):
+		return self._minElement
+	def getMax(self):
+		return self._maxElement
+	def _findNext(self, level: int, position: int) -> int:
+		"""Finds the least set bit of the level 'level' which is not less than 'position'
+		   Goes up while words have no bits after the position, then goes down through the lowest set bits
+		Return:
+					int	 - position of the bit
+					None - if there is no such bit
+		"""
+		levels = self._levels
+		start = level
+		while level < len(levels):
+			index = position >> 6
+			if index >= len(levels[level]):
+				return None
+			word = levels[level][index] >> (position & 63)
+			if word:
+				position += (word & -word).bit_length() - 1
+				while level > start:
+					level -= 1
+					word = levels[level][position]
+					position = (position << 6) + (word & -word).bit_length() - 1
+				return position
+			position = index + 1
+			level += 1
+		return None
+	def _findPrevious(self, level: int, position: int) -> int:
+		"""Finds the biggest set bit of the level 'level' which is not greater than 'position'
+		   Goes up while words have no bits before the position, then goes down through the highest set bits
+		Return:
+					int	 - position of the bit
+					None - if there is no such bit
+		"""
+		levels = self._levels
+		start = level
+		while level < len(levels) and position >= 0:
+			index = position >> 6
+			word = levels[level][index] & ((2 << (position & 63)) - 1)
+			if word:
+				position = (index << 6) + word.bit_length() - 1
+				while level > start:
+					level -= 1
+					position = (position << 6) + levels[level][position].bit_length() - 1
+				return position
+			position = index - 1
+			level += 1
+		return None
+	def containsValue(self, value: int) -> bool:
+		"""Checks whether value is in the FlatVEBTree object
+		Arguments:
+					value - int value
+		Return:
+					True  - if value is in the tree
+					False - if value is not in the tree or value is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return False
+		return (self._levels[0][value >> 6] >> (value & 63)) & 1 == 1
+	def insertValue(self, value: int) -> bool:
+		"""Inserts number into the FlatVEBTree object
+		   Bit of the value is set on the levels up to the first word which was not empty
+		Arguments:
+					value - int value
+		Return:
+					True	- if number has been inserted successfully or it is already in the tree
+					False	- if number is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return False
+		if (self._levels[0][value >> 6] >> (value & 63)) & 1:
+			return True
+		position = value
+		for bits in self._levels:
+			index = position >> 6
+			word = bits[index]
+			bits[index] = word | (1 << (position & 63))
+			if word != 0:
+				break
+			position = index
+		self._counts = None
+		if self._count == 0:
+			self._minElement = value
+			self._maxElement = value
+		elif value < self._minElement:
+			self._minElement = value
+		elif value > self._maxElement:
+			self._maxElement = value
+		self._count += 1
+		return True
+	def removeValue(self, value: int) -> bool:
+		"""Removes number from the FlatVEBTree object
+		   Bit of the value is cleared on the levels up to the first word which does not become empty
+		Arguments:
+					value - int value
+		Return:
+					True  - if value was removed
+					False - if value is invalid or it is not in the tree
+		"""
+		if self.containsValue(value) == False:
+			return False
+		position = value
+		for bits in self._levels:
+			index = position >> 6
+			word = bits[index] & ~(1 << (position & 63))
+			bits[index] = word
+			if word != 0:
+				break
+			position = index
+		self._counts = None
+		self._count -= 1
+		if self._count == 0:
+			self._minElement = None
+			self._maxElement = None
+		elif value == self._minElement:
+			self._minElement = self._findNext(0, value + 1)
+		elif value == self._maxElement:
+			self._maxElement = self._findPrevious(0, value - 1)
+		return True
+	def getSuccessor(self, value: int) -> int:
+		"""Returns the successor of the given number in 'value'
+		Arguments:
+					value - int value
+		Return:
+					Int		- if the FlatVEBTree object contains number greater than given number
+					None	- if the FlatVEBTree object does not contain greater value that given number
+		"""
+		if self._isValueValid(value) == False or self._count == 0 or value >= self._maxElement:
+			return None
+		if value < self._minElement:
+			return self._minElement
+		return self._findNext(0, value + 1)
+	def getPredecessor(self, value: int) -> int:
+		"""Returns the predecessor of the given number in 'value'
+		Arguments:
+					value - int value
+		Return:
+					Int		- if the FlatVEBTree object contains number less than given number
+					None	- if the FlatVEBTree object does not contain less value that given number
+		"""
+		if self._isValueValid(value) == False or self._count == 0 or value <= self._minElement:
+			return None
+		if value > self._maxElement:
+			return self._maxElement
+		return self._findPrevious(0, value - 1)
+	def __len__(self) -> int:
+		"""Returns quantity of values stored in the FlatVEBTree object"""
+		return self._count
+	def rank(self, value: int) -> int:
+		"""Counts values of the FlatVEBTree object which are less than given number
+		   Descends from the last level and sums counts of the preceding words inside every word on the path;
+		   counts are built on the first query after the tree was changed
+		Arguments:
+					value - int value
+		Return:
+					int  - quantity of values which are less than 'value'
+					None - if value is not int
+		"""
+		if type(value) != int:
+			return None
+		if value >= self.universum:
+			return self._count
+		if value <= 0:
+			return 0
+		allCounts = self._rankCounts()
+		result = 0
+		for level in range(len(self._levels) - 1, 0, -1):
+			start = (value >> (6 * (level + 1))) << 6
+			result += sum(allCounts[level - 1][start: start + ((value >> (6 * level)) & 63)])
+		return result + (self._levels[0][value >> 6] & ((1 << (value & 63)) - 1)).bit_count()
+	def select(self, index: int) -> int:
+		"""Finds the value of the FlatVEBTree object with given position in ascending order
+		Arguments:
+					index - position of the value, the least value has position 0
+		Return:
+					int	 - value with position 'index'
+					None - if the FlatVEBTree object contains less than index + 1 values
+		"""
+		if type(index) != int or index < 0 or index >= self._count:
+			return None
+		allCounts = self._rankCounts()
+		position = 0
+		for level in range(len(self._levels) - 1, 0, -1):
+			counts = allCounts[level - 1]
+			position <<= 6
+			while counts[position] <= index:
+				index -= counts[position]
+				position += 1
+		word = self._levels[0][position]
+		for skipped in range(index):
+			word &= word - 1
+		return (position << 6) + (word & -word).bit_length() - 1
+	def _rankCounts(self) -> list:
+		"""Returns quantity of values under every word of every level, builds it if the tree was changed after the last build"""
+		if self._counts == None:
+			counts = array(self._countType(64), map(int.bit_count, self._levels[0]))
+			allCounts = [counts]
+			# Words of the level 'level' cover 64^(level + 1) values
+			span = 64
+			for level in range(1, len(self._levels)):
+				span <<= 6
+				counts = array(self._countType(min(span, self.universum)), [sum(counts[start: start + 64]) for start in range(0, len(counts), 64)])
+				allCounts.append(counts)
+			# Counts are published when they are complete, so concurrent readers never see a part of them
+			self._counts = allCounts
+		return self._counts
+	def __iter__(self):
+		"""Iterates over values of the FlatVEBTree object in ascending order
+		   The FlatVEBTree object should not be changed during iteration
+		"""
+		return self._iterRange(0, self.universum)
+	def __reversed__(self):
+		"""Iterates over values of the FlatVEBTree object in descending order"""
+		words = self._levels[0]
+		position = self._maxElement
+		while position != None:
+			index = position >> 6
+			word = words[index] & ((2 << (position & 63)) - 1)
+			base = index << 6
+			while word:
+				highestBit = word.bit_length() - 1
+				yield base + highestBit
+				word ^= 1 << highestBit
+			position = self._findPrevious(0, base - 1)
+	def range(self, low: int = 0, high: int = None):
+		"""Iterates lazily over values of the FlatVEBTree object which are in [low, high) in ascending order
+		Arguments:
+					low  - the least value of the range
+					high - value after the greatest value of the range; universum if it is None
+		"""
+		if high == None or high > self.universum:
+			high = self.universum
+		if low < 0:
+			low = 0
+		if low >= high:
+			return iter(())
+		return self._iterRange(low, high)
+	def _iterRange(self, low: int, high: int):
+		"""Yields values in [low, high) word by word, next non empty word is found with help of the next levels"""
+		words = self._levels[0]
+		position = self._findNext(0, low)
+		while position != None and position < high:
+			index = position >> 6
+			word = words[index] >> (position & 63) << (position & 63)
+			base = index << 6
+			while word:
+				lowestBit = word & -word
+				value = base + lowestBit.bit_length() - 1
+				if value >= high:
+					return
+				yield value
+				word ^= lowestBit
+			position = self._findNext(0, base + 64)
+	def containsArray(self, queries):
+		"""Checks presence of every value of numpy array in the FlatVEBTree object (needs numpy, see VEBNumpy)
+		Arguments:
+					queries - numpy array with int values
+		Return:
+					numpy.ndarray - bool for every query, False for invalid values
+		"""
+		from VEBNumpy import containsArray
+		return containsArray(self, queries)
+	def successorArray(self, queries):
+		"""Finds successor of every value of numpy array in the FlatVEBTree object (needs numpy, see VEBNumpy)
+		Arguments:
+					queries - numpy array with int values
+		Return:
+					numpy.ndarray - int64 successor for every query, -1 if there is no successor or value is invalid
+		"""
+		from VEBNumpy import successorArray
+		return successorArray(self, queries)
+	def predecessorArray(self, queries):
+		"""Finds predecessor of every value of numpy array in the FlatVEBTree object (needs numpy, see VEBNumpy)
+		Arguments:
+					queries - numpy array with int values
+		Return:
+					numpy.ndarray - int64 predecessor for every query, -1 if there is no predecessor or value is invalid
+		"""
+		from VEBNumpy import predecessorArray
+		return predecessorArray(self, queries)
+	def insertMany(self, values) -> int:
+		"""Inserts many numbers into the FlatVEBTree object at once
+		   Flat layout has no clusters to group values by, so values are inserted one by one
+		Arguments:
+					values - iterable with int values; invalid values are skipped
+		Return:
+					int - quantity of values which were not in the FlatVEBTree object before
+		"""
+		count = self._count
+		for value in values:
+			self.insertValue(value)
+		return self._count - count
+	def removeMany(self, values) -> int:
+		"""Removes many numbers from the FlatVEBTree object at once
+		Arguments:
+					values - iterable with int values; invalid values and values which are not in the tree are skipped
+		Return:
+					int - quantity of removed values
+		"""
+		return sum(map(self.removeValue, values))
+	def containsMany(self, values) -> list:
+		"""Checks presence of many numbers in the FlatVEBTree object at once
+		Arguments:
+					values - iterable with values
+		Return:
+					list - True or False for every given value in the same order
+		"""
+		return list(map(self.containsValue, values))
@@ -0,0 +1,325 @@
+import multiprocessing
+from VEBTree import VEBTree
+def _serveShard(connection, universum: int, leafSize: int, sparse: bool) -> None:
+	"""Loop of the worker process which owns VEBTree object of one shard
+	   Every request is (name of the method, arguments), None stops the loop
+	   Every answer is (failed, result, min, max, quantity of values) of the shard after the call
+	Arguments:
+				connection - end of the pipe of the worker
+				universum, leafSize, sparse - arguments of the VEBTree object of the shard
+	"""
+	tree = VEBTree(universum, False, leafSize, sparse)
+	while True:
+		request = connection.recv()
+		if request == None:
+			break
+		name, arguments = request
+		failed = False
+		try:
+			if name == "range":
+				# Generator can not be sent through the pipe
+				result = list(tree.range(*arguments))
+			else:
+				result = getattr(tree, name)(*arguments)
+		except Exception as error:
+			failed = True
+			result = error
+		connection.send((failed, result, tree.getMin(), tree.getMax(), len(tree)))
+	connection.close()
+class ShardedVEBTree(object):
+	"""vEB tree which is split by the high bits of the values into shards, every shard is VEBTree object in its own process
+	   Single value goes to the process of its shard; insertMany, removeMany and containsMany send groups of values
+	   to all their shards first and collect answers after that, so the shards work in parallel
+	   The front-end keeps min, max and quantity of values of every shard and summary tree of the non empty shards,
+	   so successor or predecessor which is not in the shard of the value is found without asking other processes
+	   The object is not thread-safe, every call waits for the answers of its shards
+	Attributes:
+		universum - the size of the universum
+		shards	  - quantity of shards (the result of raising 2 to a power)
+	"""
+	def __init__(self, universum: int = 2, shards: int = 4, leafSize: int = None, sparse: bool = False, context = None) -> None:
+		"""Initializing function of the ShardedVEBTree class
+		   Worker processes are started here and stopped by close
+		Arguments:
+					universum - the size of the universum; it is rounded up to the power of 2
+					shards	  - quantity of shards; it is rounded up to the power of 2 and is not bigger than universum / 2
+					leafSize, sparse - arguments of the VEBTree objects of the shards
+					context	  - multiprocessing context or name of the start method; default one if it is None
+		"""
+		self.universum = 1 << (max(2, universum) - 1).bit_length()
+		self.shards = min(1 << (max(1, shards) - 1).bit_length(), self.universum >> 1)
+		shardUniversum = self.universum // self.shards
+		self._shift = shardUniversum.bit_length() - 1
+		self._mask = shardUniversum - 1
+		self._summary = VEBTree(self.shards)
+		self._mins = [None] * self.shards
+		self._maxs = [None] * self.shards
+		self._counts = [0] * self.shards
+		if context == None or type(context) == str:
+			context = multiprocessing.get_context(context)
+		self._connections = []
+		self._processes = []
+		for shard in range(self.shards):
+			connection, workerConnection = context.Pipe()
+			process = context.Process(target = _serveShard, args = (workerConnection, shardUniversum, leafSize, sparse), daemon = True)
+			process.start()
+			workerConnection.close()
+			self._connections.append(connection)
+			self._processes.append(process)
+	def close(self) -> None:
+		"""Stops worker processes; the ShardedVEBTree object can not be used after that"""
+		for connection in self._connections:
+			connection.send(None)
+			connection.close()
+		for process in self._processes:
+			process.join()
+		self._connections = []
+		self._processes = []
+	def __enter__(self) -> 'ShardedVEBTree':
+		return self
+	def __exit__(self, *exception) -> None:
+		self.close()
+	def _send(self, shard: int, name: str, *arguments) -> None:
+		self._connections[shard].send((name, arguments))
+	def _receive(self, shard: int):
+		"""Receives the answer of the shard, updates its min, max and quantity of values and the summary of non empty shards
+		Return:
+					result of the called method of the shard
+		"""
+		failed, result, minElement, maxElement, count = self._connections[shard].recv()
+		if count and not self._counts[shard]:
+			self._summary.insertValue(shard)
+		elif not count and self._counts[shard]:
+			self._summary.removeValue(shard)
+		self._mins[shard] = minElement
+		self._maxs[shard] = maxElement
+		self._counts[shard] = count
+		if failed:
+			raise result
+		return result
+	def _call(self, shard: int, name: str, *arguments):
+		self._send(shard, name, *arguments)
+		return self._receive(shard)
+	def _isValueValid(self, value: int) -> bool:
+		return type(value) == int and 0 <= value < self.universum
+	def _groups(self, values) -> dict:
+		"""Splits valid values by shards
+		Return:
+					dict - number of the shard: (offsets of the values in the shard, positions of the values in 'values')
+		"""
+		groups = {}
+		shift = self._shift
+		mask = self._mask
+		for position, value in enumerate(values):
+			if self._isValueValid(value):
+				group = groups.get(value >> shift)
+				if group == None:
+					group = groups[value >> shift] = ([], [])
+				group[0].append(value & mask)
+				group[1].append(position)
+		return groups
+	def _fanOut(self, name: str, groups: dict) -> dict:
+		"""Sends groups of values to their shards at once and then collects the answers
+		   Answers of all shards which got the request are read even if some shard failed, otherwise they would stay
+		   in the pipes and be taken as answers of the next calls; the first error is raised after that
+		   (_receive updates the state of the failed shard before it raises)
+		Arguments:
+					name   - name of the called method of the shards
+					groups - number of the shard: group of values from _groups, or None if the method takes no values
+		Return:
+					dict - number of the shard: result of the called method of the shard
+		"""
+		error = None
+		sent = []
+		for shard, group in groups.items():
+			arguments = () if group == None else (group[0],)
+			try:
+				self._send(shard, name, *arguments)
+			except Exception as exception:
+				error = exception
+				break
+			sent.append(shard)
+		results = {}
+		for shard in sent:
+			try:
+				results[shard] = self._receive(shard)
+			except Exception as exception:
+				if error == None:
+					error = exception
+		if error != None:
+			raise error
+		return results
+	def getMin(self):
+		shard = self._summary.getMin()
+		if shard == None:
+			return None
+		return (shard << self._shift) + self._mins[shard]
+	def getMax(self):
+		shard = self._summary.getMax()
+		if shard == None:
+			return None
+		return (shard << self._shift) + self._maxs[shard]
+	def __len__(self) -> int:
+		"""Returns quantity of values stored in all shards"""
+		return sum(self._counts)
+	def containsValue(self, value: int) -> bool:
+		"""Checks whether value is in the ShardedVEBTree object
+		Arguments:
+					value - int value
+		Return:
+					True	- if value is in the ShardedVEBTree object
+					False	- if value is not in the ShardedVEBTree object or value is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return False
+		shard = value >> self._shift
+		if self._counts[shard] == 0:
+			return False
+		return self._call(shard, "containsValue", value & self._mask)
+	def insertValue(self, value: int) -> bool:
+		"""Inserts number into the shard of the value
+		Return:
+					True	- if value is in the ShardedVEBTree object after the call
+					False	- if value is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return False
+		return self._call(value >> self._shift, "insertValue", value & self._mask)
+	def removeValue(self, value: int) -> bool:
+		"""Removes number from the shard of the value
+		Return:
+					True	- if value was removed
+					False	- if value was not in the ShardedVEBTree object or value is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return False
+		shard = value >> self._shift
+		if self._counts[shard] == 0:
+			return False
+		return self._call(shard, "removeValue", value & self._mask)
+	def getSuccessor(self, value: int) -> int:
+		"""Finds the least value which is greater than given number
+		   The shard of the value is asked only if its max is greater than the value,
+		   otherwise the answer is min of the next non empty shard from the summary
+		Return:
+					int  - successor of the value
+					None - if there is no successor or value is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return None
+		shard = value >> self._shift
+		offset = value & self._mask
+		if self._maxs[shard] != None and offset < self._maxs[shard]:
+			return (shard << self._shift) + self._call(shard, "getSuccessor", offset)
+		shard = self._summary.getSuccessor(shard)
+		if shard == None:
+			return None
+		return (shard << self._shift) + self._mins[shard]
+	def getPredecessor(self, value: int) -> int:
+		"""Finds the biggest value which is less than given number
+		   The shard of the value is asked only if its min is less than the value,
+		   otherwise the answer is max of the previous non empty shard from the summary
+		Return:
+					int  - predecessor of the value
+					None - if there is no predecessor or value is invalid
+		"""
+		if self._isValueValid(value) == False:
+			return None
+		shard = value >> self._shift
+		offset = value & self._mask
+		if self._mins[shard] != None and offset > self._mins[shard]:
+			return (shard << self._shift) + self._call(shard, "getPredecessor", offset)
+		shard = self._summary.getPredecessor(shard)
+		if shard == None:
+			return None
+		return (shard << self._shift) + self._maxs[shard]
+	def rank(self, value: int) -> int:
+		"""Counts values which are less than given number
+		Return:
+					int  - quantity of values which are less than 'value'
+					None - if value is not int
+		"""
+		if type(value) != int:
+			return None
+		if value >= self.universum:
+			return len(self)
+		if value <= 0:
+			return 0
+		shard = value >> self._shift
+		result = sum(self._counts[:shard])
+		if self._counts[shard]:
+			result += self._call(shard, "rank", value & self._mask)
+		return result
+	def select(self, index: int) -> int:
+		"""Finds the value with given position in ascending order
+		Return:
+					int	 - value with position 'index'
+					None - if there are less than index + 1 values
+		"""
+		if type(index) != int or index < 0:
+			return None
+		for shard in self._summary:
+			if index < self._counts[shard]:
+				return (shard << self._shift) + self._call(shard, "select", index)
+			index -= self._counts[shard]
+		return None
+	def insertMany(self, values) -> int:
+		"""Inserts many numbers at once, shards insert their groups of values in parallel
+		Return:
+					int - quantity of values which were not in the ShardedVEBTree object before
+		"""
+		return sum(self._fanOut("insertMany", self._groups(values)).values())
+	def removeMany(self, values) -> int:
+		"""Removes many numbers at once, shards remove their groups of values in parallel
+		Return:
+					int - quantity of removed values
+		"""
+		groups = self._groups(values)
+		for shard in list(groups):
+			if self._counts[shard] == 0:
+				del groups[shard]
+		return sum(self._fanOut("removeMany", groups).values())
+	def clear(self) -> None:
+		"""Removes all values, non empty shards clear their trees in parallel and keep their clusters"""
+		self._fanOut("clear", dict.fromkeys(self._summary))
+	def containsMany(self, values) -> list:
+		"""Checks presence of many numbers at once, shards check their groups of values in parallel
+		Return:
+					list - True or False for every given value in the same order
+		"""
+		values = list(values)
+		groups = self._groups(values)
+		for shard in list(groups):
+			if self._counts[shard] == 0:
+				del groups[shard]
+		found = [False] * len(values)
+		for shard, result in self._fanOut("containsMany", groups).items():
+			for position, contained in zip(groups[shard][1], result):
+				found[position] = contained
+		return found
+	def __iter__(self):
+		"""Iterates over values in ascending order, values of every shard are received at once"""
+		return self.range()
+	def range(self, low: int = 0, high: int = None):
+		"""Iterates lazily over values which are in [low, high) in ascending order
+		   Only non empty shards which cross the range are asked, one after another
+		Arguments:
+					low  - the least value of the range
+					high - value after the greatest value of the range; universum if it is None
+		"""
+		if high == None or high > self.universum:
+			high = self.universum
+		if low < 0:
+			low = 0
+		if low >= high:
+			return
+		shard = low >> self._shift
+		if self._counts[shard] == 0:
+			shard = self._summary.getSuccessor(shard)
+		while shard != None and shard << self._shift < high:
+			base = shard << self._shift
+			shardLow = max(low - base, 0)
+			shardHigh = min(high - base, self._mask + 1)
+			for offset in self._call(shard, "range", shardLow, shardHigh):
+				yield base + offset
+			shard = self._summary.getSuccessor(shard)
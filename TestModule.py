@@ -1,11 +1,23 @@
+import asyncio
+import bisect
+import datetime
+import inspect
+import ipaddress
 import math
+import os
 import random
 import logging
 import sys
-import time
-from bintrees import AVLTree
-from bintrees import RBTree
+import threading
 from VEBTree import VEBTree
+from FlatVEBTree import FlatVEBTree
+from VEBMap import VEBMap
+from VEBProfiler import VEBProfiler
+from VEBKeys import KeyedVEBTree, OffsetCodec, SignedCodec, IPCodec, DatetimeCodec
+from ConcurrentVEBTree import ConcurrentVEBTree
+from ShardedVEBTree import ShardedVEBTree
+from VEBServer import VEBServer, VEBClient, HEADER, CONTAINS, RANGE, ERROR, MAX_VALUES
+from VEBBenchmark import VEBBenchmark
 
 logging.basicConfig(stream = sys.stderr, level = logging.DEBUG)
 MAXINT = 2**15
@@ -165,6 +177,8 @@ class TestModule(object):
 					True  - if universum of some subtree matches universum of the parent tree
 					False - if universum of some subtree does not match universum of the parent tree
 		"""
+		if tree.universum <= tree.leafSize:
+			return True
 		for subTree in tree.infoCluster:
 			try:
 				if subTree.universum != tree.sqrtUni:
@@ -172,7 +186,7 @@ class TestModule(object):
 			except VEBUniversumError as error:
 				print (error.message)
 				return False
-			if subTree.universum > 2:
+			if subTree.universum > subTree.leafSize:
 				self.checkSubtree(subTree)
 		return True
 	def testInitFunction(self, universum: int = None) -> bool:
@@ -188,6 +202,10 @@ class TestModule(object):
 		self.tree = VEBTree(universum, fill = True)
 		if self.tree.universum % 2 != 0:
 			return False
+		# Leaf tree stores its values in the bitmap and has neither clusters nor summary cluster
+		if self.tree.universum <= self.tree.leafSize:
+			self.tree.resetTree()
+			return True
 		try:
 			if len(self.tree.infoCluster) != self.tree.sqrtUniversum(True):
 				raise VEBClustersNumberError(self.tree.universum, len(self.tree.infoCluster), self.tree.sqrtUniversum(True))
@@ -221,7 +239,7 @@ class TestModule(object):
 			return False
 		clusterIndex = self.tree._high(value)
 		try:
-			if self.tree.getMin() != value and not self.tree.resume.containsValue(clusterIndex):
+			if self.tree.universum > self.tree.leafSize and self.tree.getMin() != value and not self.tree.resume.containsValue(clusterIndex):
 				raise VEBInsertionError(value)
 		except VEBInsertionError as error:
 			print("VEBTree could not update summary cluster after insertion value {}".format(error.value))
@@ -276,6 +294,31 @@ class TestModule(object):
 			allValues = list(range(0, self.tree.universum - 1))
 			values = list(set(allValues) - set(rightValues))
 		return values
+	def testFromSorted(self, universum: int = None) -> bool:
+		"""Checks that vEB tree built from sorted values contains exactly these values
+		Arguments:
+					universum - the size of the universum of the vEB tree
+		Return:
+					True  - if built tree contains all values and nothing else
+					False - if built tree lost some value or contains extra value
+		"""
+		if universum != None:
+			self.tree.resetTree(universum)
+		# values are guaranteed in the order
+		values = self._generateValues()
+		bulkTree = VEBTree.fromSorted(values, self.tree.universum)
+		presentValues = set(values)
+		for value in range(bulkTree.universum):
+			try:
+				if bulkTree.containsValue(value) != (value in presentValues):
+					raise VEBInsertionError(value)
+			except VEBInsertionError as error:
+				print("VEBTree built from sorted values is wrong at value {}".format(error.value))
+				return False
+		for index in range(len(values) - 1):
+			if self._checkAnswer(bulkTree.getSuccessor(values[index]), values[index + 1]) == False:
+				return False
+		return True
 	def testRemoving(self, universum: int = None, deleteValues: list = None) -> bool:
 		"""Checks correctness of removing values from tree
 		Arguments:
@@ -348,6 +391,1003 @@ class TestModule(object):
 		success = success and self._checkAnswer(answer, predecessor)
 		
 		return success
+	def testIteration(self, universum: int = None) -> bool:
+		"""Checks that iteration, reversed iteration and range walk over inserted values in the right order
+		Arguments:
+					universum - the size of the universum of the vEB tree
+		Return:
+					True  - if all walks return expected values
+					False - if some walk returns wrong values
+		"""
+		self.tree.resetTree(universum)
+		# values are guaranteed in the order
+		values = self._generateValues()
+		self.tree.insertMany(values)
+		low = self._random(values)
+		high = self._random(values)
+		if low > high:
+			low, high = high, low
+		walks = [
+			("iteration", list(self.tree), values),
+			("reversed iteration", list(reversed(self.tree)), values[::-1]),
+			("range [{}, {})".format(low, high), list(self.tree.range(low, high)), [value for value in values if low <= value < high])
+		]
+		for name, actualValues, rightValues in walks:
+			if actualValues != rightValues:
+				print("VEBTree returned wrong values during {}".format(name))
+				return False
+		return True
+	def testBatchOperations(self, universum: int = None, rounds: int = 20) -> bool:
+		"""Checks that insertMany, removeMany and containsMany give the same results as set with the same values
+		   Batches are unsorted and hold duplicates, values which are already in the tree, values out of the universum
+		   and values which are not int
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					rounds	  - quantity of batches of every kind
+		Return:
+					True  - if counts, answers and values are the same as found by set
+					False - if some result differs
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		for tree in (VEBTree(universum), VEBTree(universum, False, 8), VEBTree(universum, False, None, True)):
+			universum = tree.universum
+			model = set()
+			invalid = [-1, universum, universum + 5, None, "3", 2.0, True]
+			if tree.insertMany([]) != 0 or tree.removeMany([]) != 0 or tree.containsMany([]) != []:
+				print("VEBTree batch methods are wrong on empty batch")
+				return False
+			for index in range(rounds):
+				batch = [random.randrange(universum) for count in range(random.randint(1, 40))]
+				# Duplicates and values which are in the tree already are not counted
+				batch += batch[:5] + random.sample(sorted(model), min(5, len(model))) + invalid
+				random.shuffle(batch)
+				valid = {value for value in batch if type(value) == int and 0 <= value < universum}
+				if tree.insertMany(iter(batch)) != len(valid - model):
+					print("VEBTree insertMany returned wrong count")
+					return False
+				model |= valid
+				queries = [random.randrange(universum) for count in range(20)] + sorted(model)[:5] + invalid
+				random.shuffle(queries)
+				if tree.containsMany(iter(queries)) != [type(value) == int and value in model for value in queries]:
+					print("VEBTree containsMany returned wrong answers or order")
+					return False
+				batch = random.sample(sorted(model), len(model) // 3) + [random.randrange(universum) for count in range(10)] + invalid
+				batch += batch[:5]
+				random.shuffle(batch)
+				removed = model & {value for value in batch if type(value) == int}
+				if tree.removeMany(batch) != len(removed):
+					print("VEBTree removeMany returned wrong count")
+					return False
+				model -= removed
+				if list(tree) != sorted(model) or len(tree) != len(model):
+					print("VEBTree has wrong values after batch methods")
+					return False
+		return True
+	def testRankSelect(self, universum: int = None, operations: int = 300) -> bool:
+		"""Checks len, rank and select against sorted list while values are inserted and removed
+		   Every step queries the tree before and after the change, so the Fenwick trees of the sizes of the clusters
+		   are updated by insertValue and removeValue; they are compared with the ones built from scratch
+		Arguments:
+					universum  - the size of the universum of the vEB tree
+					operations - quantity of insertions and removals
+		Return:
+					True  - if all answers are the same as found in the sorted list
+					False - if some answer differs
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		for tree in (VEBTree(universum), VEBTree(universum, False, 8), VEBTree(universum, False, None, True)):
+			model = []
+			for index in range(operations):
+				value = random.randrange(tree.universum)
+				# Query first, so prefix sums are built for the state before the change
+				tree.rank(value)
+				tree.select(len(model) // 2)
+				if random.random() < 0.6 or not model:
+					tree.insertValue(value)
+					if value not in model:
+						bisect.insort(model, value)
+				elif random.random() < 0.5:
+					removed = random.choice(model)
+					tree.removeValue(removed)
+					model.remove(removed)
+				else:
+					batch = [random.randrange(tree.universum) for count in range(5)] + model[:3]
+					tree.removeMany(batch)
+					model = [value for value in model if value not in batch]
+				counts = tree._rankCache
+				if counts != None:
+					tree._rankCache = None
+					built = tree._rankCounts()
+					if any(counts[position] != built[position] for position in range(1, (tree.universum >> tree._lowBits) + 1)):
+						print("VEBTree returned wrong sizes of the clusters after value {}".format(value))
+						return False
+				queries = (0, tree.universum - 1, tree.universum, value, value + 1, random.randrange(tree.universum))
+				if len(tree) != len(model) or any(tree.rank(query) != bisect.bisect_left(model, query) for query in queries):
+					print("VEBTree returned wrong len or rank after value {}".format(value))
+					return False
+				positions = (0, len(model) // 2, len(model) - 1)
+				if any(tree.select(position) != (model[position] if model else None) for position in positions):
+					print("VEBTree returned wrong select after value {}".format(value))
+					return False
+			if [tree.select(position) for position in range(len(model))] != model:
+				print("VEBTree select does not walk the values in order")
+				return False
+			# Positions out of range and ranks of invalid values
+			if (tree.select(len(model)) != None or tree.select(-1) != None or tree.select(None) != None
+					or tree.rank(-1) != 0 or tree.rank(None) != None):
+				print("VEBTree returned wrong answer for position out of range")
+				return False
+		return True
+	def testSparseMode(self, universum: int = 2**48, operations: int = 2000, bytesPerValue: int = 2048) -> bool:
+		"""Checks the sparse tree with huge universum against sorted list while values are inserted and removed
+		   Values are taken at random and in runs, so some clusters hold one value and some are shared
+		Arguments:
+					universum	  - the size of the universum of the vEB tree, too big for the list of clusters
+					operations	  - quantity of insertions and removals
+					bytesPerValue - limit of memory of the tree per stored value
+		Return:
+					True  - if values, successors and predecessors are the same as found in the list
+							and memory of the tree follows the quantity of values, not the universum
+					False - if some answer differs or the tree takes too much memory
+		"""
+		tree = VEBTree(universum, False, None, True)
+		universum = tree.universum
+		# Every node may keep one empty cluster for the next values, so few paths of nodes are allowed above the limit
+		levels = math.ceil(math.log2(math.log2(universum)))
+		model = []
+		for index in range(operations):
+			if random.random() < 0.6 or not model:
+				if random.random() < 0.02:
+					value = random.choice((0, universum - 1))
+				elif random.random() < 0.5:
+					value = min(random.choice(model or [0]) + random.randint(1, 64), universum - 1)
+				else:
+					value = random.randrange(universum)
+				if tree.insertValue(value) == False:
+					print("Sparse tree did not insert value {}".format(value))
+					return False
+				position = bisect.bisect_left(model, value)
+				if position == len(model) or model[position] != value:
+					model.insert(position, value)
+			else:
+				value = model.pop(random.randrange(len(model)))
+				if tree.removeValue(value) == False:
+					print("Sparse tree did not remove value {}".format(value))
+					return False
+			queries = (0, universum - 1, value - 1, value, value + 1, random.randrange(universum))
+			for query in queries:
+				if query < 0 or query >= universum:
+					continue
+				position = bisect.bisect_right(model, query)
+				successor = model[position] if position < len(model) else None
+				position = bisect.bisect_left(model, query)
+				predecessor = model[position - 1] if position > 0 else None
+				if tree.getSuccessor(query) != successor or tree.getPredecessor(query) != predecessor:
+					print("Sparse tree returned wrong neighbours of value {}".format(query))
+					return False
+			if len(tree) != len(model):
+				print("Sparse tree has {} values instead of {}".format(len(tree), len(model)))
+				return False
+			if index % 200 == 0 and tree.memoryUsage()["bytes"] > bytesPerValue * (len(model) + levels):
+				print("Sparse tree takes more than {} bytes per value".format(bytesPerValue))
+				return False
+		if list(tree) != model:
+			print("Sparse tree has wrong values")
+			return False
+		# Empty clusters are freed, only nodes on the way to the last touched clusters may stay
+		tree.removeMany(model)
+		if tree.memoryUsage()["nodes"] > 4 * levels:
+			print("Sparse tree keeps clusters after all values were removed")
+			return False
+		return True
+	def testBoundaryUniversums(self) -> bool:
+		"""Checks the least and the biggest values of universums whose power of 2 is odd or split into unequal parts
+		   Odd powers give clusters and summary clusters of different sizes, so the last value of the universum
+		   has the biggest cluster index and the biggest offset at once
+		Return:
+					True  - if both edge values are stored, found and removed in both orders of insertion
+					False - if some answer is wrong
+		"""
+		# universum, leafSize, sparse, split
+		settings = ((2**1, 2, False, None), (2**3, 2, False, None), (2**3, 2, False, (1, 2)), (2**3, None, False, None),
+			(2**5, 2, False, (3, 2)), (2**65, None, True, None), (2**65, 2, True, None), (2**65, None, True, (5, 60)))
+		for universum, leafSize, sparse, split in settings:
+			for order in ((0, universum - 1), (universum - 1, 0)):
+				tree = VEBTree(universum, False, leafSize, sparse, split)
+				for value in order:
+					tree.insertValue(value)
+				last = universum - 1
+				answers = (tree.universum, list(tree), len(tree), tree.getMin(), tree.getMax(), tree.containsValue(0), tree.containsValue(last),
+					tree.getSuccessor(0), tree.getPredecessor(last), tree.getSuccessor(last), tree.getPredecessor(0),
+					tree.rank(last), tree.select(1), tree.insertValue(universum), tree.insertValue(-1))
+				expected = (universum, [0, last], 2, 0, last, True, True, last, 0, None, None, 1, last, False, False)
+				if universum > 2:
+					answers += (tree.containsValue(1), tree.containsValue(last - 1), tree.getSuccessor(1), tree.getPredecessor(last - 1))
+					expected += (False, False, last, 0)
+				if answers != expected:
+					print("VEBTree with universum 2^{} and split {} returned wrong answers at its edges".format(universum.bit_length() - 1, split))
+					return False
+				tree.removeValue(order[0])
+				if list(tree) != [order[1]] or tree.getMin() != order[1] or tree.getMax() != order[1] or tree.getSuccessor(0) != (last if order[1] == last else None):
+					print("VEBTree with universum 2^{} and split {} lost its edge value".format(universum.bit_length() - 1, split))
+					return False
+				tree.removeValue(order[1])
+				if len(tree) != 0 or tree.getMin() != None or tree.getMax() != None or tree.getPredecessor(last) != None:
+					print("VEBTree with universum 2^{} and split {} is not empty".format(universum.bit_length() - 1, split))
+					return False
+		return True
+	def testMemoryUsage(self, universum: int = None, size: int = 50) -> bool:
+		"""Checks that nodes have no __dict__ and memoryUsage counts every node of the tree on its level
+		   Nodes are counted again by the walk through clusters and summary clusters
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					size	  - quantity of inserted values
+		Return:
+					True  - if memoryUsage agrees with the walk and the totals agree with the levels
+					False - if some number is wrong
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		trees = (VEBTree(universum, True), VEBTree(universum), VEBTree(universum, False, 4), VEBTree(universum, False, None, True), VEBMap(universum))
+		values = [random.randrange(trees[0].universum) for index in range(size)]
+		for tree in trees:
+			if tree.isSparse() and tree.memoryUsage()["nodes"] != 1:
+				print("Empty sparse tree has more than one node")
+				return False
+			tree.insertMany(values)
+			if hasattr(tree, "__dict__"):
+				print("{} node has __dict__ instead of __slots__".format(type(tree).__name__))
+				return False
+			usage = tree.memoryUsage()
+			levels = []
+			stack = [(tree, 0)]
+			while stack:
+				node, level = stack.pop()
+				if hasattr(node, "__dict__"):
+					print("Cluster has __dict__ instead of __slots__")
+					return False
+				if level == len(levels):
+					levels.append(0)
+				levels[level] += 1
+				if node.universum > node.leafSize:
+					stack.extend((cluster, level + 1) for index, cluster in node._clusters() if cluster != None)
+				if node.resume != None:
+					stack.append((node.resume, level + 1))
+			if (set(usage) != {"nodes", "bytes", "levels"} or [level["nodes"] for level in usage["levels"]] != levels
+					or usage["nodes"] != sum(levels) or usage["bytes"] != sum(level["bytes"] for level in usage["levels"])
+					or usage["levels"][0]["bytes"] < sys.getsizeof(tree) or min(level["bytes"] for level in usage["levels"]) <= 0):
+				print("memoryUsage of {} does not match its nodes".format(type(tree).__name__))
+				return False
+		# Lazy clusters are created for the values only, filled ones are all there
+		if trees[1].memoryUsage()["nodes"] > trees[0].memoryUsage()["nodes"]:
+			print("Lazy tree has more nodes than filled one")
+			return False
+		return True
+	def testDeepTree(self, operations: int = 500, frames: int = 25) -> bool:
+		"""Checks point operations on the tree with universum 2^64 which addresses one bit on every level, 63 levels deep
+		   The operations run with the recursion limit only a few frames above the current depth,
+		   so the descent through the levels and summary clusters should go in loops, not in recursive calls
+		Arguments:
+					operations - quantity of insertions and removals
+					frames	   - quantity of frames which the operations may use
+		Return:
+					True  - if answers are the same as found in the sorted list
+					False - if some answer differs or the operation hit the recursion limit
+		"""
+		tree = VEBTree(2**64, False, 2, True, (1,) * 63)
+		depth = 0
+		node = tree
+		while node.universum > node.leafSize:
+			node = node._newTree(node.sqrtUni)
+			depth += 1
+		if depth <= frames:
+			print("Deep tree has only {} levels".format(depth))
+			return False
+		model = []
+		# Every node keeps its least value, so only values which share the long prefix with many others reach the deep levels
+		window = random.randrange(2**64 - 256)
+		limit = sys.getrecursionlimit()
+		sys.setrecursionlimit(len(inspect.stack()) + frames)
+		try:
+			for index in range(operations):
+				value = random.choice((0, 2**64 - 1, random.getrandbits(64)) + (window + random.randrange(256),) * 7)
+				position = bisect.bisect_left(model, value)
+				present = position < len(model) and model[position] == value
+				if random.random() < 0.7:
+					tree.insertValue(value)
+					if present == False:
+						model.insert(position, value)
+				elif model:
+					value = model.pop(random.randrange(len(model)))
+					tree.removeValue(value)
+				position = bisect.bisect_right(model, value)
+				successor = model[position] if position < len(model) else None
+				position = bisect.bisect_left(model, value)
+				predecessor = model[position - 1] if position > 0 else None
+				answers = (tree.containsValue(value), tree.getSuccessor(value), tree.getPredecessor(value), tree.getMin(), tree.getMax())
+				if answers != (value in model[position:position + 1], successor, predecessor, (model or [None])[0], (model or [None])[-1]):
+					print("Deep tree returned wrong answers for value {}".format(value))
+					return False
+		except RecursionError:
+			print("Deep tree operation hit the recursion limit")
+			return False
+		finally:
+			sys.setrecursionlimit(limit)
+		if list(tree) != model:
+			print("Deep tree has wrong values")
+			return False
+		return True
+	def testDumpLoad(self, universum: int = None, path: str = "veb_dump.bin") -> bool:
+		"""Checks that the vEB tree written by dump is read back by load and by the memory-mapped view with both encodings
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					path	  - path of the temporary file
+		Return:
+					True  - if loaded trees contain the same values and answer the same queries
+					False - if some loaded tree differs
+		"""
+		self.tree.resetTree(universum)
+		values = self._generateValues()
+		self.tree.insertMany(values)
+		queries = [self._random() for index in range(len(values))]
+		try:
+			for encoding in ("bitmap", "keys"):
+				self.tree.dump(path, encoding)
+				if list(VEBTree.load(path)) != values:
+					print("VEBTree loaded from {} encoding has wrong values".format(encoding))
+					return False
+				with VEBTree.load(path, readOnly = True) as mappedTree:
+					for value in queries:
+						if (mappedTree.containsValue(value) != self.tree.containsValue(value)
+								or mappedTree.getSuccessor(value) != self.tree.getSuccessor(value)
+								or mappedTree.getPredecessor(value) != self.tree.getPredecessor(value)):
+							print("Memory-mapped VEBTree with {} encoding answers wrong at value {}".format(encoding, value))
+							return False
+		finally:
+			if os.path.exists(path):
+				os.remove(path)
+		return True
+	def testFlatTree(self, universum: int = None) -> bool:
+		"""Checks that FlatVEBTree gives the same answers as VEBTree after the same insertions and removals
+		Arguments:
+					universum - the size of the universum of the trees
+		Return:
+					True  - if both trees give the same answers
+					False - if some answer differs
+		"""
+		self.tree.resetTree(universum)
+		flatTree = FlatVEBTree(self.tree.universum)
+		values = self._generateValues()
+		self.tree.insertMany(values)
+		flatTree.insertMany(values)
+		deleteValues = values[::3]
+		self.tree.removeMany(deleteValues)
+		flatTree.removeMany(deleteValues)
+		if list(flatTree) != list(self.tree) or len(flatTree) != len(self.tree):
+			print("FlatVEBTree contains wrong values")
+			return False
+		for index in range(len(values)):
+			value = self._random()
+			if (flatTree.containsValue(value) != self.tree.containsValue(value)
+					or flatTree.getSuccessor(value) != self.tree.getSuccessor(value)
+					or flatTree.getPredecessor(value) != self.tree.getPredecessor(value)
+					or flatTree.rank(value) != self.tree.rank(value)):
+				print("FlatVEBTree answers wrong at value {}".format(value))
+				return False
+		return True
+	def testArrayQueries(self, universum: int = None) -> bool:
+		"""Checks that numpy array queries give the same answers as queries of single values
+		Arguments:
+					universum - the size of the universum of the vEB tree
+		Return:
+					True  - if all answers are the same
+					False - if some answer differs
+					None  - if numpy is not installed
+		"""
+		try:
+			import numpy
+		except ImportError:
+			return None
+		self.tree.resetTree(universum)
+		self.tree.insertMany(self._generateValues())
+		# Sparse tree whose universum would need 128 GiB as a bitmap is queried through its values
+		sparseTree = VEBTree(1 << 40, False, None, True)
+		sparseTree.insertMany([0, 5, 1 << 20, (1 << 39) + 7, (1 << 40) - 1])
+		trees = ((self.tree, [self._random() for index in range(100)]),
+			(sparseTree, [-1, 0, 1, 5, 6, 1 << 20, 1 << 39, (1 << 39) + 7, (1 << 40) - 2, (1 << 40) - 1, 1 << 40]))
+		for tree, queries in trees:
+			arrays = (tree.containsArray(numpy.array(queries)), tree.successorArray(numpy.array(queries)), tree.predecessorArray(numpy.array(queries)))
+			for index, value in enumerate(queries):
+				successor = tree.getSuccessor(value)
+				predecessor = tree.getPredecessor(value)
+				if (arrays[0][index] != tree.containsValue(value)
+						or arrays[1][index] != (-1 if successor == None else successor)
+						or arrays[2][index] != (-1 if predecessor == None else predecessor)):
+					print("Array query answers wrong at value {} of universum {}".format(value, tree.universum))
+					return False
+		try:
+			VEBTree(1 << 64, False, None, True).containsArray(numpy.array([5]))
+			print("Array query of universum 2^64 should raise ValueError")
+			return False
+		except ValueError:
+			pass
+		# Levels of words are packed only for FlatVEBTree, VEBTree is queried through its values
+		from VEBNumpy import packLevels
+		try:
+			packLevels(sparseTree)
+			print("Packing levels of VEBTree should raise TypeError")
+			return False
+		except TypeError:
+			pass
+		return True
+	def testMap(self, universum: int = None, operations: int = 2000) -> bool:
+		"""Checks that VEBMap keeps the same payloads as dict while keys are inserted and removed
+		Arguments:
+					universum  - the size of the universum of the vEB tree
+					operations - quantity of insertions and removals
+		Return:
+					True  - if payloads, floor and ceiling items are the same as found in dict
+					False - if some answer differs
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		vebMap = VEBMap(universum)
+		universum = vebMap.universum
+		payloads = {}
+		for index in range(operations):
+			key = random.randrange(universum)
+			if random.random() < 0.6:
+				vebMap[key] = index
+				payloads[key] = index
+			elif vebMap.pop(key, None) != payloads.pop(key, None):
+				print("VEBMap returned wrong payload for key {}".format(key))
+				return False
+		if list(vebMap.items()) != sorted(payloads.items()):
+			print("VEBMap has wrong items")
+			return False
+		for key in range(0, universum, max(1, universum // 100)):
+			lower = [item for item in payloads.items() if item[0] <= key]
+			upper = [item for item in payloads.items() if item[0] >= key]
+			if vebMap.get(key) != payloads.get(key) or vebMap.floorItem(key) != max(lower, default = None) or vebMap.ceilingItem(key) != min(upper, default = None):
+				print("VEBMap returned wrong answers for key {}".format(key))
+				return False
+		# Set operations work on keys: union takes payloads of the other map, intersection and difference keep own payloads
+		otherMap = VEBMap(universum)
+		otherPayloads = {}
+		for index in range(operations // 4):
+			key = random.randrange(universum)
+			otherMap[key] = -index
+			otherPayloads[key] = -index
+		copied = vebMap.copy()
+		copied[0] = "copied"
+		if type(copied) != VEBMap or list(vebMap.items()) != sorted(payloads.items()) or copied[0] != "copied":
+			print("VEBMap copy is not independent")
+			return False
+		results = ((vebMap | otherMap, {**payloads, **otherPayloads}),
+			(vebMap & otherMap, {key: payload for key, payload in payloads.items() if key in otherPayloads}),
+			(vebMap - otherMap, {key: payload for key, payload in payloads.items() if key not in otherPayloads}))
+		for result, expected in results:
+			if type(result) != VEBMap or list(result.items()) != sorted(expected.items()) or len(result) != len(expected):
+				print("VEBMap set operation returned wrong items")
+				return False
+		otherTree = VEBTree(universum)
+		otherTree.insertMany(otherPayloads)
+		added = copied.unionUpdate(otherTree)
+		expected = {**{key: None for key in otherPayloads}, **payloads, 0: "copied"}
+		if added != len(expected) - len(payloads) - (0 not in payloads) or list(copied.items()) != sorted(expected.items()):
+			print("VEBMap union with VEBTree replaced payloads")
+			return False
+		return True
+	def testSetOperations(self, universum: int = None, size: int = 300) -> bool:
+		"""Checks that union, intersection and difference of two trees have the same values as the operations of sets
+		   Values are taken by runs, so some clusters are shared by both trees and some belong to one of them
+		Arguments:
+					universum - the size of the universum of the vEB trees
+					size	  - quantity of values of every tree
+		Return:
+					True  - if results of all operations are the same as found by sets
+					False - if some result differs
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		trees = []
+		sets = []
+		for index in range(2):
+			values = set()
+			while len(values) < min(size, universum // 2):
+				start = random.randrange(universum)
+				values.update(range(start, min(start + random.randint(1, 16), universum)))
+			trees.append(VEBTree.fromSorted(sorted(values), universum))
+			sets.append(values)
+		first, second = trees
+		results = ((first | second, sets[0] | sets[1]), (first & second, sets[0] & sets[1]), (first - second, sets[0] - sets[1]), (second - first, sets[1] - sets[0]))
+		for tree, values in results:
+			if list(tree) != sorted(values) or len(tree) != len(values) or tree.getMin() != min(values, default = None) or tree.getMax() != max(values, default = None):
+				print("Set operation returned wrong values")
+				return False
+		if list(first) != sorted(sets[0]) or list(second) != sorted(sets[1]):
+			print("Set operation changed its arguments")
+			return False
+		return True
+	def testClear(self, universum: int = None, size: int = 300) -> bool:
+		"""Checks that cleared tree is empty, keeps its snapshot unchanged and stores new values after that
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					size	  - quantity of inserted values
+		Return:
+					True  - if cleared tree and its snapshot have expected values
+					False - if some value is wrong
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		tree = VEBTree(universum, True)
+		values = sorted(set(random.randrange(tree.universum) for index in range(size)))
+		tree.insertMany(values)
+		snapshot = tree.snapshot()
+		tree.insertValue(random.randrange(tree.universum))
+		tree.clear()
+		if len(tree) != 0 or tree.getMin() != None or tree.getMax() != None or list(tree) != [] or tree.getSuccessor(0) != None:
+			print("Cleared tree is not empty")
+			return False
+		if list(snapshot) != values:
+			print("Clear changed the snapshot")
+			return False
+		newValues = sorted(set(random.randrange(tree.universum) for index in range(size)))
+		for value in newValues:
+			tree.insertValue(value)
+		if list(tree) != newValues or len(tree) != len(newValues):
+			print("Cleared tree stored wrong values")
+			return False
+		return True
+	def testProfiler(self, universum: int = None, operations: int = 500) -> bool:
+		"""Checks that profiled tree gives the same answers as the tree without the profiler, counts every call at the root
+		   and gets its methods back
+		Arguments:
+					universum  - the size of the universum of the vEB tree
+					operations - quantity of insertions and queries
+		Return:
+					True  - if answers and counters are correct and VEBTree has its methods after the profiler
+					False - if something differs
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		insertValue = VEBTree.insertValue
+		tree = VEBTree(universum)
+		values = set()
+		with VEBProfiler() as profiler:
+			for index in range(operations):
+				value = random.randrange(tree.universum)
+				tree.insertValue(value)
+				values.add(value)
+				if tree.getSuccessor(value) != min((stored for stored in values if stored > value), default = None):
+					print("Profiled tree returned wrong successor of {}".format(value))
+					return False
+		stats = profiler.stats()
+		if stats["insertValue"][0]["calls"] != operations or stats["getSuccessor"][0]["calls"] != operations:
+			print("Profiler counted wrong quantity of calls")
+			return False
+		if sum(level["allocations"] for level in stats["insertValue"].values()) == 0 and tree.universum > tree.leafSize:
+			print("Profiler did not count new clusters")
+			return False
+		if VEBTree.insertValue is not insertValue or list(tree) != sorted(values):
+			print("Profiler did not restore VEBTree")
+			return False
+		# The same random workload should give the same answers and the same trees with the profiler and without it
+		seed = random.randrange(1 << 30)
+		results = []
+		for profiled in (False, True):
+			workload = random.Random(seed)
+			tree = VEBTree(universum)
+			if profiled:
+				profiler = VEBProfiler()
+				profiler.start()
+			try:
+				answers = []
+				for index in range(operations):
+					value = workload.randrange(tree.universum)
+					operation = workload.randrange(6)
+					if operation == 0 or operation == 1:
+						answers.append(tree.insertValue(value))
+					elif operation == 2:
+						answers.append(tree.removeValue(value))
+					elif operation == 3:
+						answers.append(tree.getSuccessor(value))
+					elif operation == 4:
+						answers.append(tree.getPredecessor(value))
+					else:
+						answers.append(tree.containsValue(value))
+				answers.append(tree.removeMany(workload.randrange(tree.universum) for index in range(operations // 4)))
+			finally:
+				if profiled:
+					profiler.stop()
+			results.append((answers, list(tree), len(tree), tree.memoryUsage()))
+		if results[0] != results[1]:
+			print("Profiled tree answered differently or has different values")
+			return False
+		return True
+	def testSplitPolicy(self, universum: int = None, operations: int = 500) -> bool:
+		"""Checks that trees with the fixed schedule of bits and with the chosen one keep the same values as the tree with halves
+		Arguments:
+					universum  - the size of the universum of the vEB trees
+					operations - quantity of insertions and removals
+		Return:
+					True  - if all trees have the same values and successors and the root of the fixed schedule has its clusters
+					False - if something differs
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		power = VEBTree(universum).universum.bit_length() - 1
+		values = sorted(set(random.randrange(1 << power) for index in range(operations)))
+		trees = [VEBTree.fromSorted(values, universum), VEBTree.fromSorted(values, universum, split = "auto"),
+			VEBTree.fromSorted(values, universum, split = (power - power // 3,))]
+		if power > 2 and trees[2]._lowBits != power // 3:
+			print("Root of the fixed schedule has wrong clusters")
+			return False
+		for index in range(operations):
+			value = random.randrange(1 << power)
+			if random.random() < 0.5:
+				results = [tree.insertValue(value) for tree in trees]
+			else:
+				results = [tree.removeValue(value) for tree in trees]
+			results += [tree.getSuccessor(value) for tree in trees]
+			if results[:3] != results[:1] * 3 or results[3:] != results[3:4] * 3:
+				print("Trees with different split policies answered differently for {}".format(value))
+				return False
+		if list(trees[1]) != list(trees[0]) or list(trees[2]) != list(trees[0]):
+			print("Trees with different split policies have different values")
+			return False
+		return True
+	def testClusterRelease(self, universum: int = None, window: int = 200, steps: int = 20) -> bool:
+		"""Checks that sliding window of values does not make the sparse tree grow
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					window	  - quantity of values in the window
+					steps	  - quantity of moves of the window
+		Return:
+					True  - if the tree has the values of the window and the quantity of its nodes does not grow
+					False - if some value is wrong or empty clusters are kept
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		tree = VEBTree(universum, False, None, True)
+		stride = max(1, tree.universum // (window * (steps + 2)))
+		values = list(range(0, window * stride, stride))
+		tree.insertMany(values)
+		nodes = None
+		for step in range(steps):
+			newValues = [value + window * stride for value in values]
+			newValues = [value for value in newValues if value < tree.universum]
+			for value in newValues:
+				tree.insertValue(value)
+			for value in values:
+				tree.removeValue(value)
+			values = newValues
+			if list(tree) != values:
+				print("Tree has wrong values after move {}".format(step))
+				return False
+			if step == 1:
+				nodes = tree.memoryUsage()["nodes"]
+			elif step > 1 and tree.memoryUsage()["nodes"] > 2 * nodes:
+				print("Empty clusters are kept: {} nodes instead of {}".format(tree.memoryUsage()["nodes"], nodes))
+				return False
+		return True
+	def testKeyCodecs(self, operations: int = 300) -> bool:
+		"""Checks that trees with signed, timestamp, IP address and datetime keys keep the order of the keys
+		Arguments:
+					operations - quantity of inserted keys for every codec
+		Return:
+					True  - if every tree has the inserted keys in ascending order and finds their successors
+					False - if some key is wrong
+		"""
+		base = datetime.datetime(2024, 1, 1)
+		cases = [(SignedCodec(16), lambda: random.randrange(-2**15, 2**15)),
+			(OffsetCodec(1700000000 * 10**9, 40), lambda: 1700000000 * 10**9 + random.randrange(2**40)),
+			(IPCodec(4), lambda: ipaddress.IPv4Address(random.randrange(2**32))),
+			(DatetimeCodec(base, datetime.timedelta(seconds = 1), 32), lambda: base + datetime.timedelta(seconds = random.randrange(2**32)))]
+		for codec, newKey in cases:
+			tree = KeyedVEBTree(codec, sparse = True)
+			keys = [newKey() for index in range(operations)]
+			tree.insertMany(keys[:operations // 2])
+			for key in keys[operations // 2:]:
+				tree.insertValue(key)
+			keys = sorted(set(keys))
+			if list(tree) != keys or tree.getMin() != keys[0] or tree.getMax() != keys[-1]:
+				print("{} tree has wrong keys".format(type(codec).__name__))
+				return False
+			for index in range(len(keys) - 1):
+				if tree.getSuccessor(keys[index]) != keys[index + 1] or tree.getPredecessor(keys[index + 1]) != keys[index]:
+					print("{} tree has wrong successor of {}".format(type(codec).__name__, keys[index]))
+					return False
+			if tree.insertValue("key") != False or tree.containsMany([keys[0], None]) != [True, False]:
+				print("{} tree accepted invalid key".format(type(codec).__name__))
+				return False
+		# Trees with the default arguments take the universum of the codec and choose the mode themselves
+		for codec, low, high in ((SignedCodec(), -2**63, 2**63 - 1), (IPCodec(6), ipaddress.IPv6Address(0), ipaddress.IPv6Address(2**128 - 1)),
+				(IPCodec(4), ipaddress.IPv4Address("0.0.0.0"), ipaddress.IPv4Address("255.255.255.255"))):
+			tree = KeyedVEBTree(codec)
+			if tree.insertMany([high, low]) != 2 or list(tree) != [low, high] or tree.getSuccessor(low) != high or tree.getPredecessor(high) != low:
+				print("{} tree with the default arguments has wrong keys".format(type(codec).__name__))
+				return False
+		return True
+	def testGrowUniversum(self, universum: int = None, size: int = 300) -> bool:
+		"""Checks that growing and shrinking of the universum and the tree with autoGrow keep values and payloads
+		Arguments:
+					universum - the size of the universum of the vEB tree before the growth
+					size	  - quantity of inserted values
+		Return:
+					True  - if the trees have all inserted values after every change of the universum
+					False - if some value or payload is wrong
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		for sparse in (False, True):
+			tree = VEBTree(universum, False, None, sparse)
+			values = set(random.randrange(tree.universum) for index in range(size))
+			tree.insertMany(values)
+			bigUniversum = tree.growUniversum(tree.universum << 8)
+			if bigUniversum != tree.universum or list(tree) != sorted(values):
+				print("Grown tree has wrong values")
+				return False
+			newValues = set(random.randrange(bigUniversum) for index in range(size))
+			for value in newValues:
+				tree.insertValue(value)
+			values |= newValues
+			if list(tree) != sorted(values) or tree.getSuccessor(min(values)) != sorted(values)[1]:
+				print("Grown tree stored wrong values")
+				return False
+			tree.removeMany(value for value in newValues if value >= universum)
+			values = set(value for value in values if value < universum)
+			if tree.shrinkUniversum() > universum or list(tree) != sorted(values):
+				print("Shrunk tree has wrong values")
+				return False
+		growing = VEBMap(2, autoGrow = True)
+		keys = sorted(set(random.randrange(universum * 1024) for index in range(size)))
+		for key in keys:
+			growing[key] = -key
+		if list(growing) != keys or list(growing.values()) != [-key for key in keys] or growing.universum <= keys[-1]:
+			print("Map with autoGrow has wrong keys or payloads")
+			return False
+		# Tree in the list mode grows far beyond its universum, roots with long lists of clusters keep them sparse
+		growing = VEBTree(2**10, autoGrow = True)
+		keys = [5, 2**10 - 1, 2**20 + 3, 2**40, 2**40 + 1, 2**64 - 1, 2**64, 2**100 + 7]
+		for key in keys:
+			if growing.insertValue(key) != True:
+				print("Tree with autoGrow did not insert key {}".format(key))
+				return False
+		if (list(growing) != keys or growing.universum <= keys[-1] or growing.getSuccessor(2**40) != 2**40 + 1
+				or growing.getPredecessor(2**64) != 2**64 - 1 or growing.memoryUsage()["bytes"] > 2**20):
+			print("Tree with autoGrow has wrong values or takes too much memory after growth to 2^{}".format(growing.universum.bit_length() - 1))
+			return False
+		# The profiler runs its own copy of insertValue, which should grow the universum too
+		growing = VEBTree(16, autoGrow = True)
+		with VEBProfiler():
+			inserted = growing.insertValue(universum * 64)
+		if inserted != True or growing.universum <= universum * 64 or growing.containsValue(universum * 64) != True:
+			print("Tree with autoGrow did not grow under the profiler")
+			return False
+		return True
+	def testConcurrent(self, universum: int = None, readers: int = 4, writers: int = 2, operations: int = 2000) -> bool:
+		"""Checks that readers of ConcurrentVEBTree see stored values while writers insert and remove other values
+		   Even values stay in the tree, writers insert and remove odd values, so successor of the even value is the next value
+		Arguments:
+					universum  - the size of the universum of the vEB tree
+					readers	   - quantity of reader threads
+					writers	   - quantity of writer threads
+					operations - quantity of queries of every reader
+		Return:
+					True  - if all readers got right answers and the tree keeps only even values at the end
+					False - if some reader got wrong answer
+		"""
+		self.tree.resetTree(universum)
+		if self.tree.universum < 4:
+			# At least two even values are needed
+			self.tree.resetTree(4)
+		tree = ConcurrentVEBTree(tree = self.tree)
+		universum = tree.universum
+		values = list(range(0, universum, 2))
+		tree.insertMany(values)
+		errors = []
+		stop = threading.Event()
+		def write() -> None:
+			while not stop.is_set():
+				value = random.randrange(1, universum, 2)
+				tree.insertValue(value)
+				tree.removeValue(value)
+		def read() -> None:
+			for index in range(operations):
+				value = random.randrange(0, universum - 2, 2)
+				if tree.getSuccessor(value) not in (value + 1, value + 2) or tree.containsValue(value) == False:
+					errors.append(value)
+		writerThreads = [threading.Thread(target = write) for number in range(writers)]
+		readerThreads = [threading.Thread(target = read) for number in range(readers)]
+		for thread in writerThreads + readerThreads:
+			thread.start()
+		for thread in readerThreads:
+			thread.join()
+		stop.set()
+		for thread in writerThreads:
+			thread.join()
+		if errors or list(tree) != values:
+			print("ConcurrentVEBTree returned wrong answers for values {}".format(errors[:10]))
+			return False
+		return True
+	def testSnapshot(self, universum: int = None, snapshots: int = 5, changes: int = 200) -> bool:
+		"""Checks that snapshots keep their values while the tree changes after them
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					snapshots - quantity of taken snapshots
+					changes	  - quantity of insertions and removals between snapshots
+		Return:
+					True  - if every snapshot returns values which the tree had when the snapshot was taken
+					False - if some snapshot has changed
+		"""
+		self.tree.resetTree(universum)
+		universum = self.tree.universum
+		self.tree.insertMany(random.randrange(universum) for index in range(universum // 2))
+		taken = []
+		for number in range(snapshots):
+			taken.append((self.tree.snapshot(), list(self.tree)))
+			for index in range(changes):
+				if random.random() < 0.5:
+					self.tree.insertValue(random.randrange(universum))
+				else:
+					self.tree.removeValue(random.randrange(universum))
+			self.tree.removeMany(random.randrange(universum) for index in range(changes))
+		for snapshot, values in taken:
+			if list(snapshot) != values or len(snapshot) != len(values):
+				print("Snapshot has changed: {} values instead of {}".format(len(snapshot), len(values)))
+				return False
+			if values and (snapshot.getMin() != values[0] or snapshot.getSuccessor(values[0]) != (values[1] if len(values) > 1 else None)):
+				print("Snapshot returned wrong answers")
+				return False
+		return True
+	def testMapSnapshot(self, universum: int = None, snapshots: int = 5, changes: int = 200) -> bool:
+		"""Checks that snapshots of VEBMap keep their items while keys are stored, replaced and removed after them
+		Arguments:
+					universum - the size of the universum of the vEB tree
+					snapshots - quantity of taken snapshots
+					changes	  - quantity of changes between snapshots
+		Return:
+					True  - if every snapshot returns items which the map had when the snapshot was taken
+					False - if some snapshot has changed
+		"""
+		if universum == None:
+			universum = self.tree.universum
+		vebMap = VEBMap(universum, False, 8)
+		for key in range(0, vebMap.universum, 3):
+			vebMap[key] = key
+		taken = []
+		for number in range(snapshots):
+			taken.append((vebMap.snapshot(), list(vebMap.items())))
+			for index in range(changes):
+				key = random.randrange(vebMap.universum)
+				if random.random() < 0.6:
+					# Payloads of the keys which are in the map already are replaced in the leaves and in minElement
+					vebMap[key] = (number, index)
+				else:
+					vebMap.pop(key, None)
+		for snapshot, items in taken:
+			if list(snapshot.items()) != items or len(snapshot) != len(items):
+				print("Snapshot of VEBMap has changed: {} items instead of {}".format(len(snapshot), len(items)))
+				return False
+			if any(snapshot.get(key) != payload or snapshot.floorItem(key) != (key, payload) for key, payload in items):
+				print("Snapshot of VEBMap returned wrong payloads")
+				return False
+			if list(snapshot.toTree().items()) != items:
+				print("Snapshot of VEBMap gave wrong copy")
+				return False
+		return True
+	def testSharded(self, universum: int = None, shards: int = 4, operations: int = 500) -> bool:
+		"""Checks that ShardedVEBTree gives the same answers as the VEBTree object with the same values
+		Arguments:
+					universum  - the size of the universum of the vEB tree
+					shards	   - quantity of shards
+					operations - quantity of checked queries
+		Return:
+					True  - if all answers are the same
+					False - if some answer differs
+		"""
+		self.tree.resetTree(universum)
+		universum = self.tree.universum
+		values = [random.randrange(universum) for index in range(universum // 4 + 1)]
+		self.tree.insertMany(values)
+		with ShardedVEBTree(universum, shards) as sharded:
+			sharded.insertMany(values)
+			for index in range(operations):
+				value = random.randrange(universum)
+				if random.random() < 0.2:
+					if sharded.insertValue(value) != self.tree.insertValue(value):
+						print("Insertion of {} differs".format(value))
+						return False
+				elif random.random() < 0.2:
+					if sharded.removeValue(value) != self.tree.removeValue(value):
+						print("Removing of {} differs".format(value))
+						return False
+				answers = (sharded.containsValue(value), sharded.getSuccessor(value), sharded.getPredecessor(value), sharded.rank(value))
+				if answers != (self.tree.containsValue(value), self.tree.getSuccessor(value), self.tree.getPredecessor(value), self.tree.rank(value)):
+					print("ShardedVEBTree returned wrong answers {} for value {}".format(answers, value))
+					return False
+			queries = [random.randrange(universum) for index in range(operations)]
+			if sharded.containsMany(queries) != self.tree.containsMany(queries) or list(sharded) != list(self.tree):
+				print("ShardedVEBTree has wrong values")
+				return False
+			# The first shard fails (int is not iterable), the answers of the others should still be read from the pipes
+			groups = {shard: ([0] if shard else 0, [shard]) for shard in range(sharded.shards)}
+			try:
+				sharded._fanOut("containsMany", groups)
+				print("ShardedVEBTree did not raise the error of the shard")
+				return False
+			except TypeError:
+				pass
+			if sharded.containsMany(queries) != self.tree.containsMany(queries) or [sharded.rank(value) for value in queries[:20]] != [self.tree.rank(value) for value in queries[:20]]:
+				print("ShardedVEBTree returned stale answers after the error of the shard")
+				return False
+			# Calls without values (like clear) go through the same fan out: the first shard gets no argument and fails
+			groups = {shard: None if shard == 0 else ([0], [shard]) for shard in range(sharded.shards)}
+			try:
+				sharded._fanOut("containsMany", groups)
+				print("ShardedVEBTree did not raise the error of the shard")
+				return False
+			except TypeError:
+				pass
+			sharded.clear()
+			if len(sharded) != 0 or list(sharded) != [] or any(sharded.containsMany(queries)) or sharded.getMin() != None:
+				print("ShardedVEBTree is not empty after clear")
+				return False
+			sharded.insertMany(queries)
+			if list(sharded) != sorted(set(queries)):
+				print("ShardedVEBTree has wrong values after clear")
+				return False
+		return True
+	def testServer(self, universum: int = None, operations: int = 200) -> bool:
+		"""Checks that VEBClient gets the same answers from VEBServer on localhost as the VEBTree object gives
+		   Queries are sent at once, so they are pipelined through one connection
+		Arguments:
+					universum  - the size of the universum of the vEB tree
+					operations - quantity of checked queries
+		Return:
+					True  - if all answers are the same
+					False - if some answer differs
+		"""
+		self.tree.resetTree(universum)
+		universum = self.tree.universum
+		values = [random.randrange(universum) for index in range(universum // 4 + 1)]
+		expected = VEBTree.fromSorted(sorted(set(values)), universum)
+		queries = [random.randrange(universum) for index in range(operations)]
+		async def check() -> bool:
+			server = VEBServer(self.tree)
+			port = await server.start("127.0.0.1", 0)
+			client = await VEBClient.connect("127.0.0.1", port)
+			await client.insertMany(values)
+			answers = await asyncio.gather(*[client.getSuccessor(value) for value in queries], *[client.getPredecessor(value) for value in queries])
+			contained = await client.containsMany(queries)
+			stored = await client.range()
+			# Failed request gets its own error, the next requests of the connection are served
+			execute = server.execute
+			server.execute = lambda code, values: 1 // 0 if code == RANGE else execute(code, values)
+			failed = await asyncio.gather(client.range(), client.containsMany(queries), return_exceptions = True)
+			server.execute = execute
+			# Too big frame gets ERROR with its number before the connection is closed
+			reader, writer = await asyncio.open_connection("127.0.0.1", port)
+			writer.write(HEADER.pack(7, CONTAINS, MAX_VALUES + 1))
+			rejected = HEADER.unpack(await asyncio.wait_for(reader.readexactly(HEADER.size), 5))
+			closed = await asyncio.wait_for(reader.read(), 5) == b""
+			writer.close()
+			await client.close()
+			await server.close()
+			if type(failed[0]) != ValueError or failed[1] != expected.containsMany(queries) or rejected != (7, ERROR, 0) or closed == False:
+				print("VEBServer did not answer the failed request or stopped serving after it")
+				return False
+			if answers != [expected.getSuccessor(value) for value in queries] + [expected.getPredecessor(value) for value in queries]:
+				print("VEBServer returned wrong successors or predecessors")
+				return False
+			if contained != expected.containsMany(queries) or stored != list(expected):
+				print("VEBServer has wrong values")
+				return False
+			return True
+		return asyncio.run(check())
 	def _random(self, values: list = None, startIndex: int = 0):
 		rand = 0
 		if values == None:
@@ -367,201 +1407,67 @@ class TestModule(object):
 			print ("Wrong value")
 			return False
 		return True
-	def complexTest(self, universum:int, outputFiles):
-		startTime = time.time()
-		self.tree = VEBTree(universum, True)
-		totalTime = float(time.time() - startTime)
-		outputFiles[0].write("VEBTree, full init\n")
-		outputFiles[0].write("{}\n".format(totalTime))
-
-		values = self._generateValues(fullRange = True)
-		random.shuffle(values)
-		startTime = time.time()
-		for value in values:
-			self.tree.insertValue(value)
-		totalTime = float(time.time() - startTime)
-				
-		outputFiles[0].write("{:.30f}\n".format(float(totalTime/universum)))
-
-		startTime = time.time()
-		for value in values:
-			self.tree.containsValue(value)
-		totalTime = float(time.time() - startTime)
-				
-		outputFiles[0].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		
-		startTime = time.time()
-		for value in values:
-			self.tree.getPredecessor(value)
-		totalTime = float(time.time() - startTime)
-
-		outputFiles[0].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		startTime = time.time()
-		for value in values:
-			self.tree.getSuccessor(value)
-		totalTime = float(time.time() - startTime)
-		
-		outputFiles[0].write("{:.30f} \n".format(float(totalTime/universum)))
-		
-		startTime = time.time()
-		for value in values:
-			self.tree.removeValue(value)
-		totalTime = float(time.time() - startTime)
-		
-		outputFiles[0].write("{:.30f} \n".format(float(totalTime/universum)))
-		
-		startTime = time.time()
-		self.tree = VEBTree(universum)
-		totalTime = float(time.time() - startTime)
-		outputFiles[1].write("VEBTree, lazy init\n")
-		outputFiles[1].write("{}\n".format(totalTime))
-
-		#values = self._generateValues()
-		#random.shuffle(values)
-		startTime = time.time()
-		for value in values:
-			self.tree.insertValue(value)
-		totalTime = float(time.time() - startTime)
-				
-		outputFiles[1].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		startTime = time.time()
-		for value in values:
-			self.tree.containsValue(value)
-		totalTime = float(time.time() - startTime)
-				
-		outputFiles[1].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		
-		startTime = time.time()
-		for value in values:
-			self.tree.getPredecessor(value)
-		totalTime = float(time.time() - startTime)
-
-		outputFiles[1].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		startTime = time.time()
-		for value in values:
-			self.tree.getSuccessor(value)
-		totalTime = float(time.time() - startTime)
-		
-		outputFiles[1].write("{:.30f} \n".format(float(totalTime/universum)))
-		
-		startTime = time.time()
-		for value in values:
-			self.tree.removeValue(value)
-		totalTime = float(time.time() - startTime)
-		outputFiles[1].write("{:.30f} \n".format(float(totalTime/universum)))
-		
-		startTime = time.time()
-		competitor = AVLTree()
-		outputFiles[2].write("AVLTree\n")
-		totalTime = float(time.time() - startTime)
-		outputFiles[2].write("{}\n".format(totalTime))
-		newValues = []
-		for value in range(0, len(values)):
-			newValues.append(random.randint(0, universum*2))
-		values = newValues
-		startTime = time.time()
-		for value in values:
-			competitor.insert(value, value)
-		totalTime = float(time.time() - startTime)
-		outputFiles[2].write("{:.30f} \n".format(float(totalTime/universum)))
-		startTime = time.time()
-		for value in values:
-			competitor.get_value(value)
-		totalTime = float(time.time() - startTime)
-		outputFiles[2].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		startTime = time.time()
-		for value in values:
-			try:
-				competitor.succ_key(value)
-			except:
-				pass
-		totalTime = float(time.time() - startTime)
-		outputFiles[2].write("{:.30f} \n".format(float(totalTime/universum)))
-		startTime = time.time()
-		for value in values:
-			try:
-				competitor.prev_key(value)
-			except:
-				pass
-		totalTime = float(time.time() - startTime)
-		outputFiles[2].write("{:.30f} \n".format(float(totalTime/universum)))
-		startTime = time.time()
-		for value in values:
-			try:
-				competitor.remove(value)
-			except:
-				pass
-		totalTime = float(time.time() - startTime)
-		outputFiles[2].write("{:.30f} \n".format(float(totalTime/universum)))
-		
-		
-		startTime = time.time()
-		competitor = RBTree()
-		outputFiles[3].write("RBTree\n")
-		totalTime = float(time.time() - startTime)
-		outputFiles[3].write("{}\n".format(totalTime))
-		startTime = time.time()
-		for value in values:
-			competitor.insert(value, value)
-		totalTime = float(time.time() - startTime)
-		outputFiles[3].write("{:.30f} \n".format(float(totalTime/universum)))
-		startTime = time.time()
-		for value in values:
-			competitor.get_value(value)
-		totalTime = float(time.time() - startTime)
-		outputFiles[3].write("{:.30f} \n".format(float(totalTime/universum)))
-
-		startTime = time.time()
-		for value in values:
-			try:
-				competitor.succ_key(value)
-			except:
-				pass
-		totalTime = float(time.time() - startTime)
-		outputFiles[3].write("{:.30f} \n".format(float(totalTime/universum)))
-		startTime = time.time()
-		for value in values:
-			try:
-				competitor.prev_key(value)
-			except:
-				pass
-		totalTime = float(time.time() - startTime)
-		outputFiles[3].write("{:.30f} \n".format(float(totalTime/universum)))
-		startTime = time.time()
-		for value in values:
-			try:
-				competitor.remove(value)
-			except:
-				pass
-		totalTime = float(time.time() - startTime)
-		outputFiles[3].write("{:.30f} \n".format(float(totalTime/universum)))
-	def testSpeed(self, unversum:int = None):
-		logFile = open("veb1_log.txt", 'w')
-		logFile1 = open("veb2_log.txt", 'w')
-		logFile2 = open("avl_log.txt", 'w')
-		logFile3 = open("rbtree_log.txt", 'w')
-		for power in range(2, 21):
-			line = "{} values\n".format(2**power)
-			logFile.write(line)
-			logFile1.write(line)
-			logFile2.write(line)
-			logFile3.write(line)
-			self.complexTest(2**power, [logFile, logFile1, logFile2, logFile3])
+	def complexTest(self, universum: int) -> list:
+		"""Measures all structures from VEBBenchmark on uniform, clustered and adversarial workloads with 'universum' size
+		Arguments:
+					universum - the size of the universum
+		Return:
+					list - result dicts of VEBBenchmark
+		"""
+		return self.benchmark.run([universum])
+	def testSpeed(self, universum: int = None) -> list:
+		"""Runs the benchmark for universums from 2^2 to 2^20 (or only for 'universum')
+		   and writes results into benchmark.json and benchmark.csv
+		Return:
+					list - result dicts of VEBBenchmark
+		"""
+		self.benchmark = VEBBenchmark(seed = 0, warmup = 1, repetitions = 3, maxKeys = 2**16)
+		if universum == None:
+			universums = [2**power for power in range(2, 21)]
+		else:
+			universums = [universum]
+		results = []
+		for universum in universums:
+			results.extend(self.complexTest(universum))
+		self.benchmark.writeJson(results, "benchmark.json")
+		self.benchmark.writeCsv(results, "benchmark.csv")
+		return results
 		
 		
 def test():
 	testObj = TestModule()
 	logging.debug("'Initializing' test has passed {}".format(testObj.testInitFunction()))
 	logging.debug("'Incorrect Values Insertion' test has been passed successfully: {}".format(testObj.testIncorrectValues()))
+	values = testObj.testInsertion()
 	logging.debug("'Insertion' test has been passed successfully: {}".format(len(values) > 0))
 	 
 	logging.debug("'Removing' test has been passed successfully: {}".format(testObj.testRemoving(deleteValues = values)))
 	logging.debug("'Successor' test has been passed successfully: {}".format(testObj.testSuccessor()))
+	logging.debug("'Sorted construction' test has been passed successfully: {}".format(testObj.testFromSorted()))
+	logging.debug("'Iteration' test has been passed successfully: {}".format(testObj.testIteration()))
+	logging.debug("'Boundary universums' test has been passed successfully: {}".format(testObj.testBoundaryUniversums()))
+	logging.debug("'Memory usage' test has been passed successfully: {}".format(testObj.testMemoryUsage()))
+	logging.debug("'Deep tree' test has been passed successfully: {}".format(testObj.testDeepTree()))
+	logging.debug("'Batch operations' test has been passed successfully: {}".format(testObj.testBatchOperations()))
+	logging.debug("'Sparse mode' test has been passed successfully: {}".format(testObj.testSparseMode()))
+	logging.debug("'Rank and select' test has been passed successfully: {}".format(testObj.testRankSelect()))
+	logging.debug("'Dump and load' test has been passed successfully: {}".format(testObj.testDumpLoad()))
+	logging.debug("'Flat tree' test has been passed successfully: {}".format(testObj.testFlatTree()))
+	logging.debug("'Map' test has been passed successfully: {}".format(testObj.testMap()))
+	logging.debug("'Set operations' test has been passed successfully: {}".format(testObj.testSetOperations()))
+	logging.debug("'Clear' test has been passed successfully: {}".format(testObj.testClear()))
+	logging.debug("'Profiler' test has been passed successfully: {}".format(testObj.testProfiler()))
+	logging.debug("'Split policy' test has been passed successfully: {}".format(testObj.testSplitPolicy()))
+	logging.debug("'Cluster release' test has been passed successfully: {}".format(testObj.testClusterRelease()))
+	logging.debug("'Key codecs' test has been passed successfully: {}".format(testObj.testKeyCodecs()))
+	logging.debug("'Grow universum' test has been passed successfully: {}".format(testObj.testGrowUniversum()))
+	logging.debug("'Concurrent tree' test has been passed successfully: {}".format(testObj.testConcurrent()))
+	logging.debug("'Snapshot' test has been passed successfully: {}".format(testObj.testSnapshot()))
+	logging.debug("'Map snapshot' test has been passed successfully: {}".format(testObj.testMapSnapshot()))
+	logging.debug("'Sharded tree' test has been passed successfully: {}".format(testObj.testSharded()))
+	logging.debug("'Server' test has been passed successfully: {}".format(testObj.testServer()))
+	logging.debug("'Array queries' test has been passed successfully (None if numpy is not installed): {}".format(testObj.testArrayQueries()))
 	testObj.testSpeed()
-test()
\ No newline at end of file
+# Worker processes of ShardedVEBTree may import this module again, they should not run the tests
+if __name__ == "__main__":
+	test()
\ No newline at end of file
@@ -0,0 +1,669 @@
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import platform
+import random
+import statistics
+import sys
+import threading
+import time
+from VEBTree import VEBTree
+from FlatVEBTree import FlatVEBTree
+from VEBMap import VEBMap
+from VEBProfiler import VEBProfiler
+from ConcurrentVEBTree import ConcurrentVEBTree
+from VEBServer import VEBServer, VEBClient
+# bintrees is needed only to compare vEB tree with balanced search trees
+try:
+	from bintrees import AVLTree
+	from bintrees import RBTree
+except ImportError:
+	AVLTree = None
+	RBTree = None
+
+OPERATIONS = ("insert", "contains", "successor", "predecessor", "remove")
+DISTRIBUTIONS = ("uniform", "clustered", "adversarial")
+PERCENTILES = (50, 90, 99)
+def _vebOperations(tree: VEBTree) -> dict:
+	"""Returns functions of the VEBTree object for every benchmarked operation"""
+	return {
+		"insert": tree.insertValue,
+		"contains": tree.containsValue,
+		"successor": tree.getSuccessor,
+		"predecessor": tree.getPredecessor,
+		"remove": tree.removeValue
+	}
+def _vebMapOperations(tree: VEBMap) -> dict:
+	"""Returns functions of the VEBMap object for every benchmarked operation, keys are stored with themselves as payloads
+	   like in the balanced search trees"""
+	operations = _vebOperations(tree)
+	operations["insert"] = lambda key: tree.insertItem(key, key)
+	return operations
+def _bintreesOperations(tree) -> dict:
+	"""Returns functions of the bintrees tree for every benchmarked operation
+	   bintrees raises KeyError where VEBTree returns None or False, so errors are turned into the same results
+	"""
+	def insert(key: int) -> bool:
+		tree.insert(key, key)
+		return True
+	def successor(key: int) -> int:
+		try:
+			return tree.succ_key(key)
+		except KeyError:
+			return None
+	def predecessor(key: int) -> int:
+		try:
+			return tree.prev_key(key)
+		except KeyError:
+			return None
+	def remove(key: int) -> bool:
+		try:
+			tree.remove(key)
+		except KeyError:
+			return False
+		return True
+	return {
+		"insert": insert,
+		"contains": tree.__contains__,
+		"successor": successor,
+		"predecessor": predecessor,
+		"remove": remove
+	}
+# Benchmarked structures: name -> (function which creates empty structure for the universum, function which returns its operations)
+STRUCTURES = {
+	"VEBTree lazy": (lambda universum: VEBTree(universum), _vebOperations),
+	"VEBTree fill": (lambda universum: VEBTree(universum, True), _vebOperations),
+	"FlatVEBTree": (lambda universum: FlatVEBTree(universum), _vebOperations),
+	"VEBMap": (lambda universum: VEBMap(universum), _vebMapOperations)
+}
+if AVLTree != None:
+	STRUCTURES["AVLTree"] = (lambda universum: AVLTree(), _bintreesOperations)
+	STRUCTURES["RBTree"] = (lambda universum: RBTree(), _bintreesOperations)
+class _MutexVEBTree(object):
+	"""VEBTree behind one mutex, baseline of ConcurrentVEBTree in the threaded benchmark"""
+	def __init__(self, universum: int):
+		self.tree = VEBTree(universum)
+		self.lock = threading.Lock()
+	def getSuccessor(self, value: int) -> int:
+		with self.lock:
+			return self.tree.getSuccessor(value)
+	def insertValue(self, value: int) -> bool:
+		with self.lock:
+			return self.tree.insertValue(value)
+	def removeValue(self, value: int) -> bool:
+		with self.lock:
+			return self.tree.removeValue(value)
+	def insertMany(self, values) -> int:
+		with self.lock:
+			return self.tree.insertMany(values)
+# Structures of the threaded benchmark: name -> function which creates empty thread-safe structure for the universum
+THREADED_STRUCTURES = {
+	"ConcurrentVEBTree": lambda universum: ConcurrentVEBTree(universum),
+	"MutexVEBTree": lambda universum: _MutexVEBTree(universum)
+}
+def _serveWorkload(universum: int, keys: list, connection) -> None:
+	"""Process of the server benchmark: serves VEBTree with the keys on the free localhost port and sends the port back"""
+	tree = VEBTree(universum)
+	tree.insertMany(keys)
+	server = VEBServer(tree)
+	async def serve() -> None:
+		connection.send(await server.start("127.0.0.1", 0))
+		await server.serveForever()
+	asyncio.run(serve())
+class Workload(object):
+	"""Keys and queries which are run against every benchmarked structure
+	Attributes:
+		distribution - name of the distribution of the keys
+		universum	 - the size of the universum
+		keys		 - unique keys in the order of insertion
+		queries		 - keys for contains, successor and predecessor; half of them are stored keys, half are random values
+		removals	 - keys in the order of removing
+	"""
+	def __init__(self, distribution: str, universum: int, keys: list, queries: list, removals: list):
+		self.distribution = distribution
+		self.universum = universum
+		self.keys = keys
+		self.queries = queries
+		self.removals = removals
+class VEBBenchmark(object):
+	"""Reproducible benchmark of the vEB tree and competing structures
+	   Every structure gets the same workload generated from the seed, every operation is timed separately
+	   with perf_counter_ns after warmup runs, and timings of all repetitions are reduced to percentiles
+	Attributes:
+		seed		- seed of the workload generator
+		warmup		- quantity of runs which are not measured
+		repetitions	- quantity of measured runs
+		density		- part of the universum which is inserted into the structure
+		maxKeys		- the biggest quantity of inserted keys, None means no limit
+		structures	- names of benchmarked structures from STRUCTURES
+	"""
+	def __init__(self, seed: int = 0, warmup: int = 1, repetitions: int = 5, density: float = 0.5, maxKeys: int = None, structures: list = None):
+		self.seed = seed
+		self.warmup = warmup
+		self.repetitions = repetitions
+		self.density = density
+		self.maxKeys = maxKeys
+		if structures == None:
+			structures = list(STRUCTURES)
+		self.structures = structures
+	def generateWorkload(self, distribution: str, universum: int) -> Workload:
+		"""Generates the same workload for the same seed, distribution and universum
+		Arguments:
+					distribution - "uniform", "clustered" or "adversarial"
+					universum	 - the size of the universum
+		Return:
+					Workload - keys and queries for the benchmark
+		"""
+		generator = random.Random("{}-{}-{}".format(self.seed, distribution, universum))
+		count = max(1, int(universum * self.density))
+		if self.maxKeys != None:
+			count = min(count, self.maxKeys)
+		if distribution == "uniform":
+			keys = generator.sample(range(universum), count)
+		elif distribution == "clustered":
+			# Keys form dense runs around few random centers
+			runLength = max(1, min(count, 256))
+			keySet = set()
+			while len(keySet) < count:
+				start = generator.randrange(universum)
+				for key in range(start, min(start + runLength, universum)):
+					keySet.add(key)
+					if len(keySet) == count:
+						break
+			keys = list(keySet)
+			generator.shuffle(keys)
+		elif distribution == "adversarial":
+			# Every key goes to its own cluster and keys come in descending order,
+			# so every insertion swaps minElement and creates new cluster with update of the summary cluster
+			stride = max(1, universum // count)
+			keys = [index * stride for index in range(count - 1, -1, -1)]
+		else:
+			raise ValueError("Unknown distribution {}".format(distribution))
+		queries = [generator.choice(keys) if index % 2 == 0 else generator.randrange(universum) for index in range(len(keys))]
+		removals = list(keys)
+		generator.shuffle(removals)
+		return Workload(distribution, universum, keys, queries, removals)
+	def _runOnce(self, structure: str, workload: Workload, create = None) -> dict:
+		"""Runs all operations of the workload against new structure
+		Arguments:
+					structure - name of the structure from STRUCTURES
+					workload  - keys and queries
+					create	  - function which creates VEBTree object from the universum instead of the one from STRUCTURES
+		Return:
+					dict - operation name -> list of timings of every call in nanoseconds
+		"""
+		if create == None:
+			create, getOperations = STRUCTURES[structure]
+		else:
+			getOperations = _vebOperations
+		clock = time.perf_counter_ns
+		startTime = clock()
+		tree = create(workload.universum)
+		timings = {"build": [clock() - startTime]}
+		operations = getOperations(tree)
+		for operation in OPERATIONS:
+			if operation == "insert":
+				values = workload.keys
+			elif operation == "remove":
+				values = workload.removals
+			else:
+				values = workload.queries
+			function = operations[operation]
+			samples = []
+			for value in values:
+				startTime = clock()
+				function(value)
+				samples.append(clock() - startTime)
+			timings[operation] = samples
+		return timings
+	def runWorkload(self, structure: str, workload: Workload, create = None) -> list:
+		"""Measures one structure on one workload
+		Arguments:
+					create - function which creates VEBTree object instead of the one from STRUCTURES, see _runOnce
+		Return:
+					list - result dict for every operation
+		"""
+		for run in range(self.warmup):
+			self._runOnce(structure, workload, create)
+		timings = {}
+		for run in range(self.repetitions):
+			for operation, samples in self._runOnce(structure, workload, create).items():
+				timings.setdefault(operation, []).extend(samples)
+		results = []
+		for operation, samples in timings.items():
+			result = {
+				"structure": structure,
+				"distribution": workload.distribution,
+				"universum": workload.universum,
+				"keys": len(workload.keys),
+				"operation": operation
+			}
+			result.update(summarize(samples))
+			results.append(result)
+		return results
+	def run(self, universums: list, distributions: list = DISTRIBUTIONS) -> list:
+		"""Measures all structures on all workloads
+		Arguments:
+					universums	  - sizes of the universums
+					distributions - names of the distributions of the keys
+		Return:
+					list - result dicts
+		"""
+		results = []
+		for universum in universums:
+			for distribution in distributions:
+				workload = self.generateWorkload(distribution, universum)
+				for structure in self.structures:
+					results.extend(self.runWorkload(structure, workload))
+		return results
+	def _runThreadedOnce(self, structure: str, workload: Workload, readers: int, writers: int, operations: int) -> tuple:
+		"""Runs 'readers' threads with 'operations' getSuccessor calls each while 'writers' threads remove and insert values back
+		Return:
+					tuple - time of the readers in nanoseconds and quantity of changes made by the writers
+		"""
+		tree = THREADED_STRUCTURES[structure](workload.universum)
+		tree.insertMany(workload.keys)
+		queries = workload.queries
+		start = threading.Barrier(readers + writers + 1)
+		stop = threading.Event()
+		writes = [0] * writers
+		def read(offset: int) -> None:
+			getSuccessor = tree.getSuccessor
+			start.wait()
+			for index in range(operations):
+				getSuccessor(queries[(offset + index) % len(queries)])
+		def write(number: int) -> None:
+			start.wait()
+			index = number
+			while not stop.is_set():
+				value = workload.removals[index % len(workload.removals)]
+				tree.removeValue(value)
+				tree.insertValue(value)
+				writes[number] += 2
+				index += writers
+		readerThreads = [threading.Thread(target = read, args = (number * operations,)) for number in range(readers)]
+		writerThreads = [threading.Thread(target = write, args = (number,)) for number in range(writers)]
+		for thread in readerThreads + writerThreads:
+			thread.start()
+		start.wait()
+		startTime = time.perf_counter_ns()
+		for thread in readerThreads:
+			thread.join()
+		totalTime = time.perf_counter_ns() - startTime
+		stop.set()
+		for thread in writerThreads:
+			thread.join()
+		return totalTime, sum(writes)
+	def runThreaded(self, universums: list, readerCounts: list, writers: int = 1, operations: int = 20000) -> list:
+		"""Measures throughput of thread-safe structures with different quantity of reader threads and constant quantity of writers
+		   Every reader makes the same quantity of queries, so perfect scaling keeps the time constant
+		   With the global interpreter lock only one thread runs Python code at a time, so reads do not scale there;
+		   the benchmark shows the cost of the locks and how the readers share the interpreter with the writers
+		Arguments:
+					universums	 - sizes of the universums
+					readerCounts - quantities of reader threads
+					writers		 - quantity of writer threads
+					operations	 - quantity of queries of every reader
+		Return:
+					list - result dicts with median time of the repetitions
+		"""
+		results = []
+		for universum in universums:
+			workload = self.generateWorkload("uniform", universum)
+			for structure in THREADED_STRUCTURES:
+				for readers in readerCounts:
+					for run in range(self.warmup):
+						self._runThreadedOnce(structure, workload, readers, writers, operations)
+					runs = [self._runThreadedOnce(structure, workload, readers, writers, operations) for run in range(self.repetitions)]
+					totalTime = statistics.median(run[0] for run in runs)
+					results.append({
+						"structure": structure,
+						"universum": universum,
+						"readers": readers,
+						"writers": writers,
+						"reads": readers * operations,
+						"writes": statistics.median(run[1] for run in runs),
+						"median_ns": totalTime,
+						"reads_per_s": readers * operations * 1e9 / totalTime
+					})
+		return results
+	async def _loadServerOnce(self, port: int, workload: Workload, connections: int, pipeline: int, batch: int, operations: int) -> tuple:
+		"""Sends 'operations' successor queries in batches of 'batch' values through 'connections' clients,
+		   every client keeps 'pipeline' requests in flight
+		Return:
+					tuple - whole time in nanoseconds and list of latencies of the requests in nanoseconds
+		"""
+		clients = [await VEBClient.connect("127.0.0.1", port) for number in range(connections)]
+		queries = workload.queries
+		workers = connections * pipeline
+		requests = max(1, operations // (workers * batch))
+		latencies = []
+		async def drive(client: VEBClient, offset: int) -> None:
+			for index in range(offset, offset + requests * batch, batch):
+				values = [queries[position % len(queries)] for position in range(index, index + batch)]
+				startTime = time.perf_counter_ns()
+				await client.successorMany(values)
+				latencies.append(time.perf_counter_ns() - startTime)
+		startTime = time.perf_counter_ns()
+		await asyncio.gather(*[drive(clients[number % connections], number * requests * batch) for number in range(workers)])
+		totalTime = time.perf_counter_ns() - startTime
+		for client in clients:
+			await client.close()
+		return totalTime, latencies
+	def runServer(self, universums: list, connectionCounts: list, pipeline: int = 16, batch: int = 1, operations: int = 20000) -> list:
+		"""Measures throughput and latency of VEBServer on localhost
+		   The server runs in its own process with the tree of the uniform workload, the load generator runs here
+		Arguments:
+					universums		 - sizes of the universums
+					connectionCounts - quantities of client connections
+					pipeline		 - quantity of requests which every connection keeps in flight
+					batch			 - quantity of queries in one request
+					operations		 - quantity of successor queries of one run
+		Return:
+					list - result dicts with median time of the repetitions and percentiles of the latencies of the requests
+		"""
+		results = []
+		for universum in universums:
+			workload = self.generateWorkload("uniform", universum)
+			connection, serverConnection = multiprocessing.Pipe()
+			process = multiprocessing.Process(target = _serveWorkload, args = (universum, workload.keys, serverConnection), daemon = True)
+			process.start()
+			port = connection.recv()
+			try:
+				for connections in connectionCounts:
+					for run in range(self.warmup):
+						asyncio.run(self._loadServerOnce(port, workload, connections, pipeline, batch, operations))
+					runs = [asyncio.run(self._loadServerOnce(port, workload, connections, pipeline, batch, operations)) for run in range(self.repetitions)]
+					totalTime = statistics.median(run[0] for run in runs)
+					queries = max(1, operations // (connections * pipeline * batch)) * connections * pipeline * batch
+					result = {
+						"structure": "VEBServer",
+						"universum": universum,
+						"connections": connections,
+						"pipeline": pipeline,
+						"batch": batch,
+						"queries": queries,
+						"median_ns": totalTime,
+						"queries_per_s": queries * 1e9 / totalTime
+					}
+					result.update(summarize([latency for run in runs for latency in run[1]]))
+					results.append(result)
+			finally:
+				process.terminate()
+				process.join()
+		return results
+	def runSplits(self, universums: list, splits: list, distributions: list = DISTRIBUTIONS, leafSize: int = None, sparse: bool = False) -> list:
+		"""Measures VEBTree with different split policies on the same workloads
+		   Every result has the timings of the operation like run gives and memory and quantity of levels of the tree
+		   which holds all keys of the workload; schedules which take more bits than the universum has are skipped
+		Arguments:
+					universums	  - sizes of the universums
+					splits		  - "halves", "auto" or bits of the levels from the root like "8/8/16"
+					distributions - names of the distributions of the keys
+					leafSize	  - leaf size of the trees, default one if it is None
+					sparse		  - flag of the sparse mode of the trees
+		Return:
+					list - result dicts
+		"""
+		results = []
+		for universum in universums:
+			for distribution in distributions:
+				workload = self.generateWorkload(distribution, universum)
+				sortedKeys = sorted(workload.keys)
+				for name in splits:
+					if name == "halves":
+						split = None
+					elif name == "auto":
+						split = VEBTree.autoSplit(sortedKeys, universum, leafSize, sparse)
+					else:
+						split = tuple(int(bits) for bits in name.split("/"))
+					try:
+						usage = VEBTree.fromSorted(sortedKeys, universum, leafSize, sparse, split).memoryUsage()
+					except ValueError:
+						continue
+					create = lambda universum, split = split: VEBTree(universum, False, leafSize, sparse, split)
+					for result in self.runWorkload("VEBTree", workload, create):
+						result["split"] = name
+						result["schedule"] = "/".join(map(str, split)) if split != None else "halves"
+						result["bytes"] = usage["bytes"]
+						result["levels"] = len(usage["levels"])
+						results.append(result)
+		return results
+	def runProfiled(self, universums: list, distributions: list = DISTRIBUTIONS, leafSize: int = None) -> list:
+		"""Runs every workload once against VEBTree under VEBProfiler and returns its counters instead of timings
+		   Counters show on which level of the tree every operation spends its time, so leaf size (and the size of
+		   the clusters under it) can be tuned for the distribution of the keys
+		Arguments:
+					universums	  - sizes of the universums
+					distributions - names of the distributions of the keys
+					leafSize	  - leaf size of the profiled trees, default one if it is None
+		Return:
+					list - result dict for every level of every operation of every workload
+		"""
+		results = []
+		for universum in universums:
+			for distribution in distributions:
+				workload = self.generateWorkload(distribution, universum)
+				tree = VEBTree(universum, False, leafSize)
+				with VEBProfiler() as profiler:
+					for key in workload.keys:
+						tree.insertValue(key)
+					for query in workload.queries:
+						tree.containsValue(query)
+						tree.getSuccessor(query)
+						tree.getPredecessor(query)
+					for key in workload.removals:
+						tree.removeValue(key)
+				for operation, levels in profiler.stats().items():
+					for level, counters in levels.items():
+						result = {
+							"structure": "VEBTree",
+							"distribution": distribution,
+							"universum": universum,
+							"keys": len(workload.keys),
+							"leafSize": tree.leafSize,
+							"operation": operation,
+							"level": level
+						}
+						result.update(counters)
+						results.append(result)
+		return results
+	def runRanked(self, universums: list, distributions: list = DISTRIBUTIONS, sparse: bool = False) -> list:
+		"""Measures rank and select of VEBTree while the tree is changed between the queries
+		   Every insertion of the workload key is followed by rank of it and every removal by select of the middle position,
+		   so the timings show the cost of keeping the sizes of the clusters for the queries up to date
+		Arguments:
+					universums	  - sizes of the universums
+					distributions - names of the distributions of the keys
+					sparse		  - flag of the sparse mode of the trees
+		Return:
+					list - result dicts with "insert+rank" and "remove+select" operations
+		"""
+		results = []
+		clock = time.perf_counter_ns
+		for universum in universums:
+			for distribution in distributions:
+				workload = self.generateWorkload(distribution, universum)
+				timings = {"insert+rank": [], "remove+select": []}
+				for run in range(self.warmup + self.repetitions):
+					tree = VEBTree(universum, False, None, sparse)
+					insertSamples = []
+					for key in workload.keys:
+						startTime = clock()
+						tree.insertValue(key)
+						tree.rank(key)
+						insertSamples.append(clock() - startTime)
+					removeSamples = []
+					for key in workload.removals:
+						startTime = clock()
+						tree.removeValue(key)
+						tree.select(len(tree) >> 1)
+						removeSamples.append(clock() - startTime)
+					if run >= self.warmup:
+						timings["insert+rank"].extend(insertSamples)
+						timings["remove+select"].extend(removeSamples)
+				for operation, samples in timings.items():
+					result = {
+						"structure": "VEBTree",
+						"distribution": distribution,
+						"universum": universum,
+						"keys": len(workload.keys),
+						"operation": operation
+					}
+					result.update(summarize(samples))
+					results.append(result)
+		return results
+	def metadata(self) -> dict:
+		"""Returns settings of the benchmark and description of the environment"""
+		return {
+			"seed": self.seed,
+			"warmup": self.warmup,
+			"repetitions": self.repetitions,
+			"density": self.density,
+			"maxKeys": self.maxKeys,
+			"python": sys.version.split()[0],
+			"platform": platform.platform()
+		}
+	def writeJson(self, results: list, path: str) -> None:
+		"""Writes results together with metadata into JSON file"""
+		with open(path, "w") as outputFile:
+			json.dump({"metadata": self.metadata(), "results": results}, outputFile, indent = 1)
+	def writeCsv(self, results: list, path: str) -> None:
+		"""Writes results into CSV file, one row per structure, workload and operation"""
+		if not results:
+			return
+		with open(path, "w", newline = "") as outputFile:
+			writer = csv.DictWriter(outputFile, fieldnames = list(results[0]))
+			writer.writeheader()
+			writer.writerows(results)
+def percentile(sortedSamples: list, percent: float) -> int:
+	"""Returns percentile of the sorted samples with nearest-rank method"""
+	index = max(0, -(-len(sortedSamples) * percent // 100) - 1)
+	return sortedSamples[int(index)]
+def summarize(samples: list) -> dict:
+	"""Reduces timings in nanoseconds to count, mean, min, max and percentiles"""
+	samples = sorted(samples)
+	summary = {
+		"samples": len(samples),
+		"mean_ns": sum(samples) / len(samples),
+		"min_ns": samples[0],
+		"max_ns": samples[-1]
+	}
+	for percent in PERCENTILES:
+		summary["p{}_ns".format(percent)] = percentile(samples, percent)
+	return summary
+def loadResults(path: str) -> list:
+	"""Reads results from the JSON file written by VEBBenchmark.writeJson"""
+	with open(path) as inputFile:
+		return json.load(inputFile)["results"]
+def compareResults(baseline: list, current: list, metric: str = "p50_ns", tolerance: float = 0.1) -> list:
+	"""Finds operations which became slower than in the baseline
+	Arguments:
+				baseline  - results of the previous version
+				current	  - results of the current version
+				metric	  - compared field of the results
+				tolerance - allowed relative slowdown
+	Return:
+				list - dicts with key of the result, baseline and current values of the metric for every regression
+	"""
+	def key(result: dict) -> tuple:
+		return (result["structure"], result["distribution"], result["universum"], result["operation"])
+	baselineValues = {key(result): result[metric] for result in baseline}
+	regressions = []
+	for result in current:
+		previous = baselineValues.get(key(result))
+		if previous != None and result[metric] > previous * (1 + tolerance):
+			regressions.append({"key": key(result), "baseline": previous, "current": result[metric]})
+	return regressions
+def _parsePowers(text: str) -> list:
+	"""Turns "2-16" or "4,8,12" into the list of universums"""
+	powers = []
+	for part in text.split(","):
+		if "-" in part:
+			first, last = part.split("-")
+			powers.extend(range(int(first), int(last) + 1))
+		else:
+			powers.append(int(part))
+	return [2**power for power in powers]
+def main(arguments: list = None) -> int:
+	parser = argparse.ArgumentParser(description = "Reproducible benchmark of the vEB tree")
+	parser.add_argument("--powers", default = "2-16", help = "powers of 2 of the universums, e.g. 2-16 or 8,12,16")
+	parser.add_argument("--distributions", default = ",".join(DISTRIBUTIONS))
+	parser.add_argument("--structures", default = ",".join(STRUCTURES))
+	parser.add_argument("--density", type = float, default = 0.5, help = "part of the universum which is inserted")
+	parser.add_argument("--max-keys", type = int, default = None)
+	parser.add_argument("--seed", type = int, default = 0)
+	parser.add_argument("--warmup", type = int, default = 1)
+	parser.add_argument("--repeat", type = int, default = 5)
+	parser.add_argument("--json", default = "benchmark.json", help = "path of the JSON output")
+	parser.add_argument("--csv", default = None, help = "path of the CSV output")
+	parser.add_argument("--baseline", default = None, help = "JSON output of the previous run to check regressions against")
+	parser.add_argument("--tolerance", type = float, default = 0.1)
+	parser.add_argument("--threads", default = None, help = "quantities of reader threads, e.g. 1,2,4,8; runs the threaded benchmark instead")
+	parser.add_argument("--writers", type = int, default = 1, help = "quantity of writer threads of the threaded benchmark")
+	parser.add_argument("--operations", type = int, default = 20000, help = "quantity of queries of every reader thread or of every server run")
+	parser.add_argument("--connections", default = None, help = "quantities of client connections, e.g. 1,4,16; runs the server benchmark instead")
+	parser.add_argument("--pipeline", type = int, default = 16, help = "quantity of requests in flight on every connection of the server benchmark")
+	parser.add_argument("--batch", type = int, default = 1, help = "quantity of queries in one request of the server benchmark")
+	parser.add_argument("--profile", action = "store_true", help = "counts work of VEBTree per level of the tree with VEBProfiler instead of timing")
+	parser.add_argument("--leaf-size", type = int, default = None, help = "leaf size of VEBTree of the profiled run or of the split benchmark")
+	parser.add_argument("--splits", default = None, help = "split policies of VEBTree, e.g. halves,auto,8/8/16; runs the split benchmark instead")
+	parser.add_argument("--sparse", action = "store_true", help = "sparse mode of VEBTree of the split or rank benchmark")
+	parser.add_argument("--rank", action = "store_true", help = "measures rank and select of VEBTree between insertions and removals instead")
+	options = parser.parse_args(arguments)
+	benchmark = VEBBenchmark(options.seed, options.warmup, options.repeat, options.density, options.max_keys, options.structures.split(","))
+	if options.connections != None:
+		results = benchmark.runServer(_parsePowers(options.powers), [int(count) for count in options.connections.split(",")], options.pipeline, options.batch, options.operations)
+		benchmark.writeJson(results, options.json)
+		if options.csv != None:
+			benchmark.writeCsv(results, options.csv)
+		for result in results:
+			print("{structure} u={universum} connections={connections} pipeline={pipeline} batch={batch}: {queries_per_s:.0f} queries/s, p50 {p50_ns} ns, p99 {p99_ns} ns".format(**result))
+		return 0
+	if options.splits != None:
+		results = benchmark.runSplits(_parsePowers(options.powers), options.splits.split(","), options.distributions.split(","), options.leaf_size, options.sparse)
+		benchmark.writeJson(results, options.json)
+		if options.csv != None:
+			benchmark.writeCsv(results, options.csv)
+		for result in results:
+			print("{distribution} u={universum} split={split} ({schedule}) {operation}: p50 {p50_ns} ns, p99 {p99_ns} ns, {bytes} bytes, {levels} levels".format(**result))
+		return 0
+	if options.rank == True:
+		results = benchmark.runRanked(_parsePowers(options.powers), options.distributions.split(","), options.sparse)
+		benchmark.writeJson(results, options.json)
+		if options.csv != None:
+			benchmark.writeCsv(results, options.csv)
+		for result in results:
+			print("{distribution} u={universum} {operation}: p50 {p50_ns} ns, p99 {p99_ns} ns".format(**result))
+		return 0
+	if options.profile == True:
+		results = benchmark.runProfiled(_parsePowers(options.powers), options.distributions.split(","), options.leaf_size)
+		benchmark.writeJson(results, options.json)
+		if options.csv != None:
+			benchmark.writeCsv(results, options.csv)
+		for result in results:
+			print("{distribution} u={universum} leaf={leafSize} {operation} level {level}: {calls} calls, {resumeCalls} summary calls, {allocations} allocations, {nanoseconds} ns".format(**result))
+		return 0
+	if options.threads != None:
+		results = benchmark.runThreaded(_parsePowers(options.powers), [int(count) for count in options.threads.split(",")], options.writers, options.operations)
+		benchmark.writeJson(results, options.json)
+		if options.csv != None:
+			benchmark.writeCsv(results, options.csv)
+		for result in results:
+			print("{structure} u={universum} readers={readers} writers={writers}: {reads_per_s:.0f} reads/s".format(**result))
+		return 0
+	results = benchmark.run(_parsePowers(options.powers), options.distributions.split(","))
+	benchmark.writeJson(results, options.json)
+	if options.csv != None:
+		benchmark.writeCsv(results, options.csv)
+	if options.baseline != None:
+		regressions = compareResults(loadResults(options.baseline), results, tolerance = options.tolerance)
+		for regression in regressions:
+			print("Regression {}: {} -> {}".format(regression["key"], regression["baseline"], regression["current"]))
+		if regressions:
+			return 1
+	return 0
+if __name__ == "__main__":
+	sys.exit(main())
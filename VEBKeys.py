@@ -0,0 +1,259 @@
+import datetime
+import ipaddress
+from VEBTree import VEBTree
+# Codecs turn keys into values of the tree and back, smaller keys get smaller values, so successor, predecessor,
+# rank and range of the keys are the same as of their values
+# encode returns None for key of the wrong type; key which is out of the universum gets the value which the tree rejects
+# encodeMany keeps positions of the keys (None for keys of the wrong type), so results of containsMany stay in order
+class OffsetCodec(object):
+	"""Codec of int keys which are not less than 'base', like nanosecond timestamps: the value is key - base
+	Attributes:
+		base	  - the least key
+		universum - the size of the universum of the tree for keys below base + 2 ** bits; None if bits is not given
+	"""
+	def __init__(self, base: int = 0, bits: int = None) -> None:
+		"""Initializing function of the OffsetCodec class
+		Arguments:
+					base - the least key
+					bits - quantity of bits of the values
+		"""
+		self.base = base
+		self.universum = None if bits == None else 1 << bits
+	def encode(self, key):
+		if type(key) != int:
+			return None
+		return key - self.base
+	def encodeBound(self, key):
+		"""Encodes bound of the range: the least value which is not less than the key"""
+		return self.encode(key)
+	def decode(self, value: int) -> int:
+		return value + self.base
+	def encodeMany(self, keys) -> list:
+		base = self.base
+		keys = list(keys)
+		if set(map(type, keys)) == {int}:
+			return [key - base for key in keys] if base else keys
+		return [key - base if type(key) == int else None for key in keys]
+	def decodeMany(self, values) -> list:
+		base = self.base
+		return [value + base for value in values] if base else list(values)
+class SignedCodec(OffsetCodec):
+	"""Codec of signed int keys which fit into 'bits' bits: the value is key + 2 ** (bits - 1)
+	   Zig-zag encoding is not used, it puts -1 between 0 and 1 and breaks the order of the keys
+	"""
+	def __init__(self, bits: int = 64) -> None:
+		"""Initializing function of the SignedCodec class
+		Arguments:
+					bits - quantity of bits of the keys including the sign
+		"""
+		OffsetCodec.__init__(self, -(1 << (bits - 1)), bits)
+class IPCodec(object):
+	"""Codec of ipaddress.IPv4Address or IPv6Address keys (strings are parsed too): the value is the number of the address
+	Attributes:
+		version	  - 4 or 6
+		universum - 2 ** 32 or 2 ** 128
+	"""
+	def __init__(self, version: int = 4) -> None:
+		"""Initializing function of the IPCodec class
+		Arguments:
+					version - version of the addresses, 4 or 6
+		"""
+		if version not in (4, 6):
+			raise ValueError("version should be 4 or 6, not {}".format(version))
+		self.version = version
+		self.universum = 1 << (32 if version == 4 else 128)
+		self._address = ipaddress.IPv4Address if version == 4 else ipaddress.IPv6Address
+	def encode(self, key):
+		if type(key) != self._address:
+			if type(key) != str:
+				return None
+			try:
+				key = self._address(key)
+			except ValueError:
+				return None
+		return int(key)
+	def encodeBound(self, key):
+		return self.encode(key)
+	def decode(self, value: int):
+		return self._address(value)
+	def encodeMany(self, keys) -> list:
+		keys = list(keys)
+		if set(map(type, keys)) == {self._address}:
+			return list(map(int, keys))
+		return list(map(self.encode, keys))
+	def decodeMany(self, values) -> list:
+		return list(map(self._address, values))
+class DatetimeCodec(object):
+	"""Codec of datetime.datetime keys which are not earlier than 'base': the value is quantity of 'resolution' steps after base
+	   Keys between the steps go to the earlier step, so the codec with resolution of one second keeps keys without microseconds
+	   Base and keys should be all naive or all aware, otherwise the key is of the wrong type
+	Attributes:
+		base	   - the earliest key
+		resolution - datetime.timedelta of one step
+		universum  - the size of the universum of the tree for keys below base + resolution * 2 ** bits; None if bits is not given
+	"""
+	def __init__(self, base: datetime.datetime, resolution: datetime.timedelta = datetime.timedelta(microseconds = 1), bits: int = None) -> None:
+		"""Initializing function of the DatetimeCodec class
+		Arguments:
+					base	   - the earliest key
+					resolution - datetime.timedelta of one step; it should be whole quantity of microseconds
+					bits	   - quantity of bits of the values
+		"""
+		self._microseconds = resolution // datetime.timedelta(microseconds = 1)
+		if self._microseconds <= 0 or resolution % datetime.timedelta(microseconds = 1):
+			raise ValueError("resolution should be whole positive quantity of microseconds, not {}".format(resolution))
+		self.base = base
+		self.resolution = resolution
+		self.universum = None if bits == None else 1 << bits
+	def encode(self, key):
+		if not isinstance(key, datetime.datetime):
+			return None
+		try:
+			return (key - self.base) // self.resolution
+		except TypeError:
+			# Naive and aware datetimes can not be subtracted
+			return None
+	def encodeBound(self, key):
+		"""Encodes bound of the range: the least value which is not earlier than the key"""
+		if not isinstance(key, datetime.datetime):
+			return None
+		try:
+			return -((self.base - key) // self.resolution)
+		except TypeError:
+			return None
+	def decode(self, value: int) -> datetime.datetime:
+		return self.base + datetime.timedelta(microseconds = value * self._microseconds)
+	def encodeMany(self, keys) -> list:
+		keys = list(keys)
+		if set(map(type, keys)) == {datetime.datetime}:
+			base = self.base
+			resolution = self.resolution
+			try:
+				return [(key - base) // resolution for key in keys]
+			except TypeError:
+				pass
+		return list(map(self.encode, keys))
+	def decodeMany(self, values) -> list:
+		base = self.base
+		timedelta = datetime.timedelta
+		step = self._microseconds
+		return [base + timedelta(microseconds = value * step) for value in values]
+class KeyedVEBTree(object):
+	"""VEBTree (or FlatVEBTree, ConcurrentVEBTree) object with keys of any type which the codec turns into values
+	   Keys are encoded on the way in and decoded on the way out; batch calls encode the whole batch at once
+	   Keys of the wrong type or out of the universum are invalid keys of the tree: insertions return False, queries None
+	Attributes:
+		tree  - wrapped tree with the encoded values
+		codec - object with encode, encodeBound, decode, encodeMany and decodeMany, like OffsetCodec
+	"""
+	# The biggest universum which is stored in the dense mode when the mode is not given: its root keeps 2^16 slots of clusters
+	DENSE_LIMIT = 1 << 32
+	def __init__(self, codec, universum: int = None, fill: bool = False, leafSize: int = None, sparse: bool = None, tree = None, split = None, autoGrow: bool = False) -> None:
+		"""Initializing function of the KeyedVEBTree class
+		Arguments:
+					codec	  - codec of the keys
+					universum - the size of the universum of the new VEBTree object; universum of the codec if it is None,
+								the least one if the codec has no universum and autoGrow is set
+					fill, leafSize, split, autoGrow - arguments of the new VEBTree object
+					sparse	  - flag of the sparse mode of the new VEBTree object; if it is None the sparse mode is used
+								for universums bigger than DENSE_LIMIT (like the ones of SignedCodec(64) and IPCodec(6)),
+								whose lists of clusters do not fit into memory
+					tree	  - existing tree which is wrapped instead of the new one
+		"""
+		if tree == None:
+			if universum == None:
+				universum = codec.universum
+			if universum == None and autoGrow:
+				universum = 2
+			if universum == None:
+				raise ValueError("universum should be given for the codec without bits")
+			if sparse == None:
+				sparse = universum > self.DENSE_LIMIT
+			tree = VEBTree(universum, fill, leafSize, sparse, split, autoGrow)
+		self.tree = tree
+		self.codec = codec
+	@property
+	def universum(self) -> int:
+		return self.tree.universum
+	def _decode(self, value):
+		if value == None:
+			return None
+		return self.codec.decode(value)
+	def getMin(self):
+		return self._decode(self.tree.getMin())
+	def getMax(self):
+		return self._decode(self.tree.getMax())
+	def __len__(self) -> int:
+		return len(self.tree)
+	def containsValue(self, key) -> bool:
+		value = self.codec.encode(key)
+		if value == None:
+			return False
+		return self.tree.containsValue(value)
+	def __contains__(self, key) -> bool:
+		return self.containsValue(key)
+	def insertValue(self, key) -> bool:
+		value = self.codec.encode(key)
+		if value == None:
+			return False
+		return self.tree.insertValue(value)
+	def removeValue(self, key) -> bool:
+		value = self.codec.encode(key)
+		if value == None:
+			return False
+		return self.tree.removeValue(value)
+	def getSuccessor(self, key):
+		value = self.codec.encode(key)
+		if value == None:
+			return None
+		if value < 0:
+			return self.getMin()
+		return self._decode(self.tree.getSuccessor(value))
+	def getPredecessor(self, key):
+		# Key between the steps of the codec is later than its value, so the value itself is its predecessor
+		value = self.codec.encodeBound(key)
+		if value == None:
+			return None
+		if value >= self.tree.universum:
+			return self.getMax()
+		return self._decode(self.tree.getPredecessor(value))
+	def rank(self, key) -> int:
+		"""Counts keys which are less than given key
+		Return:
+					int  - quantity of keys which are less than 'key'
+					None - if key is of the wrong type
+		"""
+		value = self.codec.encodeBound(key)
+		if value == None:
+			return None
+		return self.tree.rank(value)
+	def select(self, index: int):
+		return self._decode(self.tree.select(index))
+	def insertMany(self, keys) -> int:
+		return self.tree.insertMany(self.codec.encodeMany(keys))
+	def removeMany(self, keys) -> int:
+		return self.tree.removeMany(self.codec.encodeMany(keys))
+	def containsMany(self, keys) -> list:
+		return self.tree.containsMany(self.codec.encodeMany(keys))
+	def __iter__(self):
+		return map(self.codec.decode, self.tree)
+	def __reversed__(self):
+		return map(self.codec.decode, reversed(self.tree))
+	def range(self, low = None, high = None):
+		"""Iterates over keys which are in [low, high) in ascending order
+		Arguments:
+					low  - the least key of the range; the least key of the universum if it is None
+					high - key after the greatest key of the range; the end of the universum if it is None
+		"""
+		lowValue = 0 if low == None else self.codec.encodeBound(low)
+		highValue = None if high == None else self.codec.encodeBound(high)
+		if lowValue == None or (high != None and highValue == None):
+			return iter(())
+		return map(self.codec.decode, self.tree.range(lowValue, highValue))
+	def keys(self) -> list:
+		"""Returns all keys in ascending order, they are decoded at once"""
+		return self.codec.decodeMany(self.tree)
+	def memoryUsage(self) -> dict:
+		return self.tree.memoryUsage()
+	def clear(self) -> None:
+		self.tree.clear()
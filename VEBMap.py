@@ -0,0 +1,477 @@
+from VEBTree import VEBTree
+# Marks the missing payload, None is a valid payload
+_MISSING = object()
+class VEBMap(VEBTree):
+	"""vEB tree which keeps payload with every key
+	   Payload lives where its key lives: non leaf node keeps payload of its minElement, which does not appear in any cluster,
+	   and leaf keeps list of payloads of its values in the order of the bits of the bitmap;
+	   when minElement moves into the cluster or out of it, its payload moves with it
+	   So get, setdefault, floorItem and ceilingItem cost O(log log u) like getSuccessor and need no separate dict
+	   Keys are values of VEBTree, so getSuccessor, rank, range and other queries of VEBTree work on keys;
+	   summary clusters are plain VEBTree objects without payloads
+	   Set operations (union, |, |= and others) work on keys; union takes payloads of the other map for the common keys
+	Attributes:
+		_minPayload - payload of minElement of non leaf node
+		_payloads	- list of payloads of the values of the leaf, payload of the value is at the position equal to
+					  quantity of the values below it; None for non leaf node
+	"""
+	__slots__ = ("_minPayload", "_payloads")
+	def __init__(self, universum: int = 2, fill: bool = False, leafSize: int = None, sparse: bool = False, split = None, autoGrow: bool = False) -> None:
+		"""Initializing function of the VEBMap class
+		Arguments:
+					universum, leafSize, sparse, split, autoGrow - see VEBTree
+					fill - ignored, clusters of VEBMap are created on demand
+		"""
+		VEBTree.__init__(self, universum, False, leafSize, sparse, split, autoGrow)
+		self._minPayload = None
+		self._payloads = [] if self.universum <= self.leafSize else None
+	def _newCluster(self) -> 'VEBMap':
+		"""Creates empty cluster which keeps payloads"""
+		return self._newMap(self.sqrtUni)
+	def _minPayloadOf(self):
+		"""Returns payload of minElement of non empty node"""
+		if self.universum <= self.leafSize:
+			return self._payloads[0]
+		return self._minPayload
+	def _storeEmpty(self, key: int, payload) -> None:
+		"""Stores the key with payload into the empty node"""
+		self._minElement = key
+		self._maxElement = key
+		self._count = 1
+		self._rankCache = None
+		if self.universum <= self.leafSize:
+			self.infoCluster = 1 << key
+			self._payloads.append(payload)
+		else:
+			self._minPayload = payload
+	def _store(self, key: int, payload, replace: bool):
+		"""Stores payload with the valid key
+		   Descends like insertValue, the key which becomes new minElement of the node gives its payload to the node
+		   and carries the payload of the old minElement down
+		Arguments:
+					key		- valid key
+					payload - stored payload
+					replace - flag indicates whether payload of the key which is already in the VEBMap object is replaced
+		Return:
+					payload which is stored with the key after the call
+		"""
+		result = payload
+		gen = self._gen
+		node = self
+		# Nodes which get one more key if the key turns out to be new
+		path = []
+		while node.universum > node.leafSize:
+			minimum = node._minElement
+			if minimum == None:
+				node._storeEmpty(key, payload)
+				break
+			if key == minimum:
+				if replace:
+					node._minPayload = payload
+				return node._minPayload
+			# maxElement is placed in its cluster too, so the key equal to maxElement is found there
+			if key < minimum:
+				# New key becomes minElement, the old minElement goes into the clusters with its payload
+				node._minElement = key
+				key = minimum
+				node._minPayload, payload = payload, node._minPayload
+			if key > node._maxElement:
+				node._maxElement = key
+			clustIndex = key >> node._lowBits
+			path.append((node, clustIndex))
+			key &= node._lowMask
+			cluster = node.infoCluster[clustIndex]
+			if cluster == None:
+				cluster = node._newCluster()
+				node.infoCluster[clustIndex] = cluster
+			elif cluster._gen != gen:
+				# The cluster is shared with a snapshot, so the map changes its own copy
+				cluster = cluster._copy(gen)
+				node.infoCluster[clustIndex] = cluster
+			if cluster._minElement == None:
+				# The cluster is empty, so the key is placed there at once
+				# And the rest of the work is to mark the cluster as non empty in the summary cluster
+				cluster._storeEmpty(key, payload)
+				if node.resume == None:
+					node.resume = node._newTree(node.universum >> node._lowBits)
+				node._ownResume().insertValue(clustIndex)
+				break
+			node = cluster
+		else:
+			bit = 1 << key
+			position = (node.infoCluster & (bit - 1)).bit_count()
+			if node.infoCluster & bit != 0:
+				if replace:
+					node._payloads[position] = payload
+				return node._payloads[position]
+			node.infoCluster |= bit
+			node._payloads.insert(position, payload)
+			node._count += 1
+			if node._minElement == None or key < node._minElement:
+				node._minElement = key
+			if node._maxElement == None or key > node._maxElement:
+				node._maxElement = key
+		for node, clustIndex in path:
+			node._count += 1
+			if node._rankCache != None:
+				node._rankAdd(clustIndex, 1)
+		return result
+	def _discard(self, key: int):
+		"""Removes the valid key with its payload
+		   Descends like removeValue; when minElement of the node is removed, the least key of the first cluster
+		   becomes new minElement and its payload goes up with it
+		Arguments:
+					key - valid key
+		Return:
+					payload of the removed key or _MISSING if the key was not in the VEBMap object
+		"""
+		result = _MISSING
+		gen = self._gen
+		node = self
+		# Nodes which lost the key, they fix their maxElement after the key is removed from the cluster
+		path = []
+		while node.universum > node.leafSize:
+			minimum = node._minElement
+			if minimum == None:
+				return _MISSING
+			if minimum == node._maxElement:
+				if key != minimum:
+					return _MISSING
+				if result is _MISSING:
+					result = node._minPayload
+				node._minElement = None
+				node._maxElement = None
+				node._count = 0
+				node._rankCache = None
+				node._minPayload = None
+				break
+			shift = node._lowBits
+			if key == minimum:
+				# The least key of the first cluster becomes new minElement with its payload
+				# And following actions remove this key from the cluster
+				if result is _MISSING:
+					result = node._minPayload
+				firstCluster = node.resume._minElement
+				cluster = node.infoCluster[firstCluster]
+				node._minPayload = cluster._minPayloadOf()
+				key = (firstCluster << shift) | cluster._minElement
+				node._minElement = key
+			clustIndex = key >> shift
+			offset = key & node._lowMask
+			cluster = node.infoCluster[clustIndex]
+			if cluster == None or cluster._minElement == None:
+				return _MISSING
+			if cluster._gen != gen:
+				# The cluster is shared with a snapshot, so the map changes its own copy
+				cluster = cluster._copy(gen)
+				node.infoCluster[clustIndex] = cluster
+			if cluster._minElement == cluster._maxElement:
+				if cluster._minElement != offset:
+					return _MISSING
+				if result is _MISSING:
+					result = cluster._minPayloadOf()
+				# Removing the key results in emptiness of the cluster
+				# So the rest of the work is to remove the cluster from the summary cluster
+				cluster._minElement = None
+				cluster._maxElement = None
+				cluster._count = 0
+				cluster._rankCache = None
+				cluster._minPayload = None
+				if cluster.universum <= cluster.leafSize:
+					cluster.infoCluster = 0
+					cluster._payloads.clear()
+				node._ownResume().removeValue(clustIndex)
+				node._releaseCluster(clustIndex)
+				path.append((node, key, clustIndex, True))
+				break
+			path.append((node, key, clustIndex, False))
+			node = cluster
+			key = offset
+		else:
+			bits = node.infoCluster
+			if (bits >> key) & 1 == 0:
+				return _MISSING
+			payload = node._payloads.pop((bits & ((1 << key) - 1)).bit_count())
+			if result is _MISSING:
+				result = payload
+			bits ^= 1 << key
+			node.infoCluster = bits
+			node._count -= 1
+			if bits == 0:
+				node._minElement = None
+				node._maxElement = None
+			else:
+				node._minElement = (bits & -bits).bit_length() - 1
+				node._maxElement = bits.bit_length() - 1
+		while path:
+			node, key, clustIndex, emptyCluster = path.pop()
+			node._count -= 1
+			if node._rankCache != None:
+				node._rankAdd(clustIndex, -1)
+			# If removed key was maxElement, the biggest key of the last non empty cluster becomes new maxElement
+			if key == node._maxElement:
+				if emptyCluster == True:
+					clustIndex = node.resume._maxElement
+				if clustIndex == None:
+					node._maxElement = node._minElement
+				else:
+					node._maxElement = (clustIndex << node._lowBits) | node.infoCluster[clustIndex]._maxElement
+		return result
+	def _find(self, key: int):
+		"""Returns payload of the valid key or _MISSING if the key is not in the VEBMap object"""
+		node = self
+		while node.universum > node.leafSize:
+			if node._minElement == None:
+				return _MISSING
+			if key == node._minElement:
+				return node._minPayload
+			cluster = node.infoCluster[key >> node._lowBits]
+			if cluster == None:
+				return _MISSING
+			key &= node._lowMask
+			node = cluster
+		bits = node.infoCluster
+		if (bits >> key) & 1 == 0:
+			return _MISSING
+		return node._payloads[(bits & ((1 << key) - 1)).bit_count()]
+	def insertItem(self, key: int, payload) -> bool:
+		"""Stores payload with the key, payload of the key which is already in the VEBMap object is replaced
+		Return:
+					True  - if payload has been stored
+					False - if key is invalid
+		"""
+		if self._isValueValid(key) == False and self._acceptValue(key) == False:
+			return False
+		self._store(key, payload, True)
+		return True
+	def __setitem__(self, key: int, payload) -> None:
+		if self._isValueValid(key) == False and self._acceptValue(key) == False:
+			raise KeyError(key)
+		self._store(key, payload, True)
+	def get(self, key: int, default = None):
+		"""Returns payload of the key
+		Return:
+					payload of the key
+					default - if key is not in the VEBMap object or key is invalid
+		"""
+		if self._isValueValid(key) == False:
+			return default
+		payload = self._find(key)
+		if payload is _MISSING:
+			return default
+		return payload
+	def __getitem__(self, key: int):
+		payload = _MISSING
+		if self._isValueValid(key):
+			payload = self._find(key)
+		if payload is _MISSING:
+			raise KeyError(key)
+		return payload
+	def __contains__(self, key: int) -> bool:
+		return self.containsValue(key)
+	def setdefault(self, key: int, default = None):
+		"""Returns payload of the key; stores 'default' with the key if the key is not in the VEBMap object
+		   Makes one descent like insertValue
+		Return:
+					payload of the key after the call
+					None - if key is invalid
+		"""
+		if self._isValueValid(key) == False and self._acceptValue(key) == False:
+			return None
+		return self._store(key, default, False)
+	def pop(self, key: int, default = _MISSING):
+		"""Removes the key and returns its payload
+		Return:
+					payload of the removed key
+					default - if key is not in the VEBMap object or key is invalid
+		Raises:
+					KeyError - if key is not removed and default is not given
+		"""
+		payload = _MISSING
+		if self._isValueValid(key):
+			payload = self._discard(key)
+		if payload is _MISSING:
+			if default is _MISSING:
+				raise KeyError(key)
+			return default
+		return payload
+	def __delitem__(self, key: int) -> None:
+		self.pop(key)
+	def floorItem(self, key: int) -> tuple:
+		"""Finds the biggest key which is less than or equals given number
+		Return:
+					tuple - (key, payload)
+					None  - if there is no such key or key is not int
+		"""
+		if type(key) != int or key < 0:
+			return None
+		if key + 1 >= self.universum:
+			found = self._maxElement
+		else:
+			found = self.getPredecessor(key + 1)
+		if found == None:
+			return None
+		return found, self._find(found)
+	def ceilingItem(self, key: int) -> tuple:
+		"""Finds the least key which is greater than or equals given number
+		Return:
+					tuple - (key, payload)
+					None  - if there is no such key or key is not int
+		"""
+		if type(key) != int or key >= self.universum:
+			return None
+		if key <= 0:
+			found = self._minElement
+		else:
+			found = self.getSuccessor(key - 1)
+		if found == None:
+			return None
+		return found, self._find(found)
+	def items(self):
+		"""Iterates over (key, payload) pairs in ascending order of the keys"""
+		return self._iterItems(0)
+	def keys(self):
+		return self._iterValues(0)
+	def values(self):
+		"""Iterates over payloads in ascending order of their keys"""
+		for key, payload in self._iterItems(0):
+			yield payload
+	def _iterItems(self, base: int):
+		"""Yields (key, payload) pairs of the VEBMap object in ascending order of the keys
+		Arguments:
+					base - the least key of the universum of the VEBMap object in the root map
+		"""
+		if self._minElement == None:
+			return
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster
+			for payload in self._payloads:
+				lowestBit = bits & -bits
+				yield base + lowestBit.bit_length() - 1, payload
+				bits ^= lowestBit
+			return
+		yield base + self._minElement, self._minPayload
+		if self.resume != None:
+			shift = self._lowBits
+			for clustIndex in self.resume._iterValues(0):
+				yield from self.infoCluster[clustIndex]._iterItems(base + (clustIndex << shift))
+	def insertValue(self, value: int) -> bool:
+		"""Inserts the key with None payload; payload of the key which is already in the VEBMap object is kept"""
+		if self._isValueValid(value) == False and self._acceptValue(value) == False:
+			return False
+		self._store(value, None, False)
+		return True
+	def removeValue(self, value: int) -> bool:
+		"""Removes the key with its payload"""
+		if self._isValueValid(value) == False:
+			return False
+		return self._discard(value) is not _MISSING
+	def insertMany(self, values) -> int:
+		"""Inserts keys with None payloads one by one, the batch algorithms of VEBTree do not move payloads"""
+		count = self._count
+		for value in values:
+			self.insertValue(value)
+		return self._count - count
+	def removeMany(self, values) -> int:
+		"""Removes keys with their payloads one by one"""
+		count = self._count
+		for value in values:
+			self.removeValue(value)
+		return count - self._count
+	def _loadSorted(self, values: list, start: int, stop: int, base: int) -> None:
+		# fromSorted and load give None payloads to the keys; the bottom-up build of VEBTree would create clusters without payloads
+		for index in range(start, stop):
+			self._store(values[index] - base, None, False)
+	def _takeFields(self, node: 'VEBTree') -> None:
+		# Payloads go with the keys, the node is left without them
+		VEBTree._takeFields(self, node)
+		self._minPayload = node._minPayload
+		self._payloads = node._payloads
+		node._minPayload = None
+		node._payloads = None
+	def _insertMinimumOf(self, node: 'VEBTree') -> None:
+		self._store(node._minElement, node._minPayloadOf(), True)
+	def _clearNode(self) -> None:
+		# Payloads are dropped together with their keys, so cleared map does not keep references to them
+		self._minPayload = None
+		if self._payloads != None:
+			self._payloads.clear()
+		VEBTree._clearNode(self)
+	def _copy(self, gen: int) -> 'VEBMap':
+		# Leaf changes its list of payloads in place, so the copy gets its own list; payloads themselves stay shared
+		vebMap = VEBTree._copy(self, gen)
+		vebMap._minPayload = self._minPayload
+		vebMap._payloads = None if self._payloads == None else list(self._payloads)
+		return vebMap
+	def snapshot(self):
+		"""Returns read-only view of the current items of the VEBMap object, see VEBTree.snapshot
+		   Nodes are copied with their payloads before the change, the payloads themselves are not copied
+		Return:
+					VEBMapSnapshot - read-only view
+		"""
+		from VEBSnapshot import VEBMapSnapshot
+		frozen = self._copy(self._gen)
+		self._gen += 1
+		return VEBMapSnapshot(frozen)
+	def copy(self) -> 'VEBMap':
+		"""Returns new VEBMap object with the same items and settings
+		   Items are stored in ascending order of the keys, the payloads themselves are not copied
+		"""
+		vebMap = self._newMap(self.universum)
+		vebMap._autoGrow = self._autoGrow
+		for key, payload in self._iterItems(0):
+			vebMap._store(key, payload, True)
+		return vebMap
+	def _newMap(self, universum: int) -> 'VEBMap':
+		"""Creates empty VEBMap object with the same settings as the VEBMap object has"""
+		vebMap = self._newTree(universum, VEBMap)
+		vebMap._minPayload = None
+		vebMap._payloads = [] if vebMap.universum <= vebMap.leafSize else None
+		return vebMap
+	# Set operations go key by key, the structural merge of VEBTree would move clusters without their payloads
+	# The rule of payloads is the one of dict.update: union takes payloads of the other map for the common keys,
+	# keys which come from the tree without payloads (VEBTree, FlatVEBTree) get None and do not replace payloads of the map;
+	# intersection and difference keep payloads of the VEBMap object
+	def unionUpdate(self, other) -> int:
+		"""Adds all keys of the other tree to the VEBMap object, payloads of the other VEBMap replace payloads of the common keys
+		Arguments:
+					other - tree with the same universum
+		Return:
+					int - quantity of added keys
+		Raises:
+					ValueError - if the other tree has different universum
+		"""
+		self._isStructural(other)
+		if isinstance(other, VEBMap) == False:
+			return self.insertMany(list(other))
+		count = self._count
+		for key, payload in list(other._iterItems(0)):
+			self._store(key, payload, True)
+		return self._count - count
+	def intersectionUpdate(self, other) -> int:
+		"""Keeps only keys of the VEBMap object which are in the other tree too, with their payloads
+		Arguments:
+					other - tree with the same universum
+		Return:
+					int - quantity of removed keys
+		Raises:
+					ValueError - if the other tree has different universum
+		"""
+		self._isStructural(other)
+		return self.removeMany([key for key in self._iterValues(0) if other.containsValue(key) == False])
+	def differenceUpdate(self, other) -> int:
+		"""Removes keys of the other tree from the VEBMap object
+		Arguments:
+					other - tree with the same universum
+		Return:
+					int - quantity of removed keys
+		Raises:
+					ValueError - if the other tree has different universum
+		"""
+		self._isStructural(other)
+		return self.removeMany(list(other))
+	def intersection(self, other) -> 'VEBMap':
+		"""Returns new VEBMap object with the keys which are in both trees and payloads of the VEBMap object"""
+		vebMap = self.copy()
+		vebMap.intersectionUpdate(other)
+		return vebMap
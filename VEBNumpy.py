@@ -0,0 +1,178 @@
+from array import array
+import numpy
+from FlatVEBTree import FlatVEBTree
+# Queries to FlatVEBTree are answered over its levels of 64-bit words:
+# the first level has bit number i set if value i is in the tree, every next level has bit number i set
+# if word number i of the previous level is not zero
+# All queries go up and down the levels together, one numpy operation per level instead of one Python call per query
+# Queries to VEBTree are answered by binary search over the sorted array of its values, which needs memory
+# for the values only, so sparse trees with huge universums are queried as well
+# Missing successor or predecessor is -1 in the answers
+# Answers are int64, so the universum of VEBTree should not be bigger than 2^63
+INT64_UNIVERSUM = 1 << 63
+def packLevels(tree: FlatVEBTree) -> list:
+	"""Returns levels of FlatVEBTree as numpy arrays of uint64 without copying
+	Arguments:
+				tree - FlatVEBTree object
+	Return:
+				list - numpy arrays, the first one holds the values, the last one is one word
+	"""
+	if not isinstance(tree, FlatVEBTree):
+		raise TypeError("Levels are packed only for FlatVEBTree, not {}".format(type(tree).__name__))
+	return [numpy.frombuffer(level, dtype = numpy.uint64) for level in tree._levels]
+def sortedValues(tree) -> numpy.ndarray:
+	"""Returns values of VEBTree as sorted numpy array of int64
+	   The array is built from the bitmaps of the leaves and the minimums of the nodes, memory follows the quantity of values
+	Arguments:
+				tree - VEBTree object with universum not bigger than 2^63
+	Return:
+				numpy.ndarray - values in ascending order
+	"""
+	if tree.universum > INT64_UNIVERSUM:
+		raise ValueError("Array queries need universum not bigger than 2^63 for int64 answers, not {}".format(tree.universum))
+	bases = array("q")
+	words = array("Q")
+	for base, bits in tree._iterBitmaps(0):
+		# Bitmaps of the leaves bigger than 64 are cut into words
+		while bits:
+			bases.append(base)
+			words.append(bits & 0xFFFFFFFFFFFFFFFF)
+			bits >>= 64
+			base += 64
+	if not words:
+		return numpy.zeros(0, dtype = numpy.int64)
+	bytesOfWords = numpy.frombuffer(words, dtype = numpy.uint64).astype("<u8").view(numpy.uint8)
+	rows, offsets = numpy.nonzero(numpy.unpackbits(bytesOfWords, bitorder = "little").reshape(-1, 64))
+	return numpy.frombuffer(bases, dtype = numpy.int64)[rows] + offsets
+def _lowestBit(words: numpy.ndarray) -> numpy.ndarray:
+	"""Returns positions of the lowest set bits of non zero words"""
+	lowest = words & (~words + 1)
+	# Powers of 2 are exact in float64, so the exponent is the position of the bit
+	return numpy.frexp(lowest.astype(numpy.float64))[1].astype(numpy.int64) - 1
+def _highestBit(words: numpy.ndarray) -> numpy.ndarray:
+	"""Returns positions of the highest set bits of non zero words"""
+	# Halves of 32 bits are exact in float64, the whole word is not
+	high = words >> numpy.uint64(32)
+	hasHigh = high != 0
+	half = numpy.where(hasHigh, high, words & numpy.uint64(0xFFFFFFFF))
+	return numpy.frexp(half.astype(numpy.float64))[1].astype(numpy.int64) - 1 + 32 * hasHigh
+def _checkQueries(queries, universum: int) -> tuple:
+	"""Returns queries as int64 array and indexes of the valid ones (greater or equals zero and less than universum)"""
+	queries = numpy.asarray(queries)
+	if not numpy.issubdtype(queries.dtype, numpy.integer):
+		raise TypeError("Queries should be an array of integers, got {}".format(queries.dtype))
+	queries = queries.astype(numpy.int64)
+	flatQueries = queries.ravel()
+	if universum >= INT64_UNIVERSUM:
+		return queries, flatQueries, numpy.nonzero(flatQueries >= 0)[0]
+	return queries, flatQueries, numpy.nonzero((flatQueries >= 0) & (flatQueries < universum))[0]
+def containsArray(tree, queries) -> numpy.ndarray:
+	"""Checks presence of every query in the tree
+	Arguments:
+				tree	- VEBTree or FlatVEBTree object
+				queries - array with int values
+	Return:
+				numpy.ndarray - bool for every query, False for invalid values
+	"""
+	if not isinstance(tree, FlatVEBTree):
+		values = sortedValues(tree)
+		queries, flatQueries, valid = _checkQueries(queries, tree.universum)
+		answers = numpy.zeros(queries.shape, dtype = bool)
+		if len(values):
+			index = numpy.searchsorted(values, flatQueries[valid])
+			found = index < len(values)
+			found[found] = values[index[found]] == flatQueries[valid[found]]
+			answers.ravel()[valid] = found
+		return answers
+	levels = packLevels(tree)
+	queries, flatQueries, valid = _checkQueries(queries, tree.universum)
+	answers = numpy.zeros(queries.shape, dtype = bool)
+	values = flatQueries[valid]
+	answers.ravel()[valid] = (levels[0][values >> 6] >> (values & 63).astype(numpy.uint64)) & 1 == 1
+	return answers
+def successorArray(tree, queries) -> numpy.ndarray:
+	"""Finds successor of every query in the tree
+	   Queries go up the levels until the word has bit after the position, then go down through the lowest set bits
+	Arguments:
+				tree	- VEBTree or FlatVEBTree object
+				queries - array with int values
+	Return:
+				numpy.ndarray - int64 successor for every query, -1 if there is no successor or value is invalid
+	"""
+	if not isinstance(tree, FlatVEBTree):
+		values = sortedValues(tree)
+		queries, flatQueries, valid = _checkQueries(queries, tree.universum)
+		answers = numpy.full(queries.shape, -1, dtype = numpy.int64)
+		index = numpy.searchsorted(values, flatQueries[valid], "right")
+		found = index < len(values)
+		answers.ravel()[valid[found]] = values[index[found]]
+		return answers
+	levels = packLevels(tree)
+	queries, flatQueries, valid = _checkQueries(queries, tree.universum)
+	answers = numpy.full(queries.shape, -1, dtype = numpy.int64)
+	position = flatQueries[valid] + 1
+	foundLevel = numpy.full(len(valid), -1, dtype = numpy.int64)
+	active = numpy.arange(len(valid))
+	for level, words in enumerate(levels):
+		activePosition = position[active]
+		index = activePosition >> 6
+		inside = index < len(words)
+		active = active[inside]
+		activePosition = activePosition[inside]
+		index = index[inside]
+		word = words[index] >> (activePosition & 63).astype(numpy.uint64)
+		found = word != 0
+		position[active[found]] = activePosition[found] + _lowestBit(word[found])
+		foundLevel[active[found]] = level
+		active = active[~found]
+		position[active] = index[~found] + 1
+	for level in range(len(levels) - 2, -1, -1):
+		descending = numpy.nonzero(foundLevel > level)[0]
+		activePosition = position[descending]
+		position[descending] = (activePosition << 6) + _lowestBit(levels[level][activePosition])
+	answered = foundLevel >= 0
+	answers.ravel()[valid[answered]] = position[answered]
+	return answers
+def predecessorArray(tree, queries) -> numpy.ndarray:
+	"""Finds predecessor of every query in the tree
+	   Queries go up the levels until the word has bit before the position, then go down through the highest set bits
+	Arguments:
+				tree	- VEBTree or FlatVEBTree object
+				queries - array with int values
+	Return:
+				numpy.ndarray - int64 predecessor for every query, -1 if there is no predecessor or value is invalid
+	"""
+	if not isinstance(tree, FlatVEBTree):
+		values = sortedValues(tree)
+		queries, flatQueries, valid = _checkQueries(queries, tree.universum)
+		answers = numpy.full(queries.shape, -1, dtype = numpy.int64)
+		index = numpy.searchsorted(values, flatQueries[valid], "left") - 1
+		found = index >= 0
+		answers.ravel()[valid[found]] = values[index[found]]
+		return answers
+	levels = packLevels(tree)
+	queries, flatQueries, valid = _checkQueries(queries, tree.universum)
+	answers = numpy.full(queries.shape, -1, dtype = numpy.int64)
+	position = flatQueries[valid] - 1
+	foundLevel = numpy.full(len(valid), -1, dtype = numpy.int64)
+	active = numpy.arange(len(valid))
+	allBits = numpy.uint64(0xFFFFFFFFFFFFFFFF)
+	for level, words in enumerate(levels):
+		activePosition = position[active]
+		inside = activePosition >= 0
+		active = active[inside]
+		activePosition = activePosition[inside]
+		index = activePosition >> 6
+		word = words[index] & (allBits >> (63 - (activePosition & 63)).astype(numpy.uint64))
+		found = word != 0
+		position[active[found]] = (index[found] << 6) + _highestBit(word[found])
+		foundLevel[active[found]] = level
+		active = active[~found]
+		position[active] = index[~found] - 1
+	for level in range(len(levels) - 2, -1, -1):
+		descending = numpy.nonzero(foundLevel > level)[0]
+		activePosition = position[descending]
+		position[descending] = (activePosition << 6) + _highestBit(levels[level][activePosition])
+	answered = foundLevel >= 0
+	answers.ravel()[valid[answered]] = position[answered]
+	return answers
@@ -0,0 +1,224 @@
+import inspect
+import re
+import sys
+import textwrap
+import threading
+from time import perf_counter_ns
+from VEBTree import VEBTree
+# Positions of the counters in the list of counters of one level
+CALLS, RESUME_CALLS, ALLOCATIONS, NANOSECONDS = range(4)
+COUNTER_NAMES = ("calls", "resumeCalls", "allocations", "nanoseconds")
+class _Trace(object):
+	"""Position of one running operation in the tree: level of the node which is visited now and the time when it was entered
+	   Time between two moves is added to the level which was left
+	"""
+	__slots__ = ("levels", "counters", "level", "clock", "nodes", "summaries")
+	def __init__(self, levels: list) -> None:
+		self.levels = levels
+		self.counters = None
+		self.level = -1
+		self.clock = perf_counter_ns()
+		# Nodes on the way of the recursive batch methods, the last one is the node which is visited now
+		self.nodes = []
+		# Levels of the nodes which went into their summary clusters, the search comes back to them in the reverse order
+		self.summaries = []
+	def moveTo(self, level: int) -> None:
+		"""Adds the time since the last move to the current level and makes 'level' current"""
+		now = perf_counter_ns()
+		if self.counters != None:
+			self.counters[NANOSECONDS] += now - self.clock
+		self.clock = now
+		while len(self.levels) <= level:
+			self.levels.append([0, 0, 0, 0])
+		self.counters = self.levels[level]
+		self.level = level
+	def descend(self, resume: bool = False) -> None:
+		"""Goes to the node of the next level, which is the summary cluster of the current node if 'resume' is True"""
+		if resume == True:
+			self.counters[RESUME_CALLS] += 1
+			self.summaries.append(self.level)
+		self.moveTo(self.level + 1)
+		self.counters[CALLS] += 1
+	def ascend(self) -> None:
+		"""Comes back to the node which went into its summary cluster last"""
+		self.moveTo(self.summaries.pop())
+	def close(self) -> None:
+		"""Adds the time since the last move to the current level"""
+		self.counters[NANOSECONDS] += perf_counter_ns() - self.clock
+class _CurrentTrace(object):
+	"""Passes moves of the instrumented methods to the trace of the operation which runs in this thread"""
+	__slots__ = ("_local",)
+	def __init__(self, local: threading.local) -> None:
+		self._local = local
+	def descend(self, resume: bool = False) -> None:
+		self._local.trace.descend(resume)
+	def moveTo(self, level: int) -> None:
+		self._local.trace.moveTo(level)
+	def ascend(self) -> None:
+		self._local.trace.ascend()
+# Comment of VEBTree which marks the move between the levels, see _instrument
+_TRACE_MARK = re.compile(r"^(\s*)# trace: ", re.MULTILINE)
+class VEBProfiler(object):
+	"""Counts work of the operations of VEBTree per level of the tree
+	   Level 0 is the root, level i + 1 is a cluster or the summary cluster of the node of level i
+	   For every operation and every level the profiler counts:
+			calls		- visits of the nodes of the level
+			resumeCalls	- descents from the node of the level into its summary cluster (insertion into the empty cluster,
+						  removal of the last value of the cluster, search of the next non empty cluster)
+			allocations	- clusters and summary clusters created by the nodes of the level, copies of the nodes
+						  which are shared with snapshots included
+			nanoseconds	- time spent in the nodes of the level
+	   Profiled operations are containsValue, insertValue, removeValue, getSuccessor, getPredecessor,
+	   insertMany, removeMany and containsMany of VEBTree (and of the trees which call them, like VEBSnapshot
+	   and ConcurrentVEBTree); other methods and overridden methods of subclasses like VEBMap are not profiled
+	   Instrumented copies of the methods replace the methods of VEBTree class only while the profiler is started,
+	   so without the profiler VEBTree runs its usual code and instrumentation costs nothing;
+	   the copies are compiled from the source of VEBTree with its '# trace:' comments turned into calls,
+	   so they run the same loops and give the same answers, only slower
+	   One profiler may be started at a time; it profiles all threads, but increments from several threads
+	   at once may be lost, so concurrent numbers are approximate
+	Usage:
+			with VEBProfiler() as profiler:
+				tree.insertValue(value)
+			profiler.stats()["insertValue"][1]["resumeCalls"]
+	"""
+	# Profiler which is started now
+	_active = None
+	# Methods which are replaced while the profiler is started
+	POINT_OPERATIONS = ("containsValue", "insertValue", "removeValue", "getSuccessor", "getPredecessor")
+	BATCH_OPERATIONS = {"insertMany": "_insertSorted", "removeMany": "_removeSorted", "containsMany": "_containsSorted"}
+	def __init__(self) -> None:
+		# Name of the operation: list of counters of every level
+		self._counters = {}
+		self._local = threading.local()
+		self._original = {}
+	def start(self) -> None:
+		"""Replaces the methods of VEBTree with the instrumented ones
+		   Raises RuntimeError if other profiler is started
+		"""
+		if VEBProfiler._active != None:
+			raise RuntimeError("Other VEBProfiler is started")
+		VEBProfiler._active = self
+		methods = {}
+		for name in self.POINT_OPERATIONS:
+			methods[name] = self._profilePoint(name, self._instrument(name), VEBTree.__dict__[name])
+		for name, recursive in self.BATCH_OPERATIONS.items():
+			methods[name] = self._profileBatch(name, VEBTree.__dict__[name])
+			methods[recursive] = self._profileRecursion(VEBTree.__dict__[recursive])
+		methods["_loadSorted"] = self._profileRecursion(VEBTree.__dict__["_loadSorted"])
+		methods["_newTree"] = self._profileAllocation(VEBTree.__dict__["_newTree"])
+		methods["_copy"] = self._profileAllocation(VEBTree.__dict__["_copy"])
+		for name, method in methods.items():
+			self._original[name] = VEBTree.__dict__[name]
+			setattr(VEBTree, name, method)
+	def stop(self) -> None:
+		"""Puts the original methods of VEBTree back"""
+		if VEBProfiler._active is not self:
+			return
+		for name, method in self._original.items():
+			setattr(VEBTree, name, method)
+		self._original = {}
+		VEBProfiler._active = None
+	def __enter__(self) -> 'VEBProfiler':
+		self.start()
+		return self
+	def __exit__(self, *exception) -> None:
+		self.stop()
+	def reset(self) -> None:
+		"""Sets all counters to zero"""
+		self._counters = {}
+	def stats(self) -> dict:
+		"""Returns collected counters
+		Return:
+					dict - name of the operation: {level: {"calls", "resumeCalls", "allocations", "nanoseconds": int}}
+		"""
+		result = {}
+		for operation, levels in self._counters.items():
+			result[operation] = {level: dict(zip(COUNTER_NAMES, counters)) for level, counters in enumerate(levels)}
+		return result
+	def report(self) -> str:
+		"""Returns counters as a table, one line for every level of every operation"""
+		lines = ["{:<16}{:>6}{:>12}{:>12}{:>12}{:>14}{:>10}".format("operation", "level", "calls", "resumeCalls", "allocations", "nanoseconds", "ns/call")]
+		for operation, levels in sorted(self._counters.items()):
+			for level, (calls, resumeCalls, allocations, nanoseconds) in enumerate(levels):
+				lines.append("{:<16}{:>6}{:>12}{:>12}{:>12}{:>14}{:>10}".format(operation, level, calls, resumeCalls, allocations,
+					nanoseconds, nanoseconds // calls if calls else 0))
+		return "\n".join(lines)
+	def _begin(self, operation: str) -> _Trace:
+		"""Starts the trace of the operation at the root"""
+		trace = _Trace(self._counters.setdefault(operation, []))
+		trace.descend()
+		self._local.trace = trace
+		return trace
+	def _end(self, trace: _Trace) -> None:
+		trace.close()
+		self._local.trace = None
+	def _tracing(self) -> bool:
+		"""Checks whether some operation is profiled in this thread already; nested calls are counted as its part"""
+		return getattr(self._local, "trace", None) != None
+	def _instrument(self, name: str):
+		"""Compiles the copy of the method of VEBTree whose '# trace:' comments are calls of the trace of the running operation
+		   The copy is compiled in the namespace of the module of VEBTree at the lines of the original, so tracebacks point there
+		"""
+		lines, firstLine = inspect.getsourcelines(VEBTree.__dict__[name])
+		source = "\n" * (firstLine - 1) + _TRACE_MARK.sub(r"\1", textwrap.dedent("".join(lines)))
+		namespace = dict(sys.modules[VEBTree.__module__].__dict__)
+		namespace["trace"] = _CurrentTrace(self._local)
+		exec(compile(source, inspect.getsourcefile(VEBTree), "exec"), namespace)
+		return namespace[name]
+	def _profilePoint(self, operation: str, method, original):
+		"""Wraps the instrumented copy of the point operation, so the call is traced from the root
+		   Point operations which are called inside other profiled operation run the original method
+		"""
+		profiler = self
+		def point(tree, value):
+			if profiler._tracing():
+				return original(tree, value)
+			trace = profiler._begin(operation)
+			try:
+				return method(tree, value)
+			finally:
+				profiler._end(trace)
+		return point
+	def _profileAllocation(self, method):
+		"""Wraps _newTree or _copy, so every new node is counted at the current level of the running operation"""
+		local = self._local
+		def allocate(node, *arguments):
+			trace = getattr(local, "trace", None)
+			if trace != None:
+				trace.counters[ALLOCATIONS] += 1
+			return method(node, *arguments)
+		return allocate
+	def _profileBatch(self, operation: str, method):
+		"""Wraps insertMany, removeMany or containsMany, so their recursive calls are counted under their name"""
+		profiler = self
+		def batch(tree, values):
+			if profiler._tracing():
+				return method(tree, values)
+			trace = profiler._begin(operation)
+			trace.nodes.append(tree)
+			try:
+				return method(tree, values)
+			finally:
+				profiler._end(trace)
+		return batch
+	def _profileRecursion(self, method):
+		"""Wraps recursive method of the batch operations, every call on the node of the next level is counted there"""
+		local = self._local
+		def recursion(node, *arguments):
+			trace = getattr(local, "trace", None)
+			if trace == None or not trace.nodes:
+				return method(node, *arguments)
+			parent = trace.nodes[-1]
+			if parent is node:
+				# The batch method itself calls the recursive one on the root
+				return method(node, *arguments)
+			level = trace.level
+			trace.descend(parent.resume is node)
+			trace.nodes.append(node)
+			try:
+				return method(node, *arguments)
+			finally:
+				trace.nodes.pop()
+				trace.moveTo(level)
+		return recursion
@@ -0,0 +1,340 @@
+import argparse
+import asyncio
+import itertools
+import struct
+import sys
+from array import array
+from VEBTree import VEBTree
+# Binary protocol of the server
+# Every frame (little-endian) is the header: number of the request, code, 3 bytes of padding, quantity of values,
+# and then the values as 64-bit unsigned words
+# Request has the code of the operation, response has the number of its request and the status code
+# Every operation takes many values, so one frame is a batch; client may send next frames without waiting for answers
+# (pipelining), server answers the frames of one connection in the same order
+#	INFO		- no values; answer is [power of 2 of the universum, quantity of values]
+#	INSERT		- values; answer is [quantity of values which were not in the tree]
+#	REMOVE		- values; answer is [quantity of removed values]
+#	CONTAINS	- values; answer is 1 or 0 for every value
+#	SUCCESSOR	- values; answer is successor of every value or NO_SUCCESSOR
+#	PREDECESSOR - values; answer is predecessor of every value or NO_PREDECESSOR
+#	RANGE		- [low, last] or [low, last, limit]; answer is values of the tree in [low, last] (last is included,
+#				  2^64 does not fit into the word), not more than limit values if it is given and is not 0
+# Values which are not less than the universum are invalid and are treated as by VEBTree
+# Request which can not be run (unknown code, error of the tree) gets ERROR status with no values, the connection stays open;
+# frame with more than MAX_VALUES values gets ERROR with its number and the connection is closed, its values are not read
+HEADER = struct.Struct("<IBxxxI")
+INFO, INSERT, REMOVE, CONTAINS, SUCCESSOR, PREDECESSOR, RANGE = range(7)
+OK, ERROR = range(2)
+# Successor is always greater than 0 and predecessor is always less than 2^64 - 1,
+# so these words mean the missing answer even for the universum 2^64
+NO_SUCCESSOR = 0
+NO_PREDECESSOR = 0xFFFFFFFFFFFFFFFF
+MAX_VALUES = 1 << 20
+def _packValues(values) -> bytes:
+	"""Returns values as little-endian 64-bit words"""
+	words = array("Q", values)
+	if sys.byteorder != "little":
+		words.byteswap()
+	return words.tobytes()
+def _unpackValues(data: bytes) -> array:
+	"""Returns little-endian 64-bit words of the data as array"""
+	words = array("Q")
+	words.frombytes(data)
+	if sys.byteorder != "little":
+		words.byteswap()
+	return words
+async def _readHeader(reader: asyncio.StreamReader) -> tuple:
+	"""Reads the header of one frame
+	Return:
+				tuple - number of the request, code and quantity of values
+	"""
+	return HEADER.unpack(await reader.readexactly(HEADER.size))
+async def _readFrame(reader: asyncio.StreamReader) -> tuple:
+	"""Reads one frame
+	Return:
+				tuple - number of the request, code and array of values
+	Raises:
+				ValueError - if the frame has more than MAX_VALUES values
+	"""
+	number, code, count = await _readHeader(reader)
+	if count > MAX_VALUES:
+		raise ValueError("Frame has {} values, not more than {} are allowed".format(count, MAX_VALUES))
+	return number, code, _unpackValues(await reader.readexactly(8 * count))
+class VEBServer(object):
+	"""asyncio server which gives access to one tree through TCP or Unix socket
+	   All requests run in the thread of the event loop one after another, so the tree needs no lock;
+	   the tree should not be changed by other threads while the server works
+	Attributes:
+		tree - VEBTree (or FlatVEBTree) object with the universum not bigger than 2^64
+	"""
+	def __init__(self, tree = None, universum: int = 2**32) -> None:
+		"""Initializing function of the VEBServer class
+		Arguments:
+					tree	  - served tree; new VEBTree object is created if it is None
+					universum - the size of the universum of the new tree
+		"""
+		if tree == None:
+			tree = VEBTree(universum)
+		if tree.universum > 1 << 64:
+			raise ValueError("Values of the universum {} do not fit into 64 bits".format(tree.universum))
+		self.tree = tree
+		self._server = None
+	async def start(self, host: str = "127.0.0.1", port: int = 0) -> int:
+		"""Starts listening on TCP socket
+		Return:
+					int - port of the socket, it is chosen by the system if 'port' is 0
+		"""
+		self._server = await asyncio.start_server(self._serveConnection, host, port)
+		return self._server.sockets[0].getsockname()[1]
+	async def startUnix(self, path: str) -> None:
+		"""Starts listening on Unix socket with given path"""
+		self._server = await asyncio.start_unix_server(self._serveConnection, path)
+	async def serveForever(self) -> None:
+		await self._server.serve_forever()
+	async def close(self) -> None:
+		"""Stops listening; connections which are already open are served until clients close them"""
+		self._server.close()
+		await self._server.wait_closed()
+	async def _serveConnection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		"""Answers frames of one connection until the client closes it or sends too big frame
+		   Error of one request is sent to the client as ERROR answer to this request, the next requests are served
+		"""
+		try:
+			while True:
+				try:
+					number, code, count = await _readHeader(reader)
+					if count > MAX_VALUES:
+						# The values are not read, so the next frame can not be found; the client gets the number
+						# of the failed request and its other requests fail when the connection is closed
+						writer.write(HEADER.pack(number, ERROR, 0))
+						break
+					values = _unpackValues(await reader.readexactly(8 * count))
+				except asyncio.IncompleteReadError:
+					break
+				try:
+					status, answer = self.execute(code, values)
+					frame = HEADER.pack(number, status, len(answer)) + _packValues(answer)
+				except Exception:
+					frame = HEADER.pack(number, ERROR, 0)
+				writer.write(frame)
+				# Answers of the pipelined requests are gathered in the buffer, drain waits only if the client is slow
+				await writer.drain()
+		except ConnectionError:
+			pass
+		finally:
+			writer.close()
+	def execute(self, code: int, values: array) -> tuple:
+		"""Runs one request on the tree
+		Arguments:
+					code   - code of the operation
+					values - array of values of the request
+		Return:
+					tuple - status code and list of values of the answer
+		"""
+		tree = self.tree
+		if code == INFO:
+			return OK, [tree.universum.bit_length() - 1, len(tree)]
+		if code == INSERT:
+			return OK, [tree.insertMany(values)]
+		if code == REMOVE:
+			return OK, [tree.removeMany(values)]
+		if code == CONTAINS:
+			return OK, [int(contained) for contained in tree.containsMany(values)]
+		if code == SUCCESSOR or code == PREDECESSOR:
+			find = tree.getSuccessor
+			missing = NO_SUCCESSOR
+			if code == PREDECESSOR:
+				find = tree.getPredecessor
+				missing = NO_PREDECESSOR
+			answer = []
+			for value in values:
+				found = find(value)
+				answer.append(missing if found == None else found)
+			return OK, answer
+		if code == RANGE and 2 <= len(values) <= 3:
+			limit = MAX_VALUES
+			if len(values) == 3 and values[2]:
+				limit = min(values[2], MAX_VALUES)
+			return OK, list(itertools.islice(tree.range(values[0], values[1] + 1), limit))
+		return ERROR, []
+class VEBClient(object):
+	"""asyncio client of VEBServer
+	   Requests of concurrent coroutines are pipelined through one connection: every request is written at once
+	   and waits for the answer with its number, so several requests are in flight without waiting for each other
+	Attributes:
+		universum - the size of the universum of the served tree
+	"""
+	def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+		"""Initializing function of the VEBClient class, connect or connectUnix should be used instead"""
+		self._reader = reader
+		self._writer = writer
+		self._nextNumber = 0
+		self._waiting = {}
+		self._readingTask = asyncio.ensure_future(self._readAnswers())
+		self.universum = None
+	@classmethod
+	async def connect(cls, host: str = "127.0.0.1", port: int = 7878) -> 'VEBClient':
+		"""Connects to the server through TCP socket"""
+		reader, writer = await asyncio.open_connection(host, port)
+		return await cls(reader, writer)._start()
+	@classmethod
+	async def connectUnix(cls, path: str) -> 'VEBClient':
+		"""Connects to the server through Unix socket"""
+		reader, writer = await asyncio.open_unix_connection(path)
+		return await cls(reader, writer)._start()
+	async def _start(self) -> 'VEBClient':
+		self.universum = 1 << (await self._request(INFO, []))[0]
+		return self
+	async def close(self) -> None:
+		self._writer.close()
+		await self._writer.wait_closed()
+		await self._readingTask
+	async def __aenter__(self) -> 'VEBClient':
+		return self
+	async def __aexit__(self, *exception) -> None:
+		await self.close()
+	async def _readAnswers(self) -> None:
+		"""Gives answers to the waiting requests; when the connection is closed all waiting requests fail"""
+		error = ConnectionError("Connection to the server is closed")
+		try:
+			while True:
+				number, status, values = await _readFrame(self._reader)
+				future = self._waiting.pop(number, None)
+				if future == None or future.done():
+					continue
+				if status == OK:
+					future.set_result(values)
+				else:
+					future.set_exception(ValueError("Server could not run the request"))
+		except (asyncio.IncompleteReadError, ConnectionError, ValueError) as exception:
+			if isinstance(exception, ValueError):
+				error = exception
+		for future in self._waiting.values():
+			if not future.done():
+				future.set_exception(error)
+		self._waiting.clear()
+	async def _request(self, code: int, values) -> array:
+		"""Sends the request and waits for its answer
+		Return:
+					array - values of the answer
+		"""
+		if self._readingTask.done():
+			raise ConnectionError("Connection to the server is closed")
+		number = self._nextNumber
+		self._nextNumber = (number + 1) & 0xFFFFFFFF
+		future = asyncio.get_running_loop().create_future()
+		self._waiting[number] = future
+		self._writer.write(HEADER.pack(number, code, len(values)) + _packValues(values))
+		await self._writer.drain()
+		return await future
+	def _isValueValid(self, value: int) -> bool:
+		return type(value) == int and 0 <= value < self.universum
+	def _validValues(self, values) -> tuple:
+		"""Returns list of the valid values and list of their positions in 'values'"""
+		validValues = []
+		positions = []
+		for position, value in enumerate(values):
+			if self._isValueValid(value):
+				validValues.append(value)
+				positions.append(position)
+		return validValues, positions
+	async def length(self) -> int:
+		"""Returns quantity of values in the served tree"""
+		return (await self._request(INFO, []))[1]
+	async def insertValue(self, value: int) -> bool:
+		if self._isValueValid(value) == False:
+			return False
+		await self._request(INSERT, [value])
+		return True
+	async def removeValue(self, value: int) -> bool:
+		if self._isValueValid(value) == False:
+			return False
+		return (await self._request(REMOVE, [value]))[0] == 1
+	async def containsValue(self, value: int) -> bool:
+		if self._isValueValid(value) == False:
+			return False
+		return (await self._request(CONTAINS, [value]))[0] == 1
+	async def getSuccessor(self, value: int) -> int:
+		return (await self.successorMany([value]))[0]
+	async def getPredecessor(self, value: int) -> int:
+		return (await self.predecessorMany([value]))[0]
+	async def insertMany(self, values) -> int:
+		"""Inserts values in batches of MAX_VALUES
+		Return:
+					int - quantity of values which were not in the tree before
+		"""
+		values = self._validValues(values)[0]
+		inserted = 0
+		for start in range(0, len(values), MAX_VALUES):
+			inserted += (await self._request(INSERT, values[start: start + MAX_VALUES]))[0]
+		return inserted
+	async def removeMany(self, values) -> int:
+		"""Removes values in batches of MAX_VALUES
+		Return:
+					int - quantity of removed values
+		"""
+		values = self._validValues(values)[0]
+		removed = 0
+		for start in range(0, len(values), MAX_VALUES):
+			removed += (await self._request(REMOVE, values[start: start + MAX_VALUES]))[0]
+		return removed
+	async def _queryMany(self, code: int, values, missing) -> list:
+		"""Sends valid values in batches and puts answers to the positions of the values, 'missing' for invalid ones"""
+		values = list(values)
+		validValues, positions = self._validValues(values)
+		answers = [missing] * len(values)
+		for start in range(0, len(validValues), MAX_VALUES):
+			answer = await self._request(code, validValues[start: start + MAX_VALUES])
+			for position, value in zip(positions[start: start + MAX_VALUES], answer):
+				answers[position] = value
+		return answers
+	async def containsMany(self, values) -> list:
+		"""Return: list - True or False for every given value in the same order"""
+		return [answer == 1 for answer in await self._queryMany(CONTAINS, values, 0)]
+	async def successorMany(self, values) -> list:
+		"""Return: list - successor or None for every given value in the same order"""
+		return [None if answer == NO_SUCCESSOR else answer for answer in await self._queryMany(SUCCESSOR, values, NO_SUCCESSOR)]
+	async def predecessorMany(self, values) -> list:
+		"""Return: list - predecessor or None for every given value in the same order"""
+		return [None if answer == NO_PREDECESSOR else answer for answer in await self._queryMany(PREDECESSOR, values, NO_PREDECESSOR)]
+	async def range(self, low: int = 0, high: int = None, limit: int = 0) -> list:
+		"""Returns values of the tree in [low, high) in ascending order
+		Arguments:
+					low   - the least value of the range
+					high  - value after the greatest value of the range; universum if it is None
+					limit - the biggest quantity of returned values, 0 means MAX_VALUES
+		"""
+		if high == None or high > self.universum:
+			high = self.universum
+		low = max(low, 0)
+		if low >= high:
+			return []
+		# high may be equal to 2^64, so the last value of the range is sent instead
+		return list(await self._request(RANGE, [low, high - 1, limit]))
+def main(arguments: list = None) -> int:
+	parser = argparse.ArgumentParser(description = "Serves vEB tree through TCP or Unix socket")
+	parser.add_argument("--power", type = int, default = 32, help = "power of 2 of the universum")
+	parser.add_argument("--host", default = "127.0.0.1")
+	parser.add_argument("--port", type = int, default = 7878)
+	parser.add_argument("--unix", default = None, help = "path of the Unix socket which is used instead of TCP")
+	parser.add_argument("--sparse", action = "store_true", help = "keep clusters of the tree in the sparse mode")
+	parser.add_argument("--load", default = None, help = "file written by VEBTree.dump which is served")
+	options = parser.parse_args(arguments)
+	if options.load != None:
+		tree = VEBTree.load(options.load, sparse = options.sparse)
+	else:
+		tree = VEBTree(2**options.power, sparse = options.sparse)
+	server = VEBServer(tree)
+	async def serve() -> None:
+		if options.unix != None:
+			await server.startUnix(options.unix)
+		else:
+			await server.start(options.host, options.port)
+		await server.serveForever()
+	try:
+		asyncio.run(serve())
+	except KeyboardInterrupt:
+		pass
+	return 0
+if __name__ == "__main__":
+	sys.exit(main())
@@ -0,0 +1,82 @@
+from VEBTree import VEBTree
+class VEBSnapshot(object):
+	"""Read-only view of the values which VEBTree object had when VEBTree.snapshot was called
+	   The view shares nodes with the tree, the tree copies the node before it changes it,
+	   so later changes of the tree are not seen in the view
+	   The view has only the queries of VEBTree and may be read by many threads while the tree changes
+	Attributes:
+		universum - the size of the universum
+	"""
+	__slots__ = ("_tree",)
+	def __init__(self, tree: VEBTree):
+		"""Initializing function of the VEBSnapshot class
+		Arguments:
+					tree - frozen root which is not changed by anybody
+		"""
+		self._tree = tree
+	@property
+	def universum(self) -> int:
+		return self._tree.universum
+	def isSparse(self) -> bool:
+		return self._tree.isSparse()
+	def getMin(self):
+		return self._tree.getMin()
+	def getMax(self):
+		return self._tree.getMax()
+	def containsValue(self, value: int) -> bool:
+		return self._tree.containsValue(value)
+	def getSuccessor(self, value: int) -> int:
+		return self._tree.getSuccessor(value)
+	def getPredecessor(self, value: int) -> int:
+		return self._tree.getPredecessor(value)
+	def __len__(self) -> int:
+		return len(self._tree)
+	def rank(self, value: int) -> int:
+		return self._tree.rank(value)
+	def select(self, index: int) -> int:
+		return self._tree.select(index)
+	def containsMany(self, values) -> list:
+		return self._tree.containsMany(values)
+	def containsArray(self, queries):
+		return self._tree.containsArray(queries)
+	def successorArray(self, queries):
+		return self._tree.successorArray(queries)
+	def predecessorArray(self, queries):
+		return self._tree.predecessorArray(queries)
+	def __iter__(self):
+		return iter(self._tree)
+	def __reversed__(self):
+		return reversed(self._tree)
+	def range(self, low: int = 0, high: int = None):
+		return self._tree.range(low, high)
+	def memoryUsage(self) -> dict:
+		return self._tree.memoryUsage()
+	def dump(self, path: str, encoding: str = None) -> None:
+		self._tree.dump(path, encoding)
+	def toTree(self) -> VEBTree:
+		"""Returns new changeable VEBTree object with the values of the view"""
+		return VEBTree.fromSorted(list(self._tree), self._tree.universum, self._tree.leafSize, self._tree.isSparse(), self._tree.getSplit())
+class VEBMapSnapshot(VEBSnapshot):
+	"""Read-only view of the items which VEBMap object had when VEBMap.snapshot was called
+	   Besides the queries of the keys the view has the queries of the payloads of VEBMap
+	"""
+	__slots__ = ()
+	def get(self, key: int, default = None):
+		return self._tree.get(key, default)
+	def __getitem__(self, key: int):
+		return self._tree[key]
+	def __contains__(self, key: int) -> bool:
+		return key in self._tree
+	def floorItem(self, key: int) -> tuple:
+		return self._tree.floorItem(key)
+	def ceilingItem(self, key: int) -> tuple:
+		return self._tree.ceilingItem(key)
+	def items(self):
+		return self._tree.items()
+	def keys(self):
+		return self._tree.keys()
+	def values(self):
+		return self._tree.values()
+	def toTree(self) -> VEBTree:
+		"""Returns new changeable VEBMap object with the items of the view"""
+		return self._tree.copy()
@@ -0,0 +1,305 @@
+import bisect
+import mmap
+import struct
+import sys
+from array import array
+from VEBTree import VEBTree
+# Binary format of the vEB tree
+# Header (little-endian, 32 bytes): magic b"VEBT", version, encoding, power of 2 of the universum, padding,
+# quantity of values, the least value and the biggest value
+# Encoding "bitmap": levels of 64-bit words, the first level has bit number i set if value i is in the tree,
+# every next level has bit number i set if word number i of the previous level is not zero; the last level is one word
+# Encoding "keys": values are split into blocks of BLOCK_SIZE values; array of the first values of the blocks,
+# array of offsets of the blocks in the data and data with differences between neighbour values of the block as varints
+MAGIC = b"VEBT"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBxQQQ")
+ENCODINGS = ("bitmap", "keys")
+BLOCK_SIZE = 64
+def _bitmapLevelSizes(universum: int) -> list:
+	"""Returns quantity of 64-bit words on every level of the bitmap"""
+	sizes = []
+	bits = universum
+	while True:
+		words = max(1, (bits + 63) >> 6)
+		sizes.append(words)
+		if words == 1:
+			return sizes
+		bits = words
+def _words(buffer, offset: int, count: int):
+	"""Returns 'count' little-endian 64-bit words of the buffer starting from 'offset'
+	   Memory-mapped buffer is not copied on little-endian machines
+	"""
+	view = memoryview(buffer)[offset: offset + 8 * count]
+	if sys.byteorder == "little":
+		return view.cast("Q")
+	words = array("Q")
+	words.frombytes(view)
+	words.byteswap()
+	return words
+def _chooseEncoding(universum: int, count: int) -> str:
+	"""Chooses encoding with the smaller estimated size of the file"""
+	if count == 0:
+		return "keys"
+	bitmapSize = 8 * sum(_bitmapLevelSizes(universum))
+	deltaSize = ((universum // count).bit_length() + 6) // 7
+	keysSize = count * deltaSize + 16 * ((count + BLOCK_SIZE - 1) // BLOCK_SIZE)
+	if bitmapSize <= keysSize:
+		return "bitmap"
+	return "keys"
+def _writeWords(outputFile, words: array) -> None:
+	"""Writes words in little-endian order"""
+	if sys.byteorder != "little":
+		words = array("Q", words)
+		words.byteswap()
+	words.tofile(outputFile)
+def dumpTree(tree: VEBTree, path: str, encoding: str = None) -> None:
+	"""Writes values of the tree into the binary file
+	Arguments:
+				tree	 - VEBTree object
+				path	 - path of the file
+				encoding - "bitmap", "keys" or None to choose the smaller one
+	"""
+	universum = tree.universum
+	count = len(tree)
+	if encoding == None:
+		encoding = _chooseEncoding(universum, count)
+	if encoding not in ENCODINGS:
+		raise ValueError("Unknown encoding {}".format(encoding))
+	minElement = tree.getMin()
+	maxElement = tree.getMax()
+	header = HEADER.pack(MAGIC, VERSION, ENCODINGS.index(encoding), universum.bit_length() - 1, count,
+		minElement if minElement != None else 0, maxElement if maxElement != None else 0)
+	with open(path, "wb") as outputFile:
+		outputFile.write(header)
+		if encoding == "bitmap":
+			sizes = _bitmapLevelSizes(universum)
+			bitmap = bytearray(8 * sizes[0])
+			for base, bits in tree._iterBitmaps(0):
+				start = base >> 3
+				bits <<= base & 7
+				stop = start + ((bits.bit_length() + 7) >> 3)
+				bitmap[start: stop] = (int.from_bytes(bitmap[start: stop], "little") | bits).to_bytes(stop - start, "little")
+			outputFile.write(bitmap)
+			words = _words(bitmap, 0, sizes[0])
+			for size in sizes[1:]:
+				level = array("Q", [0]) * size
+				for index, word in enumerate(words):
+					if word:
+						level[index >> 6] |= 1 << (index & 63)
+				words = level
+				_writeWords(outputFile, level)
+		else:
+			firstValues = array("Q")
+			offsets = array("Q")
+			data = bytearray()
+			previous = None
+			for index, value in enumerate(tree):
+				if index % BLOCK_SIZE == 0:
+					firstValues.append(value)
+					offsets.append(len(data))
+				else:
+					delta = value - previous
+					while delta >= 0x80:
+						data.append(delta & 0x7f | 0x80)
+						delta >>= 7
+					data.append(delta)
+				previous = value
+			_writeWords(outputFile, firstValues)
+			_writeWords(outputFile, offsets)
+			outputFile.write(data)
+def _readHeader(buffer) -> tuple:
+	"""Returns (encoding, universum, count, minElement, maxElement) from the header of the file"""
+	if len(buffer) < HEADER.size:
+		raise ValueError("File is too short for vEB tree")
+	magic, version, encoding, power, count, minElement, maxElement = HEADER.unpack_from(buffer)
+	if magic != MAGIC or version != VERSION or encoding >= len(ENCODINGS):
+		raise ValueError("File does not contain vEB tree")
+	return ENCODINGS[encoding], 1 << power, count, minElement, maxElement
+def _decodeBlock(data, offset: int, value: int, length: int):
+	"""Yields 'length' values of the block which starts with 'value' and has differences at 'offset' of the data"""
+	yield value
+	for index in range(length - 1):
+		delta = 0
+		shift = 0
+		byte = data[offset]
+		while byte & 0x80:
+			delta |= (byte & 0x7f) << shift
+			shift += 7
+			offset += 1
+			byte = data[offset]
+		offset += 1
+		value += delta | (byte << shift)
+		yield value
+def loadTree(path: str, treeClass = VEBTree, leafSize: int = None, sparse: bool = False) -> VEBTree:
+	"""Reads values from the binary file and builds the tree with treeClass.fromSorted
+	Arguments:
+				path	  - path of the file
+				treeClass - class of the built tree
+				leafSize  - the biggest universum which is stored as bitmap
+				sparse	  - flag of the sparse mode
+	Return:
+				VEBTree - new tree which contains values from the file
+	"""
+	with open(path, "rb") as inputFile:
+		buffer = inputFile.read()
+	encoding, universum, count, minElement, maxElement = _readHeader(buffer)
+	values = []
+	if encoding == "bitmap":
+		for index, word in enumerate(_words(buffer, HEADER.size, _bitmapLevelSizes(universum)[0])):
+			base = index << 6
+			while word:
+				lowestBit = word & -word
+				values.append(base + lowestBit.bit_length() - 1)
+				word ^= lowestBit
+	else:
+		blocks = (count + BLOCK_SIZE - 1) // BLOCK_SIZE
+		firstValues = _words(buffer, HEADER.size, blocks)
+		offsets = _words(buffer, HEADER.size + 8 * blocks, blocks)
+		data = memoryview(buffer)[HEADER.size + 16 * blocks:]
+		for block in range(blocks):
+			values.extend(_decodeBlock(data, offsets[block], firstValues[block], min(BLOCK_SIZE, count - block * BLOCK_SIZE)))
+	return treeClass.fromSorted(values, universum, leafSize, sparse)
+class MappedVEBTree(object):
+	"""Read-only view of the file written by VEBTree.dump
+	   The file is memory-mapped, queries read only the words or blocks they need, so opening does not depend on the size
+	Attributes:
+		universum - the size of the universum
+	"""
+	def __init__(self, path: str):
+		with open(path, "rb") as inputFile:
+			self._mmap = mmap.mmap(inputFile.fileno(), 0, access = mmap.ACCESS_READ)
+		encoding, self.universum, self._count, minElement, maxElement = _readHeader(self._mmap)
+		self._encoding = encoding
+		self._minElement = minElement if self._count else None
+		self._maxElement = maxElement if self._count else None
+		if encoding == "bitmap":
+			self._levels = []
+			offset = HEADER.size
+			for size in _bitmapLevelSizes(self.universum):
+				self._levels.append(_words(self._mmap, offset, size))
+				offset += 8 * size
+		else:
+			blocks = (self._count + BLOCK_SIZE - 1) // BLOCK_SIZE
+			self._firstValues = _words(self._mmap, HEADER.size, blocks)
+			self._offsets = _words(self._mmap, HEADER.size + 8 * blocks, blocks)
+			self._data = memoryview(self._mmap)[HEADER.size + 16 * blocks:]
+	def close(self) -> None:
+		"""Releases views of the file and unmaps it"""
+		if self._mmap.closed:
+			return
+		if self._encoding == "bitmap":
+			for level in self._levels:
+				if isinstance(level, memoryview):
+					level.release()
+			self._levels = []
+		else:
+			for view in (self._firstValues, self._offsets, self._data):
+				if isinstance(view, memoryview):
+					view.release()
+		self._mmap.close()
+	def __enter__(self) -> 'MappedVEBTree':
+		return self
+	def __exit__(self, *exception) -> None:
+		self.close()
+	def _isValueValid(self, value: int) -> bool:
+		return type(value) == int and 0 <= value < self.universum
+	def getMin(self):
+		return self._minElement
+	def getMax(self):
+		return self._maxElement
+	def __len__(self) -> int:
+		return self._count
+	def _block(self, block: int):
+		"""Yields values of the block with number 'block'"""
+		return _decodeBlock(self._data, self._offsets[block], self._firstValues[block], min(BLOCK_SIZE, self._count - block * BLOCK_SIZE))
+	def containsValue(self, value: int) -> bool:
+		"""Checks whether value is in the file
+		Return:
+					True  - if value is in the file
+					False - if value is not in the file or value is invalid
+		"""
+		if self._isValueValid(value) == False or self._count == 0:
+			return False
+		if self._encoding == "bitmap":
+			return (self._levels[0][value >> 6] >> (value & 63)) & 1 == 1
+		block = bisect.bisect_right(self._firstValues, value) - 1
+		if block < 0:
+			return False
+		for storedValue in self._block(block):
+			if storedValue >= value:
+				return storedValue == value
+		return False
+	def getSuccessor(self, value: int) -> int:
+		"""Finds the least value in the file which is greater than 'value'
+		Return:
+					int  - successor of the value
+					None - if there is no successor or value is invalid
+		"""
+		if self._isValueValid(value) == False or self._count == 0 or value >= self._maxElement:
+			return None
+		if self._encoding == "keys":
+			block = bisect.bisect_right(self._firstValues, value) - 1
+			if block >= 0:
+				for storedValue in self._block(block):
+					if storedValue > value:
+						return storedValue
+			return self._firstValues[block + 1]
+		# Goes up while words have no bits after the position, then goes down through the lowest set bits
+		levels = self._levels
+		position = value + 1
+		level = 0
+		while True:
+			index = position >> 6
+			word = levels[level][index] >> (position & 63)
+			if word:
+				position += (word & -word).bit_length() - 1
+				while level > 0:
+					level -= 1
+					word = levels[level][position]
+					position = (position << 6) + (word & -word).bit_length() - 1
+				return position
+			position = index + 1
+			level += 1
+	def getPredecessor(self, value: int) -> int:
+		"""Finds the biggest value in the file which is less than 'value'
+		Return:
+					int  - predecessor of the value
+					None - if there is no predecessor or value is invalid
+		"""
+		if self._isValueValid(value) == False or self._count == 0 or value <= self._minElement:
+			return None
+		if self._encoding == "keys":
+			block = bisect.bisect_left(self._firstValues, value) - 1
+			predecessor = None
+			for storedValue in self._block(block):
+				if storedValue >= value:
+					break
+				predecessor = storedValue
+			return predecessor
+		# Goes up while words have no bits before the position, then goes down through the highest set bits
+		levels = self._levels
+		position = value - 1
+		level = 0
+		while True:
+			index = position >> 6
+			word = levels[level][index] & ((2 << (position & 63)) - 1)
+			if word:
+				position = (index << 6) + word.bit_length() - 1
+				while level > 0:
+					level -= 1
+					position = (position << 6) + levels[level][position].bit_length() - 1
+				return position
+			position = index - 1
+			level += 1
+	def __iter__(self):
+		if self._encoding == "keys":
+			for block in range(len(self._firstValues)):
+				yield from self._block(block)
+			return
+		for index, word in enumerate(self._levels[0]):
+			base = index << 6
+			while word:
+				lowestBit = word & -word
+				yield base + lowestBit.bit_length() - 1
+				word ^= lowestBit
@@ -1,13 +1,56 @@
-import math
+import bisect
+import itertools
+import operator
+import sys
+class SparseClusters(dict):
+	"""Clusters of the sparse VEBTree object keyed by the index of the cluster
+	   Behaves like the list of clusters: cluster which was not created yet is None
+	"""
+	__slots__ = ()
+	def __missing__(self, clusterIndex: int) -> None:
+		return None
+class SparseCounts(dict):
+	"""Fenwick tree of the sizes of the clusters of the sparse VEBTree object keyed by the position in the tree
+	   Behaves like the list of the sums: sum which was not stored yet is 0
+	"""
+	__slots__ = ()
+	def __missing__(self, position: int) -> int:
+		return 0
 class VEBTree(object):
 	"""Class describes vEB tree
 	Attributes:
 		universum	- maximum value which can be stored in the vEB tree; universum should be the result of raising 2 to a power
+		sqrtUni		- size of the universum of every cluster
+		_lowBits	- number of low bits of the value which address it inside the cluster
+		_lowMask	- mask which extracts low bits of the value
 		_minElement	- stores the least element in the tree; minElement does not appear in any cluster
 		_maxElement	- stores the biggest element in the tree; maxElement is placed in its cluster
 		resume 		- vEB tree which contains information about status of the clusters (whether they are empty or not)
-		infoCluster - vEB tree which contains information about presence of the values in the vEB tree
+		infoCluster - vEB tree which contains information about presence of the values in the vEB tree;
+					  it is list of clusters or SparseClusters dict in the sparse mode;
+					  leaf nodes keep there int bitmap, where bit number i is set if value i is in the tree
+		leafSize	- the biggest universum which is stored as bitmap instead of clusters
+		_count		- quantity of values stored in the vEB tree
+		_rankCache	- Fenwick tree of the sizes of the clusters (see _rankCounts); built by rank and select,
+					  kept up to date by insertValue and removeValue, dropped by other changes of the vEB tree
+		_gen		- generation of the node; the tree changes only nodes of its own generation,
+					  nodes of older generations are shared with snapshots and are copied before the change
+		_splits		- split policy shared by all nodes of the tree: dict power of 2 of the universum of the node -> _lowBits
+					  of the node; nodes which are not in the dict (or all nodes if it is None) are split in halves of the bits
+		_spare		- index of the empty cluster which is kept for the next values (see _releaseCluster), None if there is no
+					  such cluster, -1 if the node keeps all its clusters (filled tree)
+		_autoGrow	- flag of the root which makes insertions of too big values grow the universum (see growUniversum);
+					  False in other nodes
 	"""
+	# Nodes are created in huge amounts, so they do not carry __dict__
+	__slots__ = ("universum", "sqrtUni", "_lowBits", "_lowMask", "_minElement", "_maxElement", "resume", "infoCluster", "leafSize", "_count", "_rankCache", "_gen", "_splits", "_spare", "_autoGrow")
+	# Default size of the bitmap leaf, values of the leaf fit into one machine word
+	LEAF_SIZE = 64
+	# The biggest power of 2 of the list of clusters of the root which is made by growUniversum; the root with bigger list
+	# keeps its clusters in SparseClusters (2^16 slots is the list of the root with universum 2^32)
+	GROW_LIST_BITS = 16
+	# Comments '# trace: ...' in the loops of the point operations mark moves between the levels;
+	# VEBProfiler builds instrumented copies of these methods from their source by turning the comments into calls
 	def displayContent(self, clusterNum: int = -1) -> None:
 		"""Prints information about VEBTree object 
 		Prints max and min elements, the size of the universum and same information about daughter trees
@@ -17,9 +60,11 @@ class VEBTree(object):
 		if clusterNum == -1:
 			print("u: {}".format(self.universum))
 			print("min: {}\tmax: {}".format(self.getMin(), self.getMax()))
-			if self.infoCluster != None:
+			if self.universum <= self.leafSize:
+				print("bitmap: {:b}".format(self.infoCluster))
+			elif self.infoCluster != None:
 				line = ""
-				for index, cluster in enumerate(self.infoCluster):
+				for index, cluster in self._clusters():
 					if cluster != None:
 						line += "Cluster no.{}| u = {}| min: {}\tmax: {}\n".format(index, cluster.universum, cluster.getMin(), cluster.getMax())
 				print(line)
@@ -38,18 +83,19 @@ class VEBTree(object):
 		return True
 	def _fixUniversum(self) -> None:
 		"""Fixes the universum value if it was not the result of raising 2 to a power
+		   Also precomputes shift and mask which are used to split values into cluster index and offset
 		"""
 		if self.universum < 2:
 			self.universum = 2
-		module = self._log2(self.universum) % 2
-		power = 0
-		if module != 0:
-			power = math.ceil(self._log2(self.universum))
-			self.universum = 2**power
-	def _log2(cls, value: int) -> float:
-		"""Calculates log with base of 2
-		"""
-		return math.log(value, 2)
+		power = (self.universum - 1).bit_length()
+		self.universum = 1 << power
+		# Low half of the bits addresses value inside the cluster, high half addresses the cluster,
+		# unless the split policy of the tree gives other quantity of low bits for this universum
+		self._lowBits = power >> 1
+		if self._splits != None:
+			self._lowBits = self._splits.get(power, self._lowBits)
+		self._lowMask = (1 << self._lowBits) - 1
+		self.sqrtUni = 1 << self._lowBits
 	def sqrtUniversum(self, roundingUp: bool = False) -> int:
 		"""Calculates so-called "square of the universum"
 		"square of the universum" is a codename for the formula 2^(lg2(u)/2)
@@ -57,14 +103,158 @@ class VEBTree(object):
 					roundingUp - flag indicates whether rounding should be up or down
 		Return: 
 					int - square of the universum
-		This if help(?) function
 		"""
-		roundedValue = self._log2(self.universum)/2
+		power = self.universum.bit_length() - 1
 		if roundingUp == True:
-			roundedValue = int(math.ceil(roundedValue))
+			return 1 << (power - (power >> 1))
+		return 1 << (power >> 1)
+	@staticmethod
+	def _splitTable(split, universum: int) -> dict:
+		"""Turns the split policy into dict power of 2 of the universum of the node -> quantity of low bits of the node
+		Arguments:
+					split	  - None: every node is split in halves of the bits (about sqrt(u) clusters of sqrt(u) values);
+								sequence of ints: bits of the value which are addressed on every level from the root,
+								e.g. (16, 16, 32) for 64-bit values; bits which are left after the sequence form the last level;
+								every level whose universum is bigger than leafSize is split further in halves;
+								dict: power of 2 of the universum of the node -> quantity of its low bits, for any node of the tree
+					universum - the size of the universum of the tree
+		Return:
+					dict - split policy of the nodes
+					None - if every node is split in halves
+		Raises:
+					ValueError - if the sequence takes more bits than the universum has or the quantity of bits is not positive
+		"""
+		if split == None:
+			return None
+		if isinstance(split, dict):
+			table = dict(split)
 		else:
-			roundedValue = int(math.floor(roundedValue))
-		return 2**roundedValue
+			power = (max(universum, 2) - 1).bit_length()
+			table = {}
+			for bits in split:
+				if type(bits) != int or bits < 1 or bits > power:
+					raise ValueError("Split {} does not fit into {} bits of the universum".format(list(split), power))
+				if bits == power:
+					break
+				table[power] = power - bits
+				power -= bits
+		for power, lowBits in table.items():
+			if type(power) != int or type(lowBits) != int or not 0 < lowBits < power:
+				raise ValueError("Node with universum 2^{} can not have {} low bits".format(power, lowBits))
+		if not table:
+			return None
+		return table
+	def getSplit(self) -> dict:
+		"""Returns split policy of the VEBTree object
+		Return:
+					dict - power of 2 of the universum of the node -> quantity of low bits of the node
+					None - if every node is split in halves of the bits
+		"""
+		if self._splits == None:
+			return None
+		return dict(self._splits)
+	# autoSplit builds the trees of the candidate schedules from this quantity of sample values at most
+	AUTO_SPLIT_SAMPLE = 1 << 14
+	@classmethod
+	def autoSplit(cls, values, universum: int, leafSize: int = None, sparse: bool = False) -> tuple:
+		"""Chooses bits of every level of the tree for the sample of the values
+		   Quantity of the nodes on every level is about the quantity of distinct high parts of the values, so memory of every
+		   schedule of the levels is estimated from the sample, and the cheapest schedule for every quantity of levels
+		   (not more than the tree with halves of the bits has) becomes a candidate together with halves of the bits
+		   The estimate does not know which values stay as minElement without clusters, so trees of the candidates
+		   are built from the part of the sample (runs of neighbour values taken evenly from it, AUTO_SPLIT_SAMPLE values at most)
+		   and the candidate with the least memory is chosen among the ones which are not deeper than the tree with halves
+		   Clustered values get wide levels above the clusters and full leaves under them, evenly spread values get halves
+		Arguments:
+					values	  - sample of the values; the more of the real values it has, the better the estimate
+					universum - the size of the universum of the tree
+					leafSize  - the biggest universum which is stored as bitmap
+					sparse	  - flag of the sparse mode, it changes the cost of the lists of clusters
+		Return:
+					tuple - bits of every level from the root for the split argument of VEBTree and fromSorted
+					None  - if halves of the bits are the best, the root is a leaf or there are no valid values
+		"""
+		# Empty sparse tree gives the rounded universum and leaf size and the size of the node without allocating clusters
+		probe = cls(universum, False, leafSize, True)
+		power = probe.universum.bit_length() - 1
+		leafBits = probe.leafSize.bit_length() - 1
+		values = sorted(set(value for value in values if probe._isValueValid(value)))
+		if power <= leafBits or not values:
+			return None
+		# distinct[bits] is the quantity of distinct values of value >> bits, which is the quantity of nodes of 2^bits values;
+		# neighbour values differ in the high part above 'bits' if their xor is longer than 'bits'
+		changes = [0] * (power + 2)
+		for previous, value in zip(values, itertools.islice(values, 1, None)):
+			changes[(previous ^ value).bit_length()] += 1
+		distinct = [0] * (power + 1)
+		above = 0
+		for bits in range(power, -1, -1):
+			above += changes[bits + 1]
+			distinct[bits] = 1 + above
+		nodeSize = sys.getsizeof(probe)
+		leafCost = nodeSize + sys.getsizeof(1 << (probe.leafSize - 1))
+		listBase = sys.getsizeof([])
+		# Size of the dict per cluster, including the int key
+		dictEntry = sys.getsizeof(dict.fromkeys(range(1 << 10, 1 << 11))) / (1 << 10) + sys.getsizeof(1 << 10)
+		def containerCost(nodes: float, children: float, highBits: int) -> float:
+			if sparse == True:
+				return nodes * sys.getsizeof(SparseClusters()) + children * dictEntry
+			return nodes * (listBase + 8 * (1 << highBits))
+		summaries = {}
+		def summaryCost(bits: int, count: float) -> float:
+			# Summary of 2^bits values with 'count' values spread evenly, split in halves
+			if bits <= leafBits or count <= 1:
+				return leafCost
+			key = (bits, round(count))
+			if key not in summaries:
+				lowBits = bits >> 1
+				clusters = min(count, 1 << (bits - lowBits))
+				summaries[key] = (nodeSize + containerCost(1, clusters, bits - lowBits) + clusters * summaryCost(lowBits, count / clusters)
+					+ summaryCost(bits - lowBits, clusters))
+			return summaries[key]
+		# Depth of the tree with halves of the bits
+		maxDepth = 0
+		bits = power
+		while bits > leafBits:
+			bits >>= 1
+			maxDepth += 1
+		# best[depth][bits] is (cost, lower bits) of the nodes of 2^bits values with at most 'depth' levels above the leaves
+		best = [[(distinct[bits] * leafCost, None) if bits <= leafBits else (float("inf"), None) for bits in range(power + 1)]]
+		for depth in range(1, maxDepth + 1):
+			row = list(best[-1])
+			for bits in range(leafBits + 1, power + 1):
+				nodes = distinct[bits]
+				for lowBits in range(1, bits):
+					children = distinct[lowBits]
+					cost = (nodes * nodeSize + containerCost(nodes, children, bits - lowBits) + nodes * summaryCost(bits - lowBits, children / nodes)
+						+ best[-1][lowBits][0])
+					if cost < row[bits][0]:
+						row[bits] = (cost, lowBits)
+			best.append(row)
+		candidates = [None]
+		for depth in range(1, maxDepth + 1):
+			schedule = []
+			bits = power
+			for level in range(depth, 0, -1):
+				lowBits = best[level][bits][1]
+				if lowBits == None:
+					break
+				schedule.append(bits - lowBits)
+				bits = lowBits
+			schedule.append(bits)
+			if tuple(schedule) not in candidates:
+				candidates.append(tuple(schedule))
+		if len(values) > cls.AUTO_SPLIT_SAMPLE:
+			# Runs of neighbour values keep the density of the clusters, taking them evenly keeps the spread of the values
+			runLength = 256
+			step = len(values) * runLength // cls.AUTO_SPLIT_SAMPLE
+			values = [value for start in range(0, len(values), step) for value in values[start: start + runLength]]
+		chosen = None
+		for schedule in candidates:
+			usage = VEBTree.fromSorted(values, universum, leafSize, sparse, schedule).memoryUsage()
+			if chosen == None or (usage["bytes"] < chosen[0] and len(usage["levels"]) <= chosen[1]):
+				chosen = (usage["bytes"], len(usage["levels"]) if chosen == None else chosen[1], schedule)
+		return chosen[2]
 	def _high(self, value: int ) -> int:
 		"""Calculates index of cluster, which contains asked value
 		Arguments:
@@ -72,7 +262,7 @@ class VEBTree(object):
 		Return: 
 					int - index of the cluster
 		"""
-		return int(math.floor(value/self.sqrtUni)) 
+		return value >> self._lowBits
 	def _low(self, value: int) -> int:
 		"""Calculates index of requested value in the cluster
 		Arguments:
@@ -80,7 +270,7 @@ class VEBTree(object):
 		Return: 
 					int - index of the value in the cluster
 		"""
-		return value % self.sqrtUni
+		return value & self._lowMask
 	def _index(self, clusterNumber: int, valueNumber: int) -> int:
 		"""Calculates number which contains in the index [valueNumber] in the [clusterNumber]th cluster
 		Arguments:
@@ -89,53 +279,461 @@ class VEBTree(object):
 		Return: 
 					int - value which contains in the given index in the cluster with given index
 		"""
-		return clusterNumber * self.sqrtUni + valueNumber
-	def _initResumes(self, fill:bool = False) -> None:
+		return (clusterNumber << self._lowBits) | valueNumber
+	def _initResumes(self, fill:bool = False, sparse: bool = False) -> None:
 		""" Initializes summary cluster of VEBTree object"""
-		# If universum equals 2 than VEBTree object does not require summary cluster
-		if self.universum == 2:
+		# Leaf VEBTree object does not require summary cluster
+		if self.universum <= self.leafSize:
 			self.resume = None
-		elif fill == True:
+		elif fill == True and sparse == False:
 			# In other case VEBTree object needs summary cluster
-			self.resume = VEBTree(self.sqrtUniversum(True), fill)
-	def _initCluster(self, fill:bool = False) -> None:
+			self.resume = VEBTree(self.universum >> self._lowBits, fill, self.leafSize, False, self._splits)
+	def _initCluster(self, fill:bool = False, sparse: bool = False) -> None:
 		"""Initializes cluster section of VEBTree object"""
-		# If universum equals 2 than given VEBTree object is the base vEB tree
-		# Which contains only two members (both are numbers) and are stored in the min and max elements
-		if self.universum == 2:
-			self.infoCluster = None
+		# If universum fits into the leaf than given VEBTree object is the base vEB tree
+		# Which stores all its members as bits of one int
+		if self.universum <= self.leafSize:
+			self.infoCluster = 0
 		else:
 			# If universum is greater than 2
 			# Then VEBTree object is required to create the list of clusters 
-			# The length of the list calculates with help of sqrtUniversum(bool) function
-			if fill == False:
-				self.infoCluster = [None for count in range(self.sqrtUniversum(True))]
+			# The length of the list is the quantity of values of the high bits
+			if sparse == True:
+				# Sparse VEBTree object creates clusters on demand and does not keep slots for empty ones
+				self.infoCluster = SparseClusters()
+			elif fill == False:
+				self.infoCluster = [None] * (self.universum >> self._lowBits)
 			else:
-				self.infoCluster = [VEBTree(self.sqrtUni, fill) for count in range(self.sqrtUniversum(True))]
-	def __init__(self, universum: int = 2, fill: bool = False) -> None:
+				self.infoCluster = [VEBTree(self.sqrtUni, fill, self.leafSize, False, self._splits) for count in range(self.universum >> self._lowBits)]
+	def __init__(self, universum: int = 2, fill: bool = False, leafSize: int = None, sparse: bool = False, split = None, autoGrow: bool = False) -> None:
 		"""Initializing function of the VEBTree class
 		Arguments:
 					universum - the size of the universum for vEB tree
+					fill	  - flag indicates whether all clusters should be created beforehand
+					leafSize  - the biggest universum which is stored as bitmap (rounded up to the power of 2)
+					sparse	  - flag indicates whether clusters are kept in dict and created only on demand;
+								memory of the sparse tree depends on the number of stored values instead of universum,
+								'fill' is ignored in the sparse mode
+					split	  - split policy of the clusters, see _splitTable; every node is split in halves of the bits if it is None
+					autoGrow  - flag indicates whether insertion of the value which does not fit into the universum grows
+								the universum instead of being rejected
 		"""
+		if leafSize == None:
+			leafSize = self.LEAF_SIZE
+		self.leafSize = 1 << (max(leafSize, 2) - 1).bit_length()
 		self.universum = universum
-		self.sqrtUni = self.sqrtUniversum()
+		self._splits = self._splitTable(split, universum)
 		self._fixUniversum()
 		self._minElement = None
 		self._maxElement = None
+		self._count = 0
+		self._rankCache = None
+		self._gen = 0
+		self._spare = -1 if fill == True and sparse == False else None
+		self._autoGrow = autoGrow
 		self.resume = None
-		self._initResumes(fill)
+		self._initResumes(fill, sparse)
 		self.infoCluster = None
-		self._initCluster(fill)
-	def resetTree(self, universum: int = None, fill: bool = False):
+		self._initCluster(fill, sparse)
+	def resetTree(self, universum: int = None, fill: bool = False, sparse: bool = None):
 		"""Function resets existing tree with size of the universum from 'universum'
 		   If universum is None - function just resets vEB tree with same value of the universum
 		   Otherwise new vEB tree is created with the size of the universum from 'universum'
 		Arguments:
 					universum - the size of the universum of the vEB tree
+					sparse	  - flag of the sparse mode; if it is None then the mode of the tree is kept
 		"""
 		if universum == None:
 			universum = self.universum
-		self.__init__(universum, fill)
+		if sparse == None:
+			sparse = self.isSparse()
+		self.__init__(universum, fill, self.leafSize, sparse, self._splits, self._autoGrow)
+	def clear(self) -> None:
+		"""Removes all values but keeps the clusters of the VEBTree object for the next values
+		   Unlike resetTree, only non empty clusters are visited, they are found through the summary cluster
+		   and emptied in place, so clear costs O(quantity of non empty clusters) and creates no nodes
+		   Clusters shared with snapshots are dropped instead of being emptied, the snapshots keep them
+		"""
+		self._clearNode()
+	def _clearNode(self) -> None:
+		"""Empties the node and its non empty clusters in place"""
+		# Clusters of the empty node are empty too
+		if self._minElement == None:
+			return
+		self._minElement = None
+		self._maxElement = None
+		self._count = 0
+		self._rankCache = None
+		if self.universum <= self.leafSize:
+			self.infoCluster = 0
+			return
+		resume = self.resume
+		if resume == None:
+			return
+		gen = self._gen
+		clusters = self.infoCluster
+		for clustIndex in resume:
+			if clusters[clustIndex]._gen == gen:
+				clusters[clustIndex]._clearNode()
+			elif clusters.__class__ is SparseClusters:
+				del clusters[clustIndex]
+			else:
+				clusters[clustIndex] = None
+		if resume._gen == gen:
+			resume._clearNode()
+		else:
+			self.resume = None
+	def growUniversum(self, universum: int) -> int:
+		"""Makes the universum of the VEBTree object bigger without moving its values
+		   The tree becomes cluster number 0 under the new root, which gets as many low bits as the old universum has
+		   (the split policy of the tree keeps this for the power of the new universum); only the least value moves,
+		   it becomes minElement of the new root, so the growth costs one removal instead of inserting all values again
+		   Leaf root grows in place up to leafSize; it does not know the mode of its clusters, so it grows further into the sparse mode
+		   New root of the tree in the list mode keeps the list of clusters only if it has at most 2^GROW_LIST_BITS of them,
+		   otherwise its clusters (all except the old tree) are in the sparse mode, so memory does not follow the new universum
+		Arguments:
+					universum - the size of the new universum; it is rounded up to the power of 2
+		Return:
+					int - the size of the universum after the call; it is not changed if 'universum' is not bigger
+		"""
+		if type(universum) != int or universum <= self.universum:
+			return self.universum
+		power = (universum - 1).bit_length()
+		sparse = self.universum <= self.leafSize or self.isSparse()
+		if self.universum < self.leafSize:
+			# Bits of the values stay in their places in the bigger bitmap, so the leaf grows up to leafSize in place
+			self.universum = min(universum, self.leafSize)
+			self._fixUniversum()
+			if universum <= self.leafSize:
+				return self.universum
+		lowBits = self.universum.bit_length() - 1
+		sparse = sparse or power - lowBits > self.GROW_LIST_BITS
+		child = self._newTree(self.universum, self.__class__)
+		child._takeFields(self)
+		# The policy may keep other split for this power from the earlier growth, no node of the old tree has this power
+		if (self._splits or {}).get(power, power >> 1) != lowBits:
+			self._splits = dict(self._splits or {})
+			self._splits[power] = lowBits
+		self.universum = universum
+		self._fixUniversum()
+		self._minElement = None
+		self._maxElement = None
+		self._count = 0
+		self._rankCache = None
+		self.resume = None
+		# Filled tree keeps creating all its clusters for ever, the new root does not free them either
+		self._spare = -1 if child._spare == -1 else None
+		self.infoCluster = SparseClusters() if sparse else [None] * (self.universum >> self._lowBits)
+		if child._minElement == None:
+			return self.universum
+		minimum = child._minElement
+		self._insertMinimumOf(child)
+		child.removeValue(minimum)
+		if child._minElement != None:
+			self.infoCluster[0] = child
+			self.resume = self._newTree(self.universum >> self._lowBits)
+			self.resume.insertValue(0)
+			self._maxElement = child._maxElement
+			self._count += child._count
+		return self.universum
+	def shrinkUniversum(self, universum: int = None) -> int:
+		"""Makes the universum of the VEBTree object smaller without moving its values, the reverse of growUniversum
+		   While all values are in cluster number 0, the cluster becomes the root and minElement of the old root goes into it;
+		   the universum of the leaf root is just cut
+		Arguments:
+					universum - the least size of the new universum; the universum becomes as small as the values allow if it is None
+		Return:
+					int - the size of the universum after the call
+		"""
+		if universum != None and type(universum) != int:
+			return self.universum
+		if universum == None or universum < 2:
+			universum = 2
+		while self.universum > self.leafSize and self.sqrtUni >= universum:
+			if self._maxElement != None and self._maxElement >> self._lowBits != 0:
+				return self.universum
+			child = self._ownCluster(0)
+			if child == None:
+				child = self._newCluster()
+			if self._minElement != None:
+				child._insertMinimumOf(self)
+			self._splits = child._splits
+			self.universum = child.universum
+			self._fixUniversum()
+			self._takeFields(child)
+		if self.universum <= self.leafSize and self._maxElement != None:
+			universum = max(universum, self._maxElement + 1)
+		if universum < self.universum and self.universum <= self.leafSize:
+			self.universum = universum
+			self._fixUniversum()
+		return self.universum
+	def _newCluster(self) -> 'VEBTree':
+		"""Creates empty cluster of the VEBTree object"""
+		return self._newTree(self.sqrtUni)
+	def _insertMinimumOf(self, node: 'VEBTree') -> None:
+		"""Inserts minElement of the non empty node into the VEBTree object; subclass moves its payload too"""
+		self.insertValue(node._minElement)
+	def _acceptValue(self, value) -> bool:
+		"""Checks the value before insertion; the value which is too big for the VEBTree object with autoGrow grows the universum
+		Return:
+					True  - if value fits into the universum after the call
+					False - if value is invalid
+		"""
+		if self._isValueValid(value):
+			return True
+		if self._autoGrow == False or type(value) != int or value < 0:
+			return False
+		self._growFor(value)
+		return True
+	def _growFor(self, value) -> None:
+		"""Grows the universum of the VEBTree object with autoGrow for the value which does not fit into it
+		   The power of 2 of the universum grows at least by half, so values which come in ascending order
+		   add O(log log u) levels instead of one level for every next bit
+		Arguments:
+					value - int value or None
+		"""
+		if self._autoGrow and value != None and value >= self.universum:
+			power = self.universum.bit_length() - 1
+			self.growUniversum(1 << max(value.bit_length(), power + ((power + 1) >> 1)))
+	def isSparse(self) -> bool:
+		"""Checks whether VEBTree object keeps its clusters in the sparse mode"""
+		return self.infoCluster.__class__ is SparseClusters
+	def _newTree(self, universum: int, treeClass: type = None) -> 'VEBTree':
+		"""Creates empty cluster or summary cluster with the same settings as the VEBTree object has
+		   Clusters are created very often, so the function fills the fields directly instead of calling __init__
+		Arguments:
+					universum - the size of the universum of the new tree (the result of raising 2 to a power)
+					treeClass - class of the new tree, VEBTree if it is None; subclass fills its own fields itself
+		"""
+		if treeClass == None:
+			treeClass = VEBTree
+		tree = treeClass.__new__(treeClass)
+		tree.leafSize = self.leafSize
+		tree.universum = universum
+		tree._splits = self._splits
+		tree._fixUniversum()
+		tree._minElement = None
+		tree._maxElement = None
+		tree._count = 0
+		tree._rankCache = None
+		tree._gen = self._gen
+		tree._spare = None
+		tree._autoGrow = False
+		tree.resume = None
+		if universum <= self.leafSize:
+			tree.infoCluster = 0
+		elif self.infoCluster.__class__ is SparseClusters:
+			tree.infoCluster = SparseClusters()
+		else:
+			tree.infoCluster = [None] * (universum >> tree._lowBits)
+		return tree
+	def _copy(self, gen: int) -> 'VEBTree':
+		"""Copies the node with its list of clusters; clusters and summary cluster themselves stay shared
+		   The copy is of the class of the node, subclass copies its own fields
+		Arguments:
+					gen - generation of the copy
+		"""
+		tree = self.__class__.__new__(self.__class__)
+		tree.leafSize = self.leafSize
+		tree.universum = self.universum
+		tree.sqrtUni = self.sqrtUni
+		tree._lowBits = self._lowBits
+		tree._lowMask = self._lowMask
+		tree._minElement = self._minElement
+		tree._maxElement = self._maxElement
+		tree._count = self._count
+		# Fenwick tree is changed in place, so the copy builds its own one
+		tree._rankCache = None
+		tree._gen = gen
+		tree._splits = self._splits
+		tree._spare = self._spare
+		tree._autoGrow = False
+		tree.resume = self.resume
+		tree.infoCluster = self.infoCluster
+		if self.universum > self.leafSize and self.infoCluster != None:
+			tree.infoCluster = self.infoCluster.__class__(self.infoCluster)
+		return tree
+	def _ownCluster(self, clustIndex: int) -> 'VEBTree':
+		"""Returns the cluster which the VEBTree object may change; cluster shared with a snapshot is replaced with its copy
+		Arguments:
+					clustIndex - index of the cluster
+		Return:
+					VEBTree - cluster of the generation of the VEBTree object
+					None	- if the cluster was not created
+		"""
+		cluster = self.infoCluster[clustIndex]
+		if cluster != None and cluster._gen != self._gen:
+			cluster = cluster._copy(self._gen)
+			self.infoCluster[clustIndex] = cluster
+		return cluster
+	def _releaseCluster(self, clustIndex: int) -> None:
+		"""Frees empty clusters of the node with hysteresis, so memory of the tree follows the quantity of stored values
+		   The cluster which became empty is kept for the next values and the cluster which was kept before is freed
+		   if it is still empty; values which come and go at the edge of the cluster reuse it instead of creating it
+		   again and again, and every node keeps at most one empty cluster
+		Arguments:
+					clustIndex - index of the cluster which became empty
+		"""
+		spare = self._spare
+		if spare == -1 or spare == clustIndex:
+			return
+		self._spare = clustIndex
+		if spare != None:
+			# The kept cluster may have got values again since then, such cluster stays
+			cluster = self.infoCluster[spare]
+			if cluster != None and cluster._minElement == None:
+				if self.infoCluster.__class__ is SparseClusters:
+					del self.infoCluster[spare]
+				else:
+					self.infoCluster[spare] = None
+	def _ownResume(self) -> 'VEBTree':
+		"""Returns the summary cluster which the VEBTree object may change, see _ownCluster"""
+		if self.resume != None and self.resume._gen != self._gen:
+			self.resume = self.resume._copy(self._gen)
+		return self.resume
+	def snapshot(self):
+		"""Returns read-only view of the current values of the VEBTree object
+		   The view shares all nodes with the tree; the tree copies the nodes on the path of every next change
+		   before it changes them, so the view keeps the old values and costs only the nodes changed after it
+		   Taking the view copies only the list of clusters of the root
+		Return:
+					VEBSnapshot - read-only view
+		"""
+		from VEBSnapshot import VEBSnapshot
+		frozen = self._copy(self._gen)
+		# Every node of the tree is of the old generation now, so the tree copies it before the change
+		self._gen += 1
+		return VEBSnapshot(frozen)
+	def _clusters(self):
+		"""Iterates over pairs (index of the cluster, cluster) in the order of indexes
+		   Clusters which were not created are skipped in the sparse mode and are None in other modes
+		"""
+		if self.isSparse():
+			return sorted(self.infoCluster.items())
+		return enumerate(self.infoCluster)
+	@classmethod
+	def fromSorted(cls, values, universum: int, leafSize: int = None, sparse: bool = False, split = None) -> 'VEBTree':
+		"""Builds VEBTree object from the sorted values in one pass
+		   Values are grouped by clusters and every cluster and summary cluster is filled bottom-up,
+		   so values do not descend from the root one by one as in insertValue
+		Arguments:
+					values	  - iterable with int values in ascending order; repeated and invalid values are skipped
+					universum - the size of the universum for vEB tree
+					leafSize  - the biggest universum which is stored as bitmap
+					sparse	  - flag of the sparse mode
+					split	  - split policy, see _splitTable; "auto" chooses it for the given values with autoSplit
+		Return:
+					VEBTree - new tree which contains given values
+		"""
+		values = list(values)
+		if split == "auto":
+			split = cls.autoSplit(values, universum, leafSize, sparse)
+		tree = cls(universum, leafSize = leafSize, sparse = sparse, split = split)
+		if values and not (set(map(type, values)) == {int} and values[0] >= 0 and values[-1] < tree.universum
+				and all(map(operator.lt, values, itertools.islice(values, 1, None)))):
+			# Slow path: skips invalid and repeated values and checks the order one by one
+			sortedValues = []
+			previous = -1
+			for value in values:
+				if tree._isValueValid(value) == False or value == previous:
+					continue
+				if value < previous:
+					raise ValueError("Values should be sorted, {} goes after {}".format(value, previous))
+				sortedValues.append(value)
+				previous = value
+			values = sortedValues
+		if values:
+			tree._loadSorted(values, 0, len(values), 0)
+		return tree
+	def _loadSorted(self, values: list, start: int, stop: int, base: int) -> None:
+		"""Fills the empty VEBTree object with the slice of sorted values
+		   Slice is not copied, values of the VEBTree object are values[start:stop] shifted down by 'base'
+		Arguments:
+					values - list with unique valid values in ascending order
+					start  - index of the first value of the VEBTree object
+					stop   - index after the last value of the VEBTree object
+					base   - the least value of the universum of the VEBTree object in the 'values'
+		"""
+		self._minElement = values[start] - base
+		self._maxElement = values[stop - 1] - base
+		self._count = stop - start
+		self._rankCache = None
+		if self.universum <= self.leafSize:
+			# Values are unique, so the sum of their bits is the same as bitwise or
+			self.infoCluster = sum(map((1).__lshift__, map(base.__rsub__, values[start:stop])))
+			return
+		# minElement does not appear in any cluster
+		start += 1
+		shift = self._lowBits
+		clusterIndexes = []
+		while start < stop:
+			clustIndex = (values[start] - base) >> shift
+			clusterBase = base + (clustIndex << shift)
+			# Values of one cluster go one after another, so the end of the cluster is found with binary search
+			end = bisect.bisect_left(values, clusterBase + self.sqrtUni, start, stop)
+			cluster = self._newTree(self.sqrtUni)
+			cluster._loadSorted(values, start, end, clusterBase)
+			self.infoCluster[clustIndex] = cluster
+			clusterIndexes.append(clustIndex)
+			start = end
+		if clusterIndexes:
+			# Indexes of the non empty clusters are sorted too, so the summary cluster is built the same way
+			self.resume = self._newTree(self.universum >> self._lowBits)
+			self.resume._loadSorted(clusterIndexes, 0, len(clusterIndexes), 0)
+	def memoryUsage(self) -> dict:
+		"""Calculates memory footprint of the VEBTree object
+		Walks through all clusters and summary clusters and counts nodes and bytes on every level
+		The root is on the level 0, its clusters and its summary cluster are on the level 1 and so on
+		Return:
+					dict - "nodes" and "bytes" for the whole tree and "levels" with list of such dicts for every level
+		"""
+		levels = []
+		stack = [(self, 0)]
+		while stack:
+			node, level = stack.pop()
+			if level == len(levels):
+				levels.append({"nodes": 0, "bytes": 0})
+			size = sys.getsizeof(node)
+			if node.universum <= node.leafSize:
+				size += sys.getsizeof(node.infoCluster)
+			elif node.infoCluster != None:
+				size += sys.getsizeof(node.infoCluster)
+				for index, cluster in node._clusters():
+					if cluster != None:
+						stack.append((cluster, level + 1))
+			if node.resume != None:
+				stack.append((node.resume, level + 1))
+			levels[level]["nodes"] += 1
+			levels[level]["bytes"] += size
+		return {
+			"nodes": sum(level["nodes"] for level in levels),
+			"bytes": sum(level["bytes"] for level in levels),
+			"levels": levels
+		}
+	def dump(self, path: str, encoding: str = None) -> None:
+		"""Writes values of the VEBTree object into the binary file (format is described in VEBStorage)
+		Arguments:
+					path	 - path of the file
+					encoding - "bitmap", "keys" or None to choose the smaller one
+		"""
+		from VEBStorage import dumpTree
+		dumpTree(self, path, encoding)
+	@classmethod
+	def load(cls, path: str, leafSize: int = None, sparse: bool = False, readOnly: bool = False):
+		"""Reads the file written by dump
+		Arguments:
+					path	 - path of the file
+					leafSize - the biggest universum which is stored as bitmap
+					sparse	 - flag of the sparse mode
+					readOnly - if True the file is memory-mapped and queries are answered from the file without building the tree
+		Return:
+					VEBTree		  - new tree which contains values from the file
+					MappedVEBTree - read-only view of the file if 'readOnly' is True
+		"""
+		from VEBStorage import loadTree, MappedVEBTree
+		if readOnly:
+			return MappedVEBTree(path)
+		return loadTree(path, cls, leafSize, sparse)
 	def getMin(self):
 		return self._minElement
 	def getMax(self):
@@ -150,15 +748,18 @@ class VEBTree(object):
 		"""
 		if self._isValueValid(value) == False:
 			return False
-		elif value == self.getMin() or value == self.getMax():
-			return True
-		elif self.universum == 2:
-			return False
-		else:
-			clustIndex = self._high(value)
-			if self.infoCluster[clustIndex] != None:
-				return self.infoCluster[clustIndex].containsValue(self._low(value))
-		return False
+		node = self
+		# Descends level by level in the loop instead of recursion
+		while node.universum > node.leafSize:
+			if value == node._minElement or value == node._maxElement:
+				return True
+			cluster = node.infoCluster[value >> node._lowBits]
+			if cluster == None:
+				return False
+			value &= node._lowMask
+			node = cluster
+			# trace: trace.descend()
+		return (node.infoCluster >> value) & 1 == 1
 	def _insertValueEmpty(self, value: int) -> None:
 		"""Inserts number into the empty base VEBTree object
 		Arguments:
@@ -167,6 +768,10 @@ class VEBTree(object):
 		if value != None:
 			self._minElement = value
 			self._maxElement = value
+			self._count = 1
+			self._rankCache = None
+			if self.universum <= self.leafSize:
+				self.infoCluster = 1 << value
 	def insertValue(self, value: int) -> bool:
 		"""Inserts number into the VEBTree object
 		Arguments:
@@ -175,45 +780,306 @@ class VEBTree(object):
 					True	- if number has been inserted successfully
 					False	- if number has not been inserted successfully
 		"""
-		if self._isValueValid(value) == False:
+		if self._isValueValid(value) == False and self._acceptValue(value) == False:
 			return False
-		# If minElement of the VEBTree object is empty
-		# Then VEBTree object is empty too
-		if self.getMin() == None:
-			self._insertValueEmpty(value)
-		else:
-			# In this line program knows that VEBTree is not empty
-			# Function checks whether new number is less than current minElement
-			if value < self.getMin():
-				# Function swaps values of variable 'value' and 'minElement'
-				# This happens because new number is less than minElement and it becomes new minimum element
-				# Also works with base VEBTree object (when it stores only one element)
-				tmp = self.getMin()
-				self._minElement = value
-				value = tmp
-			if self.universum > 2:
-				clustIndex = self._high(value)
-				valueIndex = self._low(value)
-				if self.infoCluster[clustIndex] == None:
-					self.infoCluster[self._high(value)] = VEBTree(self.sqrtUniversum(self.universum))
-					# In this line program knows that it deals with non base VEBTree object
-					# So it awares that it should also update the summary clusters
-				if self.infoCluster[clustIndex].getMin() == None:
-					if self.resume == None:
-						self.resume = VEBTree(self.sqrtUniversum(True))
-					# The cluster is empty
-					# Function updates summary cluster according to the index of the updated cluster
-					self.resume.insertValue(clustIndex)
-					self.infoCluster[clustIndex]._insertValueEmpty(valueIndex)
-				else:
-					# The cluster is not empty
-					# Dives into the recursion
-					self.infoCluster[clustIndex].insertValue(valueIndex)
+		gen = self._gen
+		node = self
+		# Nodes which get one more value if the value turns out to be new
+		path = []
+		# Descends level by level in the loop instead of recursion
+		while node.universum > node.leafSize:
+			minimum = node._minElement
+			# If minElement of the VEBTree object is empty
+			# Then VEBTree object is empty too
+			if minimum == None:
+				node._insertValueEmpty(value)
+				break
+			# Value is already stored in the VEBTree object, inserting it again would duplicate it in the clusters
+			if value == minimum or value == node._maxElement:
+				return True
+			if value < minimum:
+				# New number becomes new minimum element and the old minimum goes into the clusters
+				node._minElement = value
+				value = minimum
 			# checks whether inserted value is the maximum value and updates in cluster which contains this value
-			if value  > self.getMax():
-				# Also can be the case where VEBTree object with universum = 2 (object stores only one element)
-				self._maxElement = value
+			if value > node._maxElement:
+				node._maxElement = value
+			clustIndex = value >> node._lowBits
+			path.append((node, clustIndex))
+			value &= node._lowMask
+			cluster = node.infoCluster[clustIndex]
+			if cluster == None:
+				cluster = node._newTree(node.sqrtUni)
+				node.infoCluster[clustIndex] = cluster
+			elif cluster._gen != gen:
+				# The cluster is shared with a snapshot, so the tree changes its own copy
+				cluster = cluster._copy(gen)
+				node.infoCluster[clustIndex] = cluster
+			if cluster._minElement == None:
+				# The cluster is empty, so the value is placed there at once
+				# And the rest of the work is to mark the cluster as non empty in the summary cluster
+				cluster._insertValueEmpty(value)
+				if node.resume == None:
+					node.resume = node._newTree(node.universum >> node._lowBits)
+				elif node.resume._gen != gen:
+					node.resume = node.resume._copy(gen)
+				node = node.resume
+				value = clustIndex
+				# trace: trace.descend(True)
+			else:
+				node = cluster
+				# trace: trace.descend()
+		else:
+			# Leaf stores all its values in the bitmap, min and max are kept only for fast access
+			bit = 1 << value
+			if node.infoCluster & bit != 0:
+				return True
+			node.infoCluster |= bit
+			node._count += 1
+			if node._minElement == None or value < node._minElement:
+				node._minElement = value
+			if node._maxElement == None or value > node._maxElement:
+				node._maxElement = value
+		for node, clustIndex in path:
+			node._count += 1
+			if node._rankCache != None:
+				node._rankAdd(clustIndex, 1)
 		return True
+	def __len__(self) -> int:
+		"""Returns quantity of values stored in the VEBTree object"""
+		return self._count
+	def rank(self, value: int) -> int:
+		"""Counts values of the VEBTree object which are less than given number
+		   Descends through the clusters like containsValue; on every level sizes of the preceding clusters
+		   are summed by Fenwick tree of the node, so the query takes O(log universum) steps in all
+		Arguments:
+					value - int value
+		Return:
+					int  - quantity of values which are less than 'value'
+					None - if value is not int
+		"""
+		if type(value) != int:
+			return None
+		if value >= self.universum:
+			return self._count
+		result = 0
+		node = self
+		while node._minElement != None and value > node._minElement:
+			if node.universum <= node.leafSize:
+				return result + (node.infoCluster & ((1 << value) - 1)).bit_count()
+			# minElement does not appear in any cluster
+			result += 1
+			counts = node._rankCounts()
+			clustIndex = value >> node._lowBits
+			# Sum of the sizes of the clusters before clustIndex
+			position = clustIndex
+			while position > 0:
+				result += counts[position]
+				position &= position - 1
+			cluster = node.infoCluster[clustIndex]
+			if cluster == None:
+				break
+			value &= node._lowMask
+			node = cluster
+		return result
+	def select(self, index: int) -> int:
+		"""Finds the value of the VEBTree object with given position in ascending order
+		Arguments:
+					index - position of the value, the least value has position 0
+		Return:
+					int	 - value with position 'index'
+					None - if the VEBTree object contains less than index + 1 values
+		"""
+		if type(index) != int or index < 0 or index >= self._count:
+			return None
+		base = 0
+		node = self
+		while node.universum > node.leafSize:
+			if index == 0:
+				return base + node._minElement
+			# minElement does not appear in any cluster
+			index -= 1
+			counts = node._rankCounts()
+			# Descends the Fenwick tree to the last position whose prefix of the sizes does not exceed the index,
+			# the cluster after it holds the value
+			slots = node.universum >> node._lowBits
+			clustIndex = 0
+			step = slots
+			while step:
+				position = clustIndex + step
+				if position <= slots and counts[position] <= index:
+					clustIndex = position
+					index -= counts[position]
+				step >>= 1
+			base += clustIndex << node._lowBits
+			node = node.infoCluster[clustIndex]
+		# Binary search of the least bit position which has 'index' set bits below it
+		bits = node.infoCluster
+		low = 0
+		high = node.universum - 1
+		while low < high:
+			middle = (low + high) >> 1
+			if (bits & ((2 << middle) - 1)).bit_count() > index:
+				high = middle
+			else:
+				low = middle + 1
+		return base + low
+	def _rankCounts(self):
+		"""Returns Fenwick tree of the sizes of the clusters, position i + 1 stands for the cluster with index i
+		   The tree is a list as long as the list of the clusters, SparseCounts in the sparse mode;
+		   it is built on the first query after the node was changed by anything but insertValue and removeValue
+		"""
+		counts = self._rankCache
+		if counts == None:
+			slots = self.universum >> self._lowBits
+			clusterIndexes = []
+			if self.resume != None:
+				clusterIndexes = self.resume
+			if self.infoCluster.__class__ is SparseClusters:
+				counts = SparseCounts()
+				for clustIndex in clusterIndexes:
+					count = self.infoCluster[clustIndex]._count
+					position = clustIndex + 1
+					while position <= slots:
+						counts[position] += count
+						position += position & -position
+			else:
+				# Every position adds its sum to the next covering position, which builds the tree in O(slots)
+				counts = [0] * (slots + 1)
+				for clustIndex in clusterIndexes:
+					counts[clustIndex + 1] = self.infoCluster[clustIndex]._count
+				for position in range(1, slots + 1):
+					parent = position + (position & -position)
+					if parent <= slots:
+						counts[parent] += counts[position]
+			self._rankCache = counts
+		return counts
+	def _rankAdd(self, clustIndex: int, delta: int) -> None:
+		"""Changes size of the cluster in the built Fenwick tree of the node
+		Arguments:
+					clustIndex	- index of the cluster
+					delta		- change of the size of the cluster
+		"""
+		counts = self._rankCache
+		slots = self.universum >> self._lowBits
+		position = clustIndex + 1
+		while position <= slots:
+			counts[position] += delta
+			position += position & -position
+	def __iter__(self):
+		"""Iterates over values of the VEBTree object in ascending order
+		   Walks over non empty clusters with help of summary cluster, so every value is reached without search from the root
+		   The VEBTree object should not be changed during iteration
+		"""
+		return self._iterValues(0)
+	def __reversed__(self):
+		"""Iterates over values of the VEBTree object in descending order"""
+		return self._iterReversed(0)
+	def range(self, low: int = 0, high: int = None):
+		"""Iterates lazily over values of the VEBTree object which are in [low, high) in ascending order
+		Arguments:
+					low  - the least value of the range
+					high - value after the greatest value of the range; universum if it is None
+		"""
+		if high == None or high > self.universum:
+			high = self.universum
+		if low < 0:
+			low = 0
+		if low >= high:
+			return iter(())
+		return self._iterRange(low, high, 0)
+	def _iterValues(self, base: int):
+		"""Yields values of the VEBTree object in ascending order
+		Arguments:
+					base - the least value of the universum of the VEBTree object in the root tree
+		"""
+		if self._minElement == None:
+			return
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster
+			while bits != 0:
+				lowestBit = bits & -bits
+				yield base + lowestBit.bit_length() - 1
+				bits ^= lowestBit
+			return
+		yield base + self._minElement
+		if self.resume != None:
+			shift = self._lowBits
+			for clustIndex in self.resume._iterValues(0):
+				yield from self.infoCluster[clustIndex]._iterValues(base + (clustIndex << shift))
+	def _iterBitmaps(self, base: int):
+		"""Yields values of the VEBTree object as bitmaps: whole bitmap of every leaf and single bit for minElement of other nodes
+		Arguments:
+					base - the least value of the universum of the VEBTree object in the root tree
+		Return:
+					tuples (base, bits) - value base + i is in the tree if bit number i of bits is set
+		"""
+		if self._minElement == None:
+			return
+		if self.universum <= self.leafSize:
+			yield base, self.infoCluster
+			return
+		yield base + self._minElement, 1
+		if self.resume != None:
+			shift = self._lowBits
+			for clustIndex in self.resume._iterValues(0):
+				yield from self.infoCluster[clustIndex]._iterBitmaps(base + (clustIndex << shift))
+	def _iterReversed(self, base: int):
+		"""Yields values of the VEBTree object in descending order
+		Arguments:
+					base - the least value of the universum of the VEBTree object in the root tree
+		"""
+		if self._minElement == None:
+			return
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster
+			while bits != 0:
+				highestBit = bits.bit_length() - 1
+				yield base + highestBit
+				bits ^= 1 << highestBit
+			return
+		if self.resume != None:
+			shift = self._lowBits
+			for clustIndex in self.resume._iterReversed(0):
+				yield from self.infoCluster[clustIndex]._iterReversed(base + (clustIndex << shift))
+		yield base + self._minElement
+	def _iterRange(self, low: int, high: int, base: int):
+		"""Yields values of the VEBTree object which are in [low, high) in ascending order
+		Arguments:
+					low  - the least value of the range, 0 <= low < high
+					high - value after the greatest value of the range, high <= universum
+					base - the least value of the universum of the VEBTree object in the root tree
+		"""
+		if self._minElement == None or self._minElement >= high or self._maxElement < low:
+			return
+		if self.universum <= self.leafSize:
+			# Drops the bits outside of the range
+			bits = (self.infoCluster >> low << low) & ((1 << high) - 1)
+			while bits != 0:
+				lowestBit = bits & -bits
+				yield base + lowestBit.bit_length() - 1
+				bits ^= lowestBit
+			return
+		if self._minElement >= low:
+			yield base + self._minElement
+		if self.resume == None:
+			return
+		shift = self._lowBits
+		firstCluster = low >> shift
+		lastCluster = (high - 1) >> shift
+		# Summary cluster gives only non empty clusters which intersect the range
+		for clustIndex in self.resume._iterRange(firstCluster, lastCluster + 1, 0):
+			clusterBase = clustIndex << shift
+			clusterLow = 0
+			clusterHigh = self.sqrtUni
+			if clustIndex == firstCluster:
+				clusterLow = low - clusterBase
+			if clustIndex == lastCluster:
+				clusterHigh = high - clusterBase
+			if clusterLow == 0 and clusterHigh == self.sqrtUni:
+				yield from self.infoCluster[clustIndex]._iterValues(base + clusterBase)
+			else:
+				yield from self.infoCluster[clustIndex]._iterRange(clusterLow, clusterHigh, base + clusterBase)
 	def getSuccessor(self, value: int) -> int:
 		"""Returns the successor of the given number in 'value'
 		Arguments:
@@ -224,38 +1090,55 @@ class VEBTree(object):
 		"""
 		if self._isValueValid(value) == False:
 			return None
-		if self.universum == 2:
-			# If the given value is the least element in the base vEB tree
-			# and next value is in the tree
-			if value == 0 and self.getMax() == 1:
-				# Then next value is the successor
-				return 1
+		node = self
+		# The least value of the universum of the current node in the tree where the search goes on
+		base = 0
+		# Nodes where the search went into the summary cluster to find the next non empty cluster
+		summaries = []
+		# Descends level by level in the loop instead of recursion
+		while True:
+			if node.universum <= node.leafSize:
+				# Drops the bits up to the given value, the lowest remaining bit is the successor
+				bits = node.infoCluster >> (value + 1)
+				successor = None
+				if bits != 0:
+					successor = base + value + (bits & -bits).bit_length()
+				break
+			minimum = node._minElement
+			if minimum == None:
+				successor = None
+				break
+			# Checks whether value is less than minElement of current vEB object
+			if value < minimum:
+				successor = base + minimum
+				break
+			clustIndex = value >> node._lowBits
+			valueIndex = value & node._lowMask
+			cluster = node.infoCluster[clustIndex]
+			# Checks whether successor is located in the same cluster as the given number
+			if cluster != None and cluster._maxElement != None and valueIndex < cluster._maxElement:
+				base += clustIndex << node._lowBits
+				value = valueIndex
+				node = cluster
+				# trace: trace.descend()
+			elif node.resume != None:
+				# Successor is not in the same cluster as given value
+				# Searches for the next not empty cluster using summary cluster
+				summaries.append((node, base))
+				node = node.resume
+				base = 0
+				value = clustIndex
+				# trace: trace.descend(True)
 			else:
-				return None
-		# Checks whether value is less than minElement of current vEB object
-		elif self.getMin() != None and value < self.getMin():
-			return self.getMin()
-		else:
-			clustIndex = self._high(value)
-			valueIndex = self._low(value)
-			# Gets index of the max element of cluster which contains given value
-			if self.infoCluster[clustIndex] != None:
-				maxIndex = self.infoCluster[clustIndex].getMax()
-				# Checks whether successor is located in the same cluster as the given number
-				if maxIndex != None and maxIndex > valueIndex:
-					# Gets the index of the successor
-					offset = self.infoCluster[clustIndex].getSuccessor(valueIndex)	
-					return self._index(clustIndex, offset)
-			# Successor is not in the same cluster as given value
-			# Searches for the next not empty cluster using summary cluster
-			if self.resume != None:
-				succClust = self.resume.getSuccessor(clustIndex)
-				if succClust != None:
-					# Gets the least element of the next not empty cluster
-					offset = self.infoCluster[succClust].getMin()
-					return self._index(succClust, offset)
-				else:
-					return None
+				successor = None
+				break
+		if successor != None:
+			# Found indexes of the next non empty clusters are turned into the least elements of these clusters
+			while summaries:
+				node, base = summaries.pop()
+				# trace: trace.ascend()
+				successor = base + (successor << node._lowBits) + node.infoCluster[successor]._minElement
+		return successor
 	def getPredecessor(self, value: int) -> int:
 		"""Returns the predecessor of the given number in 'value'
 		Arguments:
@@ -266,39 +1149,60 @@ class VEBTree(object):
 		"""
 		if self._isValueValid(value) == False:
 			return None
-		if self.universum == 2:
-			# If the given value is the greatest element in the base vEB tree
-			# and previous value is in the tree
-			if value == 1 and self.getMin() == 0:
-				# Then previous element is the predecessor
-				return 0
+		node = self
+		# The least value of the universum of the current node in the tree where the search goes on
+		base = 0
+		# Nodes where the search went into the summary cluster to find the previous non empty cluster
+		summaries = []
+		# Descends level by level in the loop instead of recursion
+		while True:
+			if node.universum <= node.leafSize:
+				# Drops the bits starting from the given value, the highest remaining bit is the predecessor
+				bits = node.infoCluster & ((1 << value) - 1)
+				predecessor = None
+				if bits != 0:
+					predecessor = base + bits.bit_length() - 1
+				break
+			maximum = node._maxElement
+			if maximum == None:
+				predecessor = None
+				break
+			# Checks whether value is greater than maxElement of current vEB object
+			if value > maximum:
+				predecessor = base + maximum
+				break
+			clustIndex = value >> node._lowBits
+			valueIndex = value & node._lowMask
+			cluster = node.infoCluster[clustIndex]
+			# Checks whether predecessor is located in the same cluster as the given number
+			if cluster != None and cluster._minElement != None and valueIndex > cluster._minElement:
+				base += clustIndex << node._lowBits
+				value = valueIndex
+				node = cluster
+				# trace: trace.descend()
+			elif node.resume != None:
+				# Predecessor is not in the same cluster as given value
+				# Searches for the previous not empty cluster using summary cluster
+				summaries.append((node, base, value))
+				node = node.resume
+				base = 0
+				value = clustIndex
+				# trace: trace.descend(True)
 			else:
-				return None
-		# Checks whether value is greater than maxElement of current vEB object
-		elif self.getMax() != None and value > self.getMax():
-			return self.getMax()
-		else:
-			clustIndex = self._high(value)
-			valueIndex = self._low(value)
-			if self.infoCluster[clustIndex] != None:
-				# Gets index of the min element of cluster which contains given value
-				minIndex = self.infoCluster[clustIndex].getMin()
-				# Checks whether predecessor is located in the same cluster as the given number
-				if minIndex != None and minIndex < valueIndex:
-					offset = self.infoCluster[clustIndex].getPredecessor(valueIndex)
-					return self._index(clustIndex, offset)
-				else:
-					# Predecessor is not in the same cluster as given value
-					# Searches for the previous not empty cluster using summary cluster
-					predClus = self.resume.getPredecessor(clustIndex)
-					if predClus != None:
-						# Gets the greatest element of the next not empty cluster
-						offset = self.infoCluster[predClus].getMax()
-						return self._index(predClus, offset)
-					elif self.getMin() != None and value > self.getMin():
-						return self.getMin()
-					else:
-						return None
+				predecessor = None
+				if value > node._minElement:
+					predecessor = base + node._minElement
+				break
+		while summaries:
+			node, base, value = summaries.pop()
+			# trace: trace.ascend()
+			if predecessor != None:
+				# Found index of the previous non empty cluster is turned into the greatest element of this cluster
+				predecessor = base + (predecessor << node._lowBits) + node.infoCluster[predecessor]._maxElement
+			elif value > node._minElement:
+				# There is no previous non empty cluster, so only minElement can be less than the value
+				predecessor = base + node._minElement
+		return predecessor
 	def removeValue(self, value: int) -> bool:
 		"""Removes the given number from the VEBTree object if it contains removing value
 		Arguments:
@@ -307,56 +1211,642 @@ class VEBTree(object):
 				True	- if function has successfully removed value from the VEBTree object
 				False	- if function has not removed value from the VEBTree object
 		"""
-		# Flag of the successfullness of the removing
-		success = False
 		if self._isValueValid(value) == False:
-			success = False
-		# If the tree is empty then nothing to remove
-		elif self.getMin() == None:
-			success = False
-		# If the tree contains only one element
-		elif self.getMin() == self.getMax() and self.getMin() == value:
-			self._minElement = None
-			self._maxElement = None
-			success = True
-		elif self.universum == 2:
-			if self.getMin() != self.getMax():
-				if value == 0:
-					self._minElement = 1
+			return False
+		gen = self._gen
+		node = self
+		# Nodes which lost the value, they fix their maxElement after the value is removed from the cluster
+		path = []
+		# Descends level by level in the loop instead of recursion
+		# Nothing is changed until it is known that the value is in the tree
+		while node.universum > node.leafSize:
+			minimum = node._minElement
+			# If the tree is empty then nothing to remove
+			if minimum == None:
+				return False
+			# If the tree contains only one element
+			if minimum == node._maxElement:
+				if value != minimum:
+					return False
+				node._minElement = None
+				node._maxElement = None
+				node._count = 0
+				node._rankCache = None
+				break
+			shift = node._lowBits
+			# If removing value is the least element in the vEB tree
+			if value == minimum:
+				# Then function updates removing value to the successor of the least element of the tree
+				# And updates minElement with it, following actions remove presence of this value in the clusters
+				firstCluster = node.resume._minElement
+				value = (firstCluster << shift) | node.infoCluster[firstCluster]._minElement
+				node._minElement = value
+			clustIndex = value >> shift
+			valueIndex = value & node._lowMask
+			cluster = node.infoCluster[clustIndex]
+			if cluster == None or cluster._minElement == None:
+				return False
+			if cluster._gen != gen:
+				# The cluster is shared with a snapshot, so the tree changes its own copy
+				cluster = cluster._copy(gen)
+				node.infoCluster[clustIndex] = cluster
+			if cluster._minElement == cluster._maxElement:
+				if cluster._minElement != valueIndex:
+					return False
+				# Removing the value results in emptiness of the cluster
+				# So the rest of the work is to remove the cluster from the summary cluster
+				cluster._minElement = None
+				cluster._maxElement = None
+				cluster._count = 0
+				cluster._rankCache = None
+				if cluster.universum <= cluster.leafSize:
+					cluster.infoCluster = 0
+				path.append((node, value, clustIndex, True))
+				if node.resume._gen != gen:
+					node.resume = node.resume._copy(gen)
+				node = node.resume
+				value = clustIndex
+				# trace: trace.descend(True)
+			else:
+				path.append((node, value, clustIndex, False))
+				node = cluster
+				value = valueIndex
+				# trace: trace.descend()
+		else:
+			bits = node.infoCluster
+			if (bits >> value) & 1 == 0:
+				return False
+			bits ^= 1 << value
+			node.infoCluster = bits
+			node._count -= 1
+			if bits == 0:
+				node._minElement = None
+				node._maxElement = None
+			else:
+				# The lowest and the highest set bits are new min and max
+				node._minElement = (bits & -bits).bit_length() - 1
+				node._maxElement = bits.bit_length() - 1
+		while path:
+			node, value, clustIndex, emptyCluster = path.pop()
+			# trace: trace.moveTo(len(path))
+			node._count -= 1
+			if node._rankCache != None:
+				node._rankAdd(clustIndex, -1)
+			if emptyCluster == True:
+				node._releaseCluster(clustIndex)
+			# If removed value was the greatest element in the vEB tree
+			# Then function sets maxElement as predecessor of the removed maxElement
+			if value == node._maxElement:
+				if emptyCluster == True:
+					clustIndex = node.resume._maxElement
+				if clustIndex == None:
+					# If vEB tree contains only one element
+					node._maxElement = node._minElement
 				else:
-					self._minElement = 0
-				self._maxElement = self.getMin()
-				success = True
+					node._maxElement = (clustIndex << node._lowBits) | node.infoCluster[clustIndex]._maxElement
+		return True
+	def _sortedValidValues(self, values) -> list:
+		"""Drops invalid and repeated values and sorts the rest
+		   Valid values are checked at once instead of calling _isValueValid for every value
+		Arguments:
+					values - iterable with values
+		Return:
+					list - unique valid values in ascending order
+		"""
+		values = list(values)
+		if set(map(type, values)) != {int}:
+			values = [value for value in values if type(value) == int]
+		values = sorted(set(values))
+		return values[bisect.bisect_left(values, 0):bisect.bisect_left(values, self.universum)]
+	def containsArray(self, queries):
+		"""Checks presence of every value of numpy array in the VEBTree object (needs numpy, see VEBNumpy)
+		   Values of the tree are gathered into sorted array on every call, so it pays off for big arrays of queries;
+		   universum should not be bigger than 2^63, answers of successorArray and predecessorArray are int64
+		Arguments:
+					queries - numpy array with int values
+		Return:
+					numpy.ndarray - bool for every query, False for invalid values
+		"""
+		from VEBNumpy import containsArray
+		return containsArray(self, queries)
+	def successorArray(self, queries):
+		"""Finds successor of every value of numpy array in the VEBTree object (needs numpy, see VEBNumpy)
+		Arguments:
+					queries - numpy array with int values
+		Return:
+					numpy.ndarray - int64 successor for every query, -1 if there is no successor or value is invalid
+		"""
+		from VEBNumpy import successorArray
+		return successorArray(self, queries)
+	def predecessorArray(self, queries):
+		"""Finds predecessor of every value of numpy array in the VEBTree object (needs numpy, see VEBNumpy)
+		Arguments:
+					queries - numpy array with int values
+		Return:
+					numpy.ndarray - int64 predecessor for every query, -1 if there is no predecessor or value is invalid
+		"""
+		from VEBNumpy import predecessorArray
+		return predecessorArray(self, queries)
+	def insertMany(self, values) -> int:
+		"""Inserts many numbers into the VEBTree object at once
+		   Values are sorted once and every touched cluster is visited once per group of its values
+		Arguments:
+					values - iterable with int values; invalid values are skipped
+		Return:
+					int - quantity of values which were not in the VEBTree object before
+		"""
+		if self._autoGrow:
+			values = list(values)
+			self._growFor(max((value for value in values if type(value) == int), default = None))
+		values = self._sortedValidValues(values)
+		if not values:
+			return 0
+		return self._insertSorted(values, 0, len(values), 0)
+	def _insertSorted(self, values: list, start: int, stop: int, base: int) -> int:
+		"""Inserts the slice of sorted values into the VEBTree object
+		Arguments:
+					values - list with unique valid values in ascending order
+					start  - index of the first inserted value
+					stop   - index after the last inserted value
+					base   - the least value of the universum of the VEBTree object in the 'values'
+		Return:
+					int - quantity of values which were not in the VEBTree object before
+		"""
+		if self._minElement == None:
+			self._loadSorted(values, start, stop, base)
+			return stop - start
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster | sum(map((1).__lshift__, map(base.__rsub__, values[start:stop])))
+			inserted = (bits ^ self.infoCluster).bit_count()
+			self.infoCluster = bits
+			self._count += inserted
+			self._minElement = (bits & -bits).bit_length() - 1
+			self._maxElement = bits.bit_length() - 1
+			return inserted
+		inserted = 0
+		first = values[start] - base
+		if first == self._minElement:
+			start += 1
+		elif first < self._minElement:
+			# New minimum takes place of the old one, which goes into the clusters together with other values
+			oldMin = self._minElement + base
+			self._minElement = first
+			values = values[start + 1:stop]
+			position = bisect.bisect_left(values, oldMin)
+			if position == len(values) or values[position] != oldMin:
+				values.insert(position, oldMin)
+			# The new minimum is not counted here, because the old one is counted instead when it goes into the cluster
+			start = 0
+			stop = len(values)
+		if start == stop:
+			return inserted
+		if values[stop - 1] - base > self._maxElement:
+			self._maxElement = values[stop - 1] - base
+		shift = self._lowBits
+		newClusters = []
+		while start < stop:
+			clustIndex = (values[start] - base) >> shift
+			clusterBase = base + (clustIndex << shift)
+			end = bisect.bisect_left(values, clusterBase + self.sqrtUni, start, stop)
+			cluster = self._ownCluster(clustIndex)
+			if cluster == None:
+				cluster = self._newTree(self.sqrtUni)
+				self.infoCluster[clustIndex] = cluster
+			if cluster._minElement == None:
+				newClusters.append(clustIndex)
+			inserted += cluster._insertSorted(values, start, end, clusterBase)
+			start = end
+		if newClusters:
+			if self.resume == None:
+				self.resume = self._newTree(self.universum >> self._lowBits)
+			self._ownResume()._insertSorted(newClusters, 0, len(newClusters), 0)
+		self._count += inserted
+		self._rankCache = None
+		return inserted
+	def removeMany(self, values) -> int:
+		"""Removes many numbers from the VEBTree object at once
+		   Values are sorted once and every touched cluster is visited once per group of its values
+		Arguments:
+					values - iterable with int values; invalid values and values which are not in the tree are skipped
+		Return:
+					int - quantity of removed values
+		"""
+		values = self._sortedValidValues(values)
+		if not values:
+			return 0
+		return self._removeSorted(values, 0, len(values), 0)
+	def _removeSorted(self, values: list, start: int, stop: int, base: int) -> int:
+		"""Removes the slice of sorted values from the VEBTree object
+		Arguments:
+					values - list with unique valid values in ascending order
+					start  - index of the first removed value
+					stop   - index after the last removed value
+					base   - the least value of the universum of the VEBTree object in the 'values'
+		Return:
+					int - quantity of removed values
+		"""
+		if self._minElement == None:
+			return 0
+		if self.universum <= self.leafSize:
+			found = self.infoCluster & sum(map((1).__lshift__, map(base.__rsub__, values[start:stop])))
+			bits = self.infoCluster ^ found
+			self.infoCluster = bits
+			self._count = bits.bit_count()
+			if bits == 0:
+				self._minElement = None
+				self._maxElement = None
+			else:
+				self._minElement = (bits & -bits).bit_length() - 1
+				self._maxElement = bits.bit_length() - 1
+			return found.bit_count()
+		removed = 0
+		# Values which are less than minElement are not in the tree
+		start = bisect.bisect_left(values, self._minElement + base, start, stop)
+		removeMin = start < stop and values[start] - base == self._minElement
+		if removeMin == True:
+			start += 1
+		if self._minElement == self._maxElement:
+			# VEBTree object contains only one element and its clusters are empty
+			if removeMin == True:
+				self._minElement = None
+				self._maxElement = None
+				self._count = 0
+				return 1
+			return 0
+		shift = self._lowBits
+		emptyClusters = []
+		while start < stop:
+			clustIndex = (values[start] - base) >> shift
+			clusterBase = base + (clustIndex << shift)
+			end = bisect.bisect_left(values, clusterBase + self.sqrtUni, start, stop)
+			cluster = self.infoCluster[clustIndex]
+			if cluster != None and cluster._minElement != None:
+				cluster = self._ownCluster(clustIndex)
+				removed += cluster._removeSorted(values, start, end, clusterBase)
+				if cluster._minElement == None:
+					emptyClusters.append(clustIndex)
+			start = end
+		if emptyClusters:
+			self._ownResume()._removeSorted(emptyClusters, 0, len(emptyClusters), 0)
+			for clustIndex in emptyClusters:
+				self._releaseCluster(clustIndex)
+		if removeMin == True:
+			removed += 1
+		self._count -= removed
+		self._rankCache = None
+		if removeMin == True:
+			firstCluster = self.resume.getMin()
+			if firstCluster == None:
+				self._minElement = None
+				self._maxElement = None
+				return removed
+			# The least value of the first non empty cluster becomes new minElement and leaves its cluster
+			cluster = self._ownCluster(firstCluster)
+			offset = cluster.getMin()
+			cluster.removeValue(offset)
+			if cluster.getMin() == None:
+				self._ownResume().removeValue(firstCluster)
+				self._releaseCluster(firstCluster)
+			self._minElement = self._index(firstCluster, offset)
+		maxClusterIndex = self.resume.getMax()
+		if maxClusterIndex == None:
+			self._maxElement = self._minElement
 		else:
-			# If removing value is the least element in the vEB tree
-			if value == self.getMin():
-				firstCluster = self.resume.getMin()
-				if firstCluster != None:
-					# Then function updates removing value to the successor of the least element of the tree/
-					value = self._index(firstCluster, self.infoCluster[firstCluster].getMin())
-					# And updates minElement with 'value'
-					# Following actions remove presence of this value in the tree
-					self._minElement = value
-			clustIndex = self._high(value)
-			valueIndex = self._low(value)
-			if self.infoCluster[clustIndex] != None:
-				success = self.infoCluster[clustIndex].removeValue(valueIndex)
-				if success == True:
-					if self.infoCluster[clustIndex].getMin() == None:
-						# If removing the given value results in emptiness of the cluster
-						# Then function accordingly updates summary clusters 
-						self.resume.removeValue(clustIndex)
-						# If removing value is the greatest in the vEB tree
-						if value == self.getMax():
-							maxClusterIndex = self.resume.getMax()
-							if maxClusterIndex == None:
-								# If vEB tree contains only one element
-								self._maxElement = self.getMin()
-							else:
-								# Otherwise function sets maxElement as predecessor of the removed maxElement
-								self._maxElement = self._index(maxClusterIndex, self.infoCluster[maxClusterIndex].getMax())
-					elif value == self.getMax():
-						# If removed value was the greatest element in the vEB tree
-						# Then function sets maxElement as predecessor of the removed maxElement
-						self._maxElement = self._index(clustIndex, self.infoCluster[clustIndex].getMax())
-		return success
+			self._maxElement = self._index(maxClusterIndex, self.infoCluster[maxClusterIndex].getMax())
+		return removed
+	def containsMany(self, values) -> list:
+		"""Checks presence of many numbers in the VEBTree object at once
+		   Values are sorted once and every touched cluster is visited once per group of its values
+		Arguments:
+					values - iterable with values
+		Return:
+					list - True or False for every given value in the same order
+		"""
+		values = list(values)
+		sortedValues = self._sortedValidValues(values)
+		found = []
+		if sortedValues:
+			self._containsSorted(sortedValues, 0, len(sortedValues), 0, found)
+		found = set(found)
+		if set(map(type, values)) == {int}:
+			return list(map(found.__contains__, values))
+		return [type(value) == int and value in found for value in values]
+	def _containsSorted(self, values: list, start: int, stop: int, base: int, found: list) -> None:
+		"""Collects values from the slice of sorted values which are in the VEBTree object
+		Arguments:
+					values - list with unique valid values in ascending order
+					start  - index of the first checked value
+					stop   - index after the last checked value
+					base   - the least value of the universum of the VEBTree object in the 'values'
+					found  - list where values which are in the VEBTree object are appended
+		"""
+		if self._minElement == None:
+			return
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster
+			for value in values[start:stop]:
+				if (bits >> (value - base)) & 1 == 1:
+					found.append(value)
+			return
+		# Values which are less than minElement are not in the tree
+		start = bisect.bisect_left(values, self._minElement + base, start, stop)
+		if start < stop and values[start] == self._minElement + base:
+			found.append(values[start])
+			start += 1
+		if self._minElement == self._maxElement:
+			return
+		shift = self._lowBits
+		while start < stop:
+			clustIndex = (values[start] - base) >> shift
+			clusterBase = base + (clustIndex << shift)
+			end = bisect.bisect_left(values, clusterBase + self.sqrtUni, start, stop)
+			cluster = self.infoCluster[clustIndex]
+			if cluster != None:
+				cluster._containsSorted(values, start, end, clusterBase, found)
+			start = end
+	def copy(self) -> 'VEBTree':
+		"""Returns new VEBTree object with the same values and settings
+		   Only non empty clusters are copied, so the cost follows the quantity of non empty nodes
+		"""
+		tree = self._cloneNode(self)
+		tree._autoGrow = self._autoGrow
+		return tree
+	def _cloneNode(self, source: 'VEBTree') -> 'VEBTree':
+		"""Creates copy of the source node with the settings of the VEBTree object (mode of clusters and generation)
+		Arguments:
+					source - node with the same leafSize as the VEBTree object has
+		"""
+		tree = self._newTree(source.universum)
+		if source._minElement == None:
+			return tree
+		tree._minElement = source._minElement
+		tree._maxElement = source._maxElement
+		tree._count = source._count
+		if source.universum <= source.leafSize:
+			tree.infoCluster = source.infoCluster
+			return tree
+		if source.resume != None and source.resume._minElement != None:
+			tree.resume = self._cloneNode(source.resume)
+			for clustIndex in source.resume._iterValues(0):
+				tree.infoCluster[clustIndex] = self._cloneNode(source.infoCluster[clustIndex])
+		return tree
+	def _takeFields(self, node: 'VEBTree') -> None:
+		"""Makes the VEBTree object hold values of the node with the same universum; the node should not be used after that"""
+		self._minElement = node._minElement
+		self._maxElement = node._maxElement
+		self._count = node._count
+		self._rankCache = None
+		self.resume = node.resume
+		self.infoCluster = node.infoCluster
+		self._spare = node._spare
+	def _fixMax(self) -> None:
+		"""Sets maxElement of non empty node after its clusters were changed"""
+		if self.resume == None or self.resume._maxElement == None:
+			self._maxElement = self._minElement
+		else:
+			clustIndex = self.resume._maxElement
+			self._maxElement = self._index(clustIndex, self.infoCluster[clustIndex]._maxElement)
+	def _isStructural(self, other) -> bool:
+		"""Checks whether set operations with the other tree may go cluster by cluster
+		Return:
+					True  - if the other tree is VEBTree object with the same leafSize and split policy, so their clusters match
+					False - if values of the other tree should be taken one by one
+		Raises:
+					ValueError - if the other tree has different universum
+		"""
+		if other.universum != self.universum:
+			raise ValueError("Trees have different universums: {} and {}".format(self.universum, other.universum))
+		return isinstance(other, VEBTree) and other.leafSize == self.leafSize and other._splits == self._splits
+	def unionUpdate(self, other) -> int:
+		"""Adds all values of the other tree to the VEBTree object
+		   Goes cluster by cluster: clusters which are empty in the other tree are not visited,
+		   clusters which are empty only in the VEBTree object are copied, leaves are merged as bitmaps
+		Arguments:
+					other - tree with the same universum
+		Return:
+					int - quantity of added values
+		"""
+		if self._isStructural(other) == False:
+			return self.insertMany(other)
+		return self._unionNode(other)
+	def _unionNode(self, other: 'VEBTree') -> int:
+		"""Adds values of the other node with the same universum to the VEBTree object
+		Return:
+					int - quantity of added values
+		"""
+		if other._minElement == None:
+			return 0
+		if self._minElement == None:
+			self._takeFields(self._cloneNode(other))
+			return other._count
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster | other.infoCluster
+			added = bits.bit_count() - self._count
+			self.infoCluster = bits
+			self._count += added
+			self._minElement = (bits & -bits).bit_length() - 1
+			self._maxElement = bits.bit_length() - 1
+			return added
+		added = 0
+		self._rankCache = None
+		if other.resume != None and other.resume._minElement != None:
+			newClusters = []
+			for clustIndex in other.resume._iterValues(0):
+				otherCluster = other.infoCluster[clustIndex]
+				cluster = self._ownCluster(clustIndex)
+				if cluster == None or cluster._minElement == None:
+					self.infoCluster[clustIndex] = self._cloneNode(otherCluster)
+					newClusters.append(clustIndex)
+					added += otherCluster._count
+				else:
+					added += cluster._unionNode(otherCluster)
+			if newClusters:
+				if self.resume == None:
+					self.resume = self._newTree(self.universum >> self._lowBits)
+				self._ownResume()._insertSorted(newClusters, 0, len(newClusters), 0)
+			self._count += added
+			# minElement of the VEBTree object does not appear in its clusters, but it may come with the clusters of the other node
+			clustIndex = self._minElement >> self._lowBits
+			cluster = self.infoCluster[clustIndex]
+			if cluster != None and cluster.containsValue(self._minElement & self._lowMask):
+				cluster.removeValue(self._minElement & self._lowMask)
+				if cluster._minElement == None:
+					self._ownResume().removeValue(clustIndex)
+				self._count -= 1
+				added -= 1
+			self._fixMax()
+		# minElement of the other node is not in its clusters, so it is added separately
+		if self.containsValue(other._minElement) == False:
+			self.insertValue(other._minElement)
+			added += 1
+		return added
+	def intersectionUpdate(self, other) -> int:
+		"""Keeps only values of the VEBTree object which are in the other tree too
+		   Goes over the non empty clusters of the tree which has less of them; clusters which are not common are dropped at once
+		Arguments:
+					other - tree with the same universum
+		Return:
+					int - quantity of removed values
+		"""
+		if self._isStructural(other) == False:
+			return self.removeMany([value for value in self if other.containsValue(value) == False])
+		return self._intersectionNode(other)
+	def _intersectionNode(self, other: 'VEBTree') -> int:
+		"""Removes values of the VEBTree object which are not in the other node with the same universum
+		Return:
+					int - quantity of removed values
+		"""
+		if self._minElement == None:
+			return 0
+		if other._minElement == None:
+			removed = self._count
+			self._takeFields(self._newTree(self.universum))
+			return removed
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster & other.infoCluster
+			removed = self._count - bits.bit_count()
+			self.infoCluster = bits
+			self._count -= removed
+			self._rankCache = None
+			if bits == 0:
+				self._minElement = None
+				self._maxElement = None
+			else:
+				self._minElement = (bits & -bits).bit_length() - 1
+				self._maxElement = bits.bit_length() - 1
+			return removed
+		# minElements are not in the clusters, so they are checked before the clusters change
+		minimum = self._minElement
+		keepMin = other.containsValue(minimum)
+		otherMin = other._minElement
+		restoreOtherMin = otherMin != minimum and self.containsValue(otherMin)
+		common = []
+		if self.resume != None and other.resume != None:
+			first, second = self.resume, other.resume
+			if second._count < first._count:
+				first, second = second, first
+			common = [clustIndex for clustIndex in first._iterValues(0) if second.containsValue(clustIndex)]
+		# Common clusters go into the new list of clusters, the rest are dropped with the old list
+		clusters = self.infoCluster
+		self.infoCluster = self._newTree(self.universum).infoCluster
+		survivors = []
+		kept = 1
+		for clustIndex in common:
+			cluster = clusters[clustIndex]
+			if cluster._gen != self._gen:
+				cluster = cluster._copy(self._gen)
+			cluster._intersectionNode(other.infoCluster[clustIndex])
+			if cluster._minElement != None:
+				self.infoCluster[clustIndex] = cluster
+				survivors.append(clustIndex)
+				kept += cluster._count
+		self.resume = None
+		if survivors:
+			self.resume = self._newTree(self.universum >> self._lowBits)
+			self.resume._loadSorted(survivors, 0, len(survivors), 0)
+		removed = self._count - kept
+		self._count = kept
+		self._rankCache = None
+		self._fixMax()
+		# minElement of the other node is not in its clusters, so the intersection of the clusters lost it
+		if restoreOtherMin:
+			self.insertValue(otherMin)
+			removed -= 1
+		if keepMin == False:
+			self.removeValue(minimum)
+			removed += 1
+		return removed
+	def differenceUpdate(self, other) -> int:
+		"""Removes values of the other tree from the VEBTree object
+		   Goes over the non empty clusters of the tree which has less of them and visits only the common ones
+		Arguments:
+					other - tree with the same universum
+		Return:
+					int - quantity of removed values
+		"""
+		if self._isStructural(other) == False:
+			return self.removeMany(other)
+		return self._differenceNode(other)
+	def _differenceNode(self, other: 'VEBTree') -> int:
+		"""Removes values of the other node with the same universum from the VEBTree object
+		Return:
+					int - quantity of removed values
+		"""
+		if self._minElement == None or other._minElement == None:
+			return 0
+		if self.universum <= self.leafSize:
+			bits = self.infoCluster & ~other.infoCluster
+			removed = self._count - bits.bit_count()
+			self.infoCluster = bits
+			self._count -= removed
+			self._rankCache = None
+			if bits == 0:
+				self._minElement = None
+				self._maxElement = None
+			else:
+				self._minElement = (bits & -bits).bit_length() - 1
+				self._maxElement = bits.bit_length() - 1
+			return removed
+		removed = 0
+		if self.resume != None and other.resume != None and self.resume._minElement != None:
+			first, second = self.resume, other.resume
+			if second._count < first._count:
+				first, second = second, first
+			common = [clustIndex for clustIndex in first._iterValues(0) if second.containsValue(clustIndex)]
+			emptyClusters = []
+			for clustIndex in common:
+				cluster = self._ownCluster(clustIndex)
+				removed += cluster._differenceNode(other.infoCluster[clustIndex])
+				if cluster._minElement == None:
+					emptyClusters.append(clustIndex)
+			if emptyClusters:
+				self._ownResume()._removeSorted(emptyClusters, 0, len(emptyClusters), 0)
+				for clustIndex in emptyClusters:
+					self._releaseCluster(clustIndex)
+			self._count -= removed
+			self._rankCache = None
+			self._fixMax()
+		# minElement of the VEBTree object may be in the clusters of the other node, minElement of the other node may be
+		# in the clusters of the VEBTree object; removing own minElement first lets removeValue bring the next one up
+		if other.containsValue(self._minElement):
+			self.removeValue(self._minElement)
+			removed += 1
+		if self.removeValue(other._minElement):
+			removed += 1
+		return removed
+	def union(self, other) -> 'VEBTree':
+		"""Returns new VEBTree object with the values of both trees, see unionUpdate"""
+		tree = self.copy()
+		tree.unionUpdate(other)
+		return tree
+	def intersection(self, other) -> 'VEBTree':
+		"""Returns new VEBTree object with the values which are in both trees, see intersectionUpdate
+		   The tree with less values is copied, the settings of the result are taken from the VEBTree object
+		"""
+		if self._isStructural(other) and len(other) < len(self):
+			tree = self._cloneNode(other)
+			tree.intersectionUpdate(self)
+			return tree
+		tree = self.copy()
+		tree.intersectionUpdate(other)
+		return tree
+	def difference(self, other) -> 'VEBTree':
+		"""Returns new VEBTree object with the values of the VEBTree object which are not in the other tree"""
+		tree = self.copy()
+		tree.differenceUpdate(other)
+		return tree
+	def __or__(self, other) -> 'VEBTree':
+		return self.union(other)
+	def __and__(self, other) -> 'VEBTree':
+		return self.intersection(other)
+	def __sub__(self, other) -> 'VEBTree':
+		return self.difference(other)
+	def __ior__(self, other) -> 'VEBTree':
+		self.unionUpdate(other)
+		return self
+	def __iand__(self, other) -> 'VEBTree':
+		self.intersectionUpdate(other)
+		return self
+	def __isub__(self, other) -> 'VEBTree':
+		self.differenceUpdate(other)
+		return self